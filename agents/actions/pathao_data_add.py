@@ -5,6 +5,7 @@ import time
 from typing import Dict, Optional
 from ollama import Client, ResponseError
 from agents.config import settings
+from agents.results_recorder import http
 
 from agents.payload_generators.pathao_ride_request import PathaoConfig, PathaoPayloadGenerator
 from agents.payload_generators.pathao_ride_started import PathaoRideStartedGenerator
@@ -41,7 +42,7 @@ def handle_full_trip_data(client: Client, project: str, auth_token: str):
     success = False
     for attempt in range(1, MAX_RETRIES + 1):
         try:
-            resp = requests.post(url, headers=headers, json=payload, timeout=10)
+            resp = http.post(url, headers=headers, json=payload, timeout=10)
             resp.raise_for_status()
             print("✅ Success:", resp.json())
             success = True
@@ -162,7 +163,7 @@ def handle_trip_receipt_data(client: Client, project: str, auth_token: str):
     success = False
     for attempt in range(1, MAX_RETRIES + 1):
         try:
-            resp = requests.post(url, headers=headers, json=payload, timeout=10)
+            resp = http.post(url, headers=headers, json=payload, timeout=10)
             resp.raise_for_status()
             print("✅ Success:", resp.json())
             success = True
@@ -202,7 +203,7 @@ def handle_summaries_action(
     while attempt < MAX_RETRIES:
         attempt += 1
         try:
-            resp = requests.get(url, headers=headers, params=params, timeout=10)
+            resp = http.get(url, headers=headers, params=params, timeout=10)
             resp.raise_for_status()
             summary = resp.json()
             print("✅ Summary Data:\n", json.dumps(summary, indent=2))
@@ -3,6 +3,7 @@ import requests
 from typing import Optional, Dict
 from ollama import Client
 from agents.config import settings
+from agents.results_recorder import http
 
 
 def handle_total_trips_summary(
@@ -40,7 +41,7 @@ def handle_total_trips_summary(
     params = {"range": range}
 
     try:
-        response = requests.get(base_url, headers=headers, params=params, timeout=10)
+        response = http.get(base_url, headers=headers, params=params, timeout=10)
         response.raise_for_status()
         summary = response.json()
         print("✅ Summary Data:\n", json.dumps(summary, indent=2))
@@ -1,13 +1,49 @@
 from ollama import Client
 
+from agents.classifiers.embedding_classifier import EmbeddingClassifier
+from agents.structured_output import chat_label, label_schema
+
+ACTION_EXAMPLES = {
+    "add data": [
+        "add data",
+        "insert some test data",
+        "seed the database with records",
+        "create ride and trip data",
+    ],
+    "do a curl": [
+        "do a curl",
+        "send a curl request to the endpoint",
+        "call the api with curl",
+        "hit this url and show the response",
+    ],
+    "open a new account": [
+        "open a new account",
+        "create a user account",
+        "sign up a new customer",
+        "register a bank account for a test user",
+    ],
+}
+
+ActionLabel = label_schema("ActionLabel", list(ACTION_EXAMPLES))
+
 
 def classify_action_via_llm(client, action_input):
+    """
+    Classify the user action into one of the predefined categories, by
+    embedding similarity when that is confident, otherwise by asking the LLM.
+    None when the LLM's answer isn't one of them.
+    """
+    return _classifier.classify(client, action_input).label
+
+
+def _classify_action_via_chat(client, action_input):
     """
     Use the LLM to classify the user action into one of the predefined categories.
-    Returns just the classified action without any thinking text.
+    The answer is constrained to those categories; None if it still isn't one.
     """
-    # Your existing code that calls the LLM
-    response = client.chat(
+    return chat_label(
+        client,
+        "action",
         model="deepseek-r1:8b",
         messages=[
             {
@@ -18,23 +54,10 @@ def classify_action_via_llm(client, action_input):
                 "role": "user",
                 "content": action_input
             }
-        ]
+        ],
+        schema=ActionLabel,
+        cache=True,
     )
 
-    raw_response = response['message']['content']
-
-    # Extract the actual classification from the response
-    # If it contains thinking tags, get only the text after all tags
-    if '<think>' in raw_response and '</think>' in raw_response:
-        # Get the text after the last </think> tag
-        action = raw_response.split('</think>')[-1].strip()
-    else:
-        action = raw_response.strip()
-
-    # Further clean up the response to match expected actions exactly
-    for expected_action in ['add data', 'do a curl', 'open a new account']:
-        if expected_action in action.lower():
-            return expected_action
 
-    # Default fallback
-    return action.lower()
\ No newline at end of file
+_classifier = EmbeddingClassifier("action", ACTION_EXAMPLES, _classify_action_via_chat)
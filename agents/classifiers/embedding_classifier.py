@@ -0,0 +1,108 @@
+# agents/classifiers/embedding_classifier.py
+"""
+Local classification over a fixed set of labels, by embedding similarity.
+
+Each label comes with a few example phrasings. All of them are embedded once,
+in a single `embed` call to EMBED_MODEL, the first time the classifier runs,
+and kept as one normalised matrix. Classifying an input then costs one embed
+of the input plus a matrix-vector product: every example's cosine similarity
+at once, and the best per label via `np.maximum.reduceat`. That takes
+milliseconds instead of a multi-second reasoning-model chat.
+
+The chat model is still the fallback. It is used when the best label's
+similarity is under EMBED_CLASSIFIER_THRESHOLD, when the runner-up is within
+EMBED_CLASSIFIER_MARGIN of it, or when embeddings are unavailable (e.g. the
+model isn't pulled). Every call prints and returns which path it took. The
+fallback returns None for an answer it can't use, and so does classify().
+"""
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+from ollama import Client
+
+from agents.config import settings
+
+CHAT = "chat"
+EMBEDDING = "embedding"
+
+
+class Classification(NamedTuple):
+    label: Optional[str]     # None: the chat model's answer was unusable
+    path: str                # EMBEDDING or CHAT
+    score: Optional[float]   # best label's cosine similarity; None if embeddings failed
+    elapsed_ms: float
+
+
+def _normalise(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+class EmbeddingClassifier:
+    def __init__(
+        self,
+        name: str,
+        examples: Dict[str, Sequence[str]],
+        fallback: Optional[Callable[[Client, str], Optional[str]]] = None,
+        threshold: Optional[float] = None,
+        margin: Optional[float] = None,
+    ):
+        self.name = name
+        self.labels: List[str] = list(examples)
+        self.examples = examples
+        self.fallback = fallback
+        self.threshold = settings.EMBED_CLASSIFIER_THRESHOLD if threshold is None else threshold
+        self.margin = settings.EMBED_CLASSIFIER_MARGIN if margin is None else margin
+        self._matrix: Optional[np.ndarray] = None   # one normalised row per example
+        self._starts: Optional[np.ndarray] = None   # first row of each label
+        self._lock = threading.Lock()
+        self.counts = {EMBEDDING: 0, CHAT: 0}
+
+    def _embed(self, client: Client, texts: List[str]) -> np.ndarray:
+        response = client.embed(model=settings.EMBED_MODEL, input=texts)
+        return _normalise(np.asarray(response["embeddings"], dtype=np.float32))
+
+    def _label_matrix(self, client: Client) -> np.ndarray:
+        if self._matrix is None:
+            with self._lock:
+                if self._matrix is None:
+                    texts = [text for label in self.labels for text in self.examples[label]]
+                    sizes = [len(self.examples[label]) for label in self.labels]
+                    self._starts = np.cumsum([0] + sizes[:-1])
+                    self._matrix = self._embed(client, texts)
+        return self._matrix
+
+    def scores(self, client: Client, text: str) -> np.ndarray:
+        """Best cosine similarity of `text` to each label's examples, in label order."""
+        matrix = self._label_matrix(client)
+        similarities = matrix @ self._embed(client, [text])[0]
+        return np.maximum.reduceat(similarities, self._starts)
+
+    def classify(
+        self, client: Client, text: str, fallback: Optional[Callable[[Client, str], Optional[str]]] = None
+    ) -> Classification:
+        """The best label for `text`; `fallback` overrides the classifier's own chat fallback."""
+        start = time.perf_counter()
+        best: Optional[float] = None
+        if settings.EMBED_CLASSIFIER_ENABLED:
+            try:
+                scores = self.scores(client, text)
+                order = np.argsort(scores)[::-1]
+                best = float(scores[order[0]])
+                runner_up = float(scores[order[1]]) if len(order) > 1 else -1.0
+                if best >= self.threshold and best - runner_up >= self.margin:
+                    return self._done(self.labels[order[0]], EMBEDDING, best, start)
+            except Exception as e:
+                print(f"⚠️ {self.name}: embeddings unavailable, asking the chat model ({e})")
+        label = (fallback or self.fallback)(client, text)
+        return self._done(label, CHAT, best, start)
+
+    def _done(self, label: Optional[str], path: str, score: Optional[float], start: float) -> Classification:
+        result = Classification(label, path, score, (time.perf_counter() - start) * 1000)
+        self.counts[path] += 1
+        similarity = f"similarity {score:.2f}, " if score is not None else ""
+        shown = f"'{label}'" if label is not None else "unrecognised"
+        print(f"🧭 {self.name}: {shown} via {path} ({similarity}{result.elapsed_ms:.0f} ms)")
+        return result
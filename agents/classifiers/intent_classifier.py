@@ -1,20 +1,54 @@
+from typing import Optional
+
 from ollama import Client
 
+from agents.classifiers.embedding_classifier import EmbeddingClassifier
+from agents.structured_output import chat_label, label_schema
+
+INTENT_EXAMPLES = {
+    "api testing": [
+        "api testing",
+        "test the backend api endpoints",
+        "send requests to the rest api and check the responses",
+        "add test data through the api",
+    ],
+    "front end testing": [
+        "front end testing",
+        "test the user interface in the browser",
+        "click through the web pages and check the ui",
+        "check the screens and forms of the app",
+    ],
+}
+
+IntentLabel = label_schema("IntentLabel", list(INTENT_EXAMPLES))
+
 
-def classify_intent_via_llm(client: Client, user_text: str) -> str:
+def classify_intent_via_llm(client: Client, user_text: str) -> Optional[str]:
     """
-    Use the LLM to classify intent into 'api testing' or 'front end testing'.
+    Classify intent into 'api testing' or 'front end testing', by embedding
+    similarity when that is confident, otherwise by asking the LLM. None when
+    the LLM's answer isn't one of them.
     """
+    return _classifier.classify(client, user_text).label
+
+
+def _classify_intent_via_chat(client: Client, user_text: str) -> Optional[str]:
     system_prompt = (
         "You are an intent classification assistant. "
         "When given a request, respond with exactly one of: "
         "'api testing' or 'front end testing'."
     )
-    response = client.chat(
+    return chat_label(
+        client,
+        "intent",
         model="deepseek-r1:8b",
         messages=[
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_text}
-        ]
+        ],
+        schema=IntentLabel,
+        cache=True,
     )
-    return response.message.content.strip().lower()
\ No newline at end of file
+
+
+_classifier = EmbeddingClassifier("intent", INTENT_EXAMPLES, _classify_intent_via_chat)
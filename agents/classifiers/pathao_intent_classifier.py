@@ -25,6 +25,25 @@ handle_ride_started_data,
 handle_ride_finished_data,
 handle_trip_receipt_data
 )
+from agents.classifiers.embedding_classifier import EmbeddingClassifier
+from agents.structured_output import chat_label, label_schema
+
+PATHAO_EXAMPLES = {
+    "full trip data": [
+        "full trip data",
+        "add a complete trip from request to receipt",
+        "simulate an entire ride end to end",
+    ],
+    "ride request": ["ride request", "a customer requests a ride", "book a ride for a rider"],
+    "ride started": ["ride started", "the driver picked up the rider and started the trip", "start the ride"],
+    "ride finished": ["ride finished", "the trip has ended at the drop-off", "complete the ride"],
+    "trip receipt": ["trip receipt", "I need the trip receipt", "generate the fare receipt for a trip"],
+}
+
+PathaoLabel = label_schema("PathaoLabel", list(PATHAO_EXAMPLES))
+
+# The chat fallback needs the prompt built in handle_pathao_data, so it is passed per call
+_classifier = EmbeddingClassifier("pathao data", PATHAO_EXAMPLES)
 
 def handle_pathao_data(
         client: Client,
@@ -33,7 +52,7 @@ def handle_pathao_data(
         max_retries: int = 3
 ) -> None:
     """
-    Uses *only* LLM intent classification to dispatch to the right Pathao data handler.
+    Uses intent classification (embedding similarity, else the LLM) to dispatch to the right Pathao data handler.
     Retries up to `max_retries` times if the category isn't recognized.
     """
     print(f"\n🚴 Pathao data ingestion for project '{project}'\n")
@@ -54,28 +73,14 @@ def handle_pathao_data(
         "trip receipt": handle_trip_receipt_data,
     }
 
-    # 2) Helper to extract answer from reasoning models
-    def extract_answer(text: str) -> str:
-        import re
-
-        # First, try to extract content after </think> tag (for reasoning models)
-        think_match = re.search(r'</think>\s*(.*?)$', text, re.DOTALL | re.IGNORECASE)
-        if think_match:
-            extracted = think_match.group(1).strip()
-            print(f"[DEBUG] Extracted after </think>: '{extracted}'")
-            return extracted
-
-        # If no think tags, return the original text
-        return text.strip()
-
-    # 3) Normalization helper
+    # 2) Normalization helper
     def normalize(text: str) -> str:
         txt = text.lower().strip()
         # Remove quotes and extra punctuation, but keep spaces
         txt = txt.strip('"\'.,!?')
         return "".join(ch for ch in txt if ch.isalnum() or ch.isspace()).strip()
 
-    # 4) Build the system prompt once
+    # 3) Build the system prompt once
     system_prompt = (
             "You are an intent classifier for Pathao ride-sharing data.\n"
             "Classify the user's request into exactly one of the following categories:\n"
@@ -83,7 +88,20 @@ def handle_pathao_data(
             + "\n\nReply with *only* the exact category name from the list above, no other words or explanations."
     )
 
-    # 5) Retry loop
+    def ask_llm(client: Client, user_input: str) -> Optional[str]:
+        return chat_label(
+            client,
+            "pathao intent",
+            model="deepseek-r1:8b",
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_input},
+            ],
+            schema=PathaoLabel,
+            cache=True,
+        )
+
+    # 4) Retry loop
     for attempt in range(1, max_retries + 1):
         print("❓ What Pathao data would you like to add?")
         print("(e.g., \"I need the trip receipt\" or just paste your free-form request)\n")
@@ -91,31 +109,22 @@ def handle_pathao_data(
         user_input = input("Your request: ").strip()
         print(f"[DEBUG] User input: {user_input}")
 
-        print("🤖 Classifying with LLM...")
+        print("🤖 Classifying...")
         try:
-            resp = client.chat(
-                model="deepseek-r1:8b",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_input},
-                ],
-            )
-            llm_reply = resp["message"]["content"]
+            # A confident embedding match is already an exact category name;
+            # an unusable chat answer (None) falls through to the retry below
+            llm_reply = _classifier.classify(client, user_input, fallback=ask_llm).label or ""
         except Exception as e:
             print(f"❌ LLM call failed: {e}")
             return
 
         print(f"[DEBUG] Raw LLM reply: '{llm_reply}'")
 
-        # Extract the actual answer (handles reasoning models)
-        extracted_answer = extract_answer(llm_reply)
-        print(f"[DEBUG] Extracted answer: '{extracted_answer}'")
-
         # Normalize for comparison
-        norm_reply = normalize(extracted_answer)
+        norm_reply = normalize(llm_reply)
         print(f"[DEBUG] Normalized answer: '{norm_reply}'")
 
-        # 6) Match against our normalized categories
+        # 5) Match against our normalized categories
         raw_to_norm = {normalize(cat): cat for cat in categories}
         print(f"[DEBUG] Normalized categories: {list(raw_to_norm.keys())}")
 
@@ -150,7 +159,7 @@ def handle_pathao_data(
                 handlers[best_match](client, project, auth_token)
                 return
 
-            print(f"⚠️  \"{extracted_answer}\" is not one of the valid categories.")
+            print(f"⚠️  \"{llm_reply}\" is not one of the valid categories.")
             if attempt < max_retries:
                 print(f"🔁 Retrying classification ({attempt + 1}/{max_retries})...\n")
             else:
@@ -1,20 +1,46 @@
+from typing import Optional
+
 from ollama import Client
 
+from agents.classifiers.embedding_classifier import EmbeddingClassifier
+from agents.structured_output import chat_label, label_schema
+
+PROJECT_EXAMPLES = {
+    "Gigly": ["Gigly", "gigly", "the gigly gig marketplace", "gigly freelance jobs app"],
+    "NCC": ["NCC", "ncc", "the ncc project"],
+    "MMBL": ["MMBL", "mmbl", "the mmbl project"],
+    "UCB": ["UCB", "ucb", "the ucb project"],
+}
+
+ProjectLabel = label_schema("ProjectLabel", list(PROJECT_EXAMPLES))
+
 
-def classify_project_via_llm(client: Client, project_text: str) -> str:
+def classify_project_via_llm(client: Client, project_text: str) -> Optional[str]:
     """
-    Use the LLM to classify project into one of: Gigly, NCC, MMBL, UCB.
+    Classify project into one of: Gigly, NCC, MMBL, UCB, by embedding
+    similarity when that is confident, otherwise by asking the LLM. None when
+    the LLM's answer isn't one of them.
     """
+    return _classifier.classify(client, project_text).label
+
+
+def _classify_project_via_chat(client: Client, project_text: str) -> Optional[str]:
     system_prompt = (
         "You are a project classification assistant. "
         "Given a project name or description, respond with exactly one of: "
         "'Gigly', 'NCC', 'MMBL', or 'UCB'."
     )
-    response = client.chat(
+    return chat_label(
+        client,
+        "project",
         model="deepseek-r1:8b",
         messages=[
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": project_text}
-        ]
+        ],
+        schema=ProjectLabel,
+        cache=True,
     )
-    return response.message.content.strip().title()
\ No newline at end of file
+
+
+_classifier = EmbeddingClassifier("project", PROJECT_EXAMPLES, _classify_project_via_chat)
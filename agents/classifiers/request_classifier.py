@@ -0,0 +1,110 @@
+# agents/classifiers/request_classifier.py
+"""
+Intent, project and action from one free-form request, in one LLM call.
+
+The chat model answers with JSON constrained (Ollama `format`) to the
+RequestSlots schema. Each slot must be one of its allowed values or null, and
+the prompt asks for null whenever the request doesn't say, or could mean more
+than one value. Slots are validated one by one, so a bad project doesn't throw
+away a good intent. Only the slots still missing get a follow-up question, and
+that answer goes to the slot's own classifier (embedding first, chat second).
+
+    slots = classify_request(client, "open a new account on gigly through the api")
+    # {"intent": "api testing", "project": "Gigly", "action": "open a new account"}
+
+A complete request takes one round trip instead of the three separate prompts
+and classifications.
+"""
+import json
+from typing import Callable, Dict, Literal, Optional
+
+from ollama import Client
+from pydantic import BaseModel
+
+from agents.classifiers.action_classifier import ACTION_EXAMPLES, classify_action_via_llm
+from agents.classifiers.intent_classifier import INTENT_EXAMPLES, classify_intent_via_llm
+from agents.classifiers.project_classifier import PROJECT_EXAMPLES, classify_project_via_llm
+from agents.client import cached_chat
+from agents.structured_output import budget
+
+ALLOWED = {
+    "intent": list(INTENT_EXAMPLES),
+    "project": list(PROJECT_EXAMPLES),
+    "action": list(ACTION_EXAMPLES),
+}
+
+
+class RequestSlots(BaseModel):
+    intent: Optional[Literal[tuple(ALLOWED["intent"])]] = None
+    project: Optional[Literal[tuple(ALLOWED["project"])]] = None
+    action: Optional[Literal[tuple(ALLOWED["action"])]] = None
+
+
+# slot -> (follow-up question, single-slot classifier)
+FOLLOW_UPS: Dict[str, tuple] = {
+    "intent": ("Is this api testing or front end testing?\n>>", classify_intent_via_llm),
+    "project": ("Which project would you like to work on?\n>>", classify_project_via_llm),
+    "action": (
+        "What would you like to do first? (add data, do a curl, open a new account)\n>>",
+        classify_action_via_llm,
+    ),
+}
+
+SYSTEM_PROMPT = (
+    "You extract three slots from a QA engineer's request and answer in JSON.\n"
+    + "\n".join(f"- {slot}: one of {', '.join(repr(v) for v in values)}" for slot, values in ALLOWED.items())
+    + "\nUse null for a slot the request does not mention or that could mean more than one value. "
+    "Never guess."
+)
+
+
+def validate_slot(slot: str, value) -> Optional[str]:
+    """The allowed value `value` names (case-insensitively), else None."""
+    if not isinstance(value, str):
+        return None
+    for allowed in ALLOWED[slot]:
+        if value.strip().lower() == allowed.lower():
+            return allowed
+    return None
+
+
+def extract_slots(client: Client, user_text: str) -> Dict[str, Optional[str]]:
+    """One structured chat call; slots that are missing or invalid come back as None."""
+    response = cached_chat(
+        client,
+        cache=True,
+        model="deepseek-r1:8b",
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": user_text},
+        ],
+        format=RequestSlots.model_json_schema(),
+        **budget("request slots"),
+    )
+    content = response.message.content
+    try:
+        raw = json.loads(content)
+    except json.JSONDecodeError:
+        print(f"⚠️ Could not parse slots from: {content[:200]}")
+        raw = {}
+    if not isinstance(raw, dict):
+        raw = {}
+    return {slot: validate_slot(slot, raw.get(slot)) for slot in ALLOWED}
+
+
+def classify_request(
+    client: Client, user_text: str, ask: Callable[[str], str] = input
+) -> Dict[str, Optional[str]]:
+    """
+    All three slots for `user_text`. Missing ones are asked for with `ask`,
+    and stay None when even the follow-up answer isn't an allowed value.
+    """
+    slots = extract_slots(client, user_text)
+    found = {slot: value for slot, value in slots.items() if value}
+    print(f"🧩 From one call: {found or 'nothing'}")
+    for slot, value in slots.items():
+        if value:
+            continue
+        question, classify = FOLLOW_UPS[slot]
+        slots[slot] = validate_slot(slot, classify(client, ask(question)))
+    return slots
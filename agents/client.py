@@ -1,13 +1,226 @@
-# Example fix for client.py
-from ollama import Client
-from config import settings
-
-def get_ollama_client():
-    try:
-        # Make sure we're using the correct URL format
-        client = Client(host=settings.LLM_ENDPOINT)
-        # Test the connection with a simple API call
-        client.list()
-        return client
-    except Exception as e:
-        raise RuntimeError(f"ERROR: Ollama server is not running. Please start it with `ollama serve`. Details: {str(e)}")
\ No newline at end of file
+# agents/client.py
+"""
+The process-wide Ollama client.
+
+`get_ollama_client()` always returns the same `OllamaClient`, an
+`ollama.Client` that:
+
+- checks the server's health lazily. Nothing touches the network when the
+  client is created. The first call (or the preload thread, whichever runs
+  first) asks the server once, and the answer is reused for
+  OLLAMA_HEALTH_TTL seconds. A failed call forces a fresh check.
+- preloads OLLAMA_PRELOAD_MODELS in a background thread, so the model is
+  usually resident before the first classification needs it.
+- sends keep_alive=OLLAMA_KEEP_ALIVE with every call, unless the caller sets
+  one, so the model stays loaded between calls and between agent runs. -1
+  pins it until the Ollama server restarts.
+- times every call and sorts it into cold or warm. A call is cold when Ollama
+  reports more than OLLAMA_COLD_LOAD_MS of model loading. `stats()` returns
+  the counts and mean times per model; with OLLAMA_REPORT_STATS they are
+  printed at exit.
+- answers `chat(..., cache=True)` calls from the LLM cache when it can (see
+  llm_cache.py). A hit needs neither the server nor the model.
+
+Code that takes any `ollama.Client` goes through `cached_chat`, which only
+passes `cache` on to an OllamaClient.
+"""
+import atexit
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Union
+
+from ollama import Client, ResponseError
+
+from agents.config import settings
+from agents.llm_cache import cache_key, get_cache
+
+NOT_RUNNING = "ERROR: Ollama server is not running. Please start it with `ollama serve`."
+
+
+def _keep_alive(value: str) -> Union[float, str]:
+    # Ollama takes a duration ("30m") or a number of seconds (-1, 0, 3600)
+    return float(value) if re.fullmatch(r"-?\d+(\.\d+)?", value.strip()) else value.strip()
+
+
+class _ModelStats:
+    __slots__ = ("cold", "warm", "cold_seconds", "warm_seconds", "load_seconds", "preload_seconds")
+
+    def __init__(self):
+        self.cold = self.warm = 0
+        self.cold_seconds = self.warm_seconds = self.load_seconds = 0.0
+        self.preload_seconds: Optional[float] = None
+
+    def to_dict(self) -> Dict:
+        return {
+            "cold_calls": self.cold,
+            "warm_calls": self.warm,
+            "cold_avg_ms": round(1000 * self.cold_seconds / self.cold, 1) if self.cold else None,
+            "warm_avg_ms": round(1000 * self.warm_seconds / self.warm, 1) if self.warm else None,
+            "load_ms_total": round(1000 * self.load_seconds, 1),
+            "preload_ms": round(1000 * self.preload_seconds, 1) if self.preload_seconds is not None else None,
+        }
+
+
+class OllamaClient(Client):
+    def __init__(self, host: str, keep_alive: Union[float, str], health_ttl: float, cold_load_ms: float):
+        super().__init__(host=host)
+        self.keep_alive = keep_alive
+        self.health_ttl = health_ttl
+        self.cold_load_ms = cold_load_ms
+        self._healthy_until = 0.0
+        self._health_lock = threading.Lock()
+        self._stats: Dict[str, _ModelStats] = {}
+        self._stats_lock = threading.Lock()
+        self._preloader: Optional[threading.Thread] = None
+
+    # ─── Health ─────────────────────────────────────────────────
+    def ensure_healthy(self):
+        """Raise RuntimeError unless the server answered within the last health_ttl seconds."""
+        if time.monotonic() < self._healthy_until:
+            return
+        with self._health_lock:
+            if time.monotonic() < self._healthy_until:
+                return
+            try:
+                self.list()
+            except Exception as e:
+                raise RuntimeError(f"{NOT_RUNNING} Details: {e}")
+            self._healthy_until = time.monotonic() + self.health_ttl
+
+    # ─── Preloading ─────────────────────────────────────────────
+    def preload(self, models: List[str]):
+        """Load `models` in a background thread; calls meanwhile just wait on Ollama's own load."""
+        if not models or self._preloader is not None:
+            return
+        self._preloader = threading.Thread(target=self._preload, args=(models,), name="ollama-preload", daemon=True)
+        self._preloader.start()
+
+    def _preload(self, models: List[str]):
+        try:
+            self.ensure_healthy()
+        except RuntimeError as e:
+            print(f"⚠️ Skipping model preload: {e}")
+            return
+        for model in models:
+            start = time.perf_counter()
+            try:
+                # An empty prompt only loads the model; with the chat calls' num_ctx, or they'd reload it
+                super().generate(
+                    model=model, prompt="", keep_alive=self.keep_alive, options={"num_ctx": settings.LLM_NUM_CTX}
+                )
+            except ResponseError:
+                # Embedding-only models can't generate; an empty embed loads those
+                try:
+                    super().embed(model=model, input="", keep_alive=self.keep_alive)
+                except Exception as e:
+                    print(f"⚠️ Could not preload {model}: {e}")
+                    continue
+            except Exception as e:
+                print(f"⚠️ Could not preload {model}: {e}")
+                continue
+            self._model_stats(model).preload_seconds = time.perf_counter() - start
+
+    # ─── Calls ──────────────────────────────────────────────────
+    def _model_stats(self, model: str) -> _ModelStats:
+        with self._stats_lock:
+            return self._stats.setdefault(model, _ModelStats())
+
+    def _timed(self, call, model: str, kwargs):
+        self.ensure_healthy()
+        if kwargs.get("keep_alive") is None:
+            kwargs["keep_alive"] = self.keep_alive
+        start = time.perf_counter()
+        try:
+            response = call(model=model, **kwargs)
+        except Exception:
+            self._healthy_until = 0.0
+            raise
+        if kwargs.get("stream"):
+            return response
+        elapsed = time.perf_counter() - start
+        load = (getattr(response, "load_duration", None) or 0) / 1e9
+        stats = self._model_stats(model)
+        with self._stats_lock:
+            stats.load_seconds += load
+            if load * 1000 > self.cold_load_ms:
+                stats.cold += 1
+                stats.cold_seconds += elapsed
+            else:
+                stats.warm += 1
+                stats.warm_seconds += elapsed
+        if load * 1000 > self.cold_load_ms:
+            print(f"🐢 {model} was not loaded: {load:.1f}s of this {elapsed:.1f}s call went to loading it")
+        return response
+
+    def chat(self, model: str = "", messages=None, *, cache: bool = False, **kwargs):
+        """ollama.Client.chat; with `cache`, identical calls are answered from the LLM cache."""
+        store = get_cache() if cache and not kwargs.get("stream") else None
+        if store is not None:
+            key = cache_key(model, messages, kwargs)
+            response = store.get(key)
+            if response is not None:
+                return response
+        response = self._timed(super().chat, model, {"messages": messages, **kwargs})
+        # A reply cut off by num_predict is incomplete; asking again may do better
+        if store is not None and response.done and response.done_reason != "length":
+            store.put(key, response)
+        return response
+
+    def generate(self, model: str = "", prompt: Optional[str] = None, **kwargs):
+        return self._timed(super().generate, model, {"prompt": prompt, **kwargs})
+
+    def embed(self, model: str = "", input="", **kwargs):
+        return self._timed(super().embed, model, {"input": input, **kwargs})
+
+    def stats(self) -> Dict[str, Dict]:
+        """Per model: cold / warm call counts and mean wall times, total load time, preload time."""
+        with self._stats_lock:
+            return {model: s.to_dict() for model, s in self._stats.items()}
+
+    def print_stats(self):
+        for model, s in self.stats().items():
+            print(
+                f"📊 {model}: {s['cold_calls']} cold (avg {s['cold_avg_ms']} ms), "
+                f"{s['warm_calls']} warm (avg {s['warm_avg_ms']} ms), preload {s['preload_ms']} ms"
+            )
+        store = get_cache()
+        if store is not None:
+            s = store.stats()
+            if s["hit_rate"] is not None:
+                print(
+                    f"📊 LLM cache: {s['memory_hits']} memory + {s['disk_hits']} disk hits, "
+                    f"{s['misses']} misses (hit rate {s['hit_rate']:.0%}), {s['evictions']} evicted"
+                )
+
+
+def cached_chat(client: Client, cache: bool = False, **kwargs):
+    """client.chat(**kwargs), from the LLM cache when `cache` is set and `client` is an OllamaClient."""
+    if cache and isinstance(client, OllamaClient):
+        return client.chat(cache=True, **kwargs)
+    return client.chat(**kwargs)
+
+
+_client: Optional[OllamaClient] = None
+_client_lock = threading.Lock()
+
+
+def get_ollama_client() -> OllamaClient:
+    """
+    The shared client; the first call starts preloading the configured models.
+    Never blocks on the network: an unreachable server surfaces as a
+    RuntimeError from the first chat/generate call instead.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = OllamaClient(
+                host=settings.LLM_ENDPOINT,
+                keep_alive=_keep_alive(settings.OLLAMA_KEEP_ALIVE),
+                health_ttl=settings.OLLAMA_HEALTH_TTL,
+                cold_load_ms=settings.OLLAMA_COLD_LOAD_MS,
+            )
+            _client.preload([m.strip() for m in settings.OLLAMA_PRELOAD_MODELS.split(",") if m.strip()])
+            if settings.OLLAMA_REPORT_STATS:
+                atexit.register(_client.print_stats)
+        return _client
@@ -1,14 +1,36 @@
 import requests
 from config import settings
 from schemas.schemas import InsertCredentialsRequest
-from pydantic import ValidationError
+from pydantic import BaseModel, ValidationError
 from ollama import Client
 import json
+import uuid
+from agents.id_allocator import IdRangeExhausted, next_account_fields
+from agents.structured_output import chat_json
 
+try:
+    import msgpack
+except ImportError:  # mcp_call then always speaks JSON
+    msgpack = None
 
-def mcp_call(method, params):
-    """Helper function to make JSON-RPC calls to the MCP server"""
+MSGPACK = "application/msgpack"
+
+
+class GeneratedAccount(BaseModel):
+    """The part of InsertCredentialsRequest the LLM makes up; the ids are allocated."""
+    first_name: str
+    last_name: str
+    is_active: bool = True
+
+
+def mcp_call(method, params, request_id=None):
+    """
+    Helper function to make JSON-RPC calls to the MCP server. Each call carries
+    an X-Request-ID (a fresh one unless given), which the server logs slow
+    requests and statements under and shows as Postgres' application_name.
+    """
     url = settings.MCP_ENDPOINT if hasattr(settings, 'MCP_ENDPOINT') else "http://localhost:8000/mcp"
+    request_id = request_id or uuid.uuid4().hex
 
     # Prepare JSON-RPC 2.0 request
     rpc_request = {
@@ -18,9 +40,20 @@ def mcp_call(method, params):
         "id": 1  # Simple ID for request tracking
     }
 
-    # Make the request
-    response = requests.post(url, json=rpc_request)
+    # Make the request; MessagePack when MCP_WIRE_FORMAT=msgpack (smaller, faster to encode)
+    if settings.MCP_WIRE_FORMAT == "msgpack" and msgpack is not None:
+        response = requests.post(
+            url,
+            data=msgpack.packb(rpc_request),
+            headers={"Content-Type": MSGPACK, "Accept": MSGPACK, "X-Request-ID": request_id},
+        )
+    else:
+        response = requests.post(url, json=rpc_request, headers={"X-Request-ID": request_id})
+    if not response.ok:
+        print(f"❌ MCP {method} failed with HTTP {response.status_code} (request id {request_id})")
     response.raise_for_status()
+    if response.headers.get("Content-Type", "").startswith(MSGPACK):
+        return msgpack.unpackb(response.content, raw=False)
     return response.json()
 
 
@@ -42,64 +75,54 @@ def handle_do_curl(client: Client, project: str):
 
 def generate_payload_via_llm(client: Client) -> dict:
     """
-    Ask the LLM to build a JSON payload for InsertCredentialsRequest.
-    With guaranteed unique user_id, email, and phone_number.
+    Build a JSON payload for InsertCredentialsRequest: names from the LLM, and
+    guaranteed unique user_id, email, and phone_number, built from an id
+    reserved through the MCP server (see id_allocator.py).
     """
     system_prompt = (
         "You are a JSON payload generator. "
-        "Produce a JSON object with exactly these keys: "
-        "user_id (string), first_name (string), last_name (string), "
-        "email (string or null), phone_number (string or null), is_active (boolean). "
-        "Do not wrap it in any markdown or extra text—only output the JSON."
+        "Produce a JSON object for a realistic test user with exactly these keys: "
+        "first_name (string), last_name (string), is_active (boolean)."
     )
     # empty user content: we just want the structure
-    response = client.chat(
-        model="deepseek-r1:8b",
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": ""}
-        ]
-    )
-
-    # Get the raw content from the response dictionary
-    content = response['message']['content']
-    print(f"Raw LLM response: {content}")
-
-    # Extract JSON if it's wrapped in markdown code blocks
-    import re
-    json_match = re.search(r'```(?:json)?\s*([\s\S]*?)\s*```', content)
-    if json_match:
-        content = json_match.group(1)
-
-    # Try to parse the JSON
     try:
-        import uuid
-        import random
-        from datetime import datetime
-
-        # Parse initial payload from LLM
-        payload = json.loads(content)
-
-        # Generate unique values
-        timestamp = datetime.now().strftime("%m%d%H%M")
-        unique_id = uuid.uuid4().hex[:8]
-
-        # Keep the LLM-generated names but ensure unique identifiers
-        first_name = payload.get("first_name", "User")
-        last_name = payload.get("last_name", "Test")
+        generated = chat_json(
+            client,
+            "account payload",
+            model="deepseek-r1:8b",
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": ""}
+            ],
+            schema=GeneratedAccount,
+            cache=settings.LLM_CACHE_GENERATORS,
+        )
+    except ValidationError as e:
+        print(f"❌ LLM output did not match GeneratedAccount: {e}")
+        return {}
+    print(f"LLM payload: {generated.model_dump()}")
 
-        # Override with unique values
-        payload["user_id"] = f"{first_name.lower()}_{timestamp}_{unique_id}"
-        payload["email"] = f"{first_name.lower()}.{last_name.lower()}.{unique_id}@example.com"
-        # Replace the phone_number line with this:
-        payload[
-            "phone_number"] = f"+1-{random.randint(200, 999)}-{random.randint(100, 999)}-{random.randint(1000, 9999)}"
+    try:
+        # Keep the LLM-generated names; user_id, email and phone_number come from a
+        # reserved id: unique across all agents, and no server round trip unless the
+        # local block is used up
+        ids = next_account_fields(generated.first_name, generated.last_name)
+        payload = {
+            "user_id": ids["user_id"],
+            "first_name": generated.first_name,
+            "last_name": generated.last_name,
+            "email": ids["email"],
+            "phone_number": ids["phone_number"],
+            "is_active": generated.is_active,
+        }
 
         print(f"✅ Generated payload with unique values: {json.dumps(payload, indent=2)}")
         return payload
-    except json.JSONDecodeError as e:
-        print(f"❌ Failed to parse JSON from LLM: {e}")
-        print(f"Content that failed to parse: {content}")
+    except IdRangeExhausted as e:
+        print(f"❌ {e}")
+        return {}
+    except (requests.RequestException, RuntimeError) as e:
+        print(f"❌ Could not reserve unique ids from the MCP server: {e}")
         return {}
 
 def handle_open_new_account(client: Client, project: str):
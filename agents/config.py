@@ -10,6 +10,46 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     MCP_ENDPOINT: Optional[str] = "http://localhost:8000/insert_user"
     USE_MCP: Optional[str] = "false"  # Default to false, can be overridden in .env
+    MCP_WIRE_FORMAT: str = "json"  # "json" or "msgpack" for mcp_call
+
+    # ─── Test-run results (results_recorder.py) ──────────────
+    RECORD_RESULTS: bool = False
+    RESULTS_ENDPOINT: str = "http://localhost:8000/mcp"
+    RESULTS_FLUSH_INTERVAL: float = 2.0    # seconds between background flushes
+    RESULTS_FLUSH_SIZE: int = 500          # flush early once this many items are buffered
+    RESULTS_MAX_BUFFERED: int = 50000      # oldest results are dropped beyond this
+
+    # ─── Ollama client (client.py) ───────────────────────────
+    OLLAMA_PRELOAD_MODELS: str = "deepseek-r1:8b,nomic-embed-text"  # comma-separated, loaded in the background at startup
+    OLLAMA_KEEP_ALIVE: str = "60m"         # how long models stay loaded after a call; -1 = until Ollama restarts
+    OLLAMA_HEALTH_TTL: float = 60.0        # seconds a successful health check is trusted
+    OLLAMA_COLD_LOAD_MS: float = 250.0     # calls that spent longer loading the model count as cold
+    OLLAMA_REPORT_STATS: bool = True       # print cold / warm call times at exit
+
+    # ─── LLM response cache (llm_cache.py) ───────────────────
+    LLM_CACHE_ENABLED: bool = True         # off: every call runs the model
+    LLM_CACHE_MEMORY_ITEMS: int = 1000     # in-process LRU entries
+    LLM_CACHE_PATH: str = "~/.cache/qa-agents/llm_cache.sqlite3"  # empty = memory only
+    LLM_CACHE_TTL: float = 7 * 24 * 3600   # seconds a cached answer stays valid
+    LLM_CACHE_MAX_MB: float = 256.0        # least recently used answers are evicted beyond this
+    LLM_CACHE_GENERATORS: bool = False     # also cache payload generators (same payload every run)
+
+    # ─── Structured output and token budgets (structured_output.py)
+    LLM_NUM_CTX: int = 2048                # context size for every chat call and the preload
+    LLM_THINK: bool = False                # let reasoning models think at every call site
+
+    # ─── Embedding classifiers (classifiers/embedding_classifier.py)
+    EMBED_MODEL: str = "nomic-embed-text"
+    EMBED_CLASSIFIER_ENABLED: bool = True  # off: every classification asks the chat model
+    EMBED_CLASSIFIER_THRESHOLD: float = 0.6  # lowest similarity answered without the chat model
+    EMBED_CLASSIFIER_MARGIN: float = 0.03  # ...and the lead it needs over the runner-up label
+
+    # ─── Generated account ids (id_allocator.py) ─────────────
+    ID_ALLOCATOR_ENDPOINT: str = "http://localhost:8000/mcp"
+    ID_ALLOCATOR_NAME: str = "accounts"    # reserve_ids allocator shared by all agents; part of user_id / email
+    ID_PHONE_ALLOCATOR_NAME: str = "accounts"  # phone numbers' allocator; must be the same for every agent
+    ID_BLOCK_SIZE: int = 1000              # ids reserved per round trip
+    ID_PREFIX: str = "qa"                  # start of the tag in generated user_id / email
     DEVICE_ID: Optional[str] = None
     AUTH_TOKEN: Optional[str] = None
 
@@ -0,0 +1,137 @@
+# agents/id_allocator.py
+"""
+Collision-free ids for generated test accounts.
+
+The allocator reserves a block of ID_BLOCK_SIZE consecutive numbers from the
+MCP server's reserve_ids tool. It then hands them out locally, one per account,
+with no round trip until the block runs out. The server never gives the same
+number to two callers, across agent processes and server workers alike. So
+user_id, email and phone_number built from a number cannot collide with
+another account created this way, and never cost a unique-violation retry.
+
+    next_account_fields("Ada", "Lovelace")  # {"user_id": ..., "email": ..., "phone_number": ...}
+
+user_id and email carry the allocator's name, since allocators with
+different names hand out the same numbers. Phone numbers have room for
+only 7 digits of a number and no name, so they always come from
+ID_PHONE_ALLOCATOR_NAME, which every agent shares. When that is also
+ID_ALLOCATOR_NAME (the default), one number serves both and costs no extra
+round trips. Past 9,999,999 the phone numbers run out, and IdRangeExhausted
+is raised rather than building a longer number.
+
+Numbers left in a block when the process exits are never used; gaps are fine.
+"""
+import re
+import threading
+import uuid
+from typing import Dict, Optional, Tuple
+
+import requests
+
+from agents.config import settings
+
+PHONE_DIGITS = 7
+# Allocator names go into emails: none of the ":" / "." reserve_ids would also accept
+_NAME = re.compile(r"[a-z0-9_]+")
+
+
+class IdRangeExhausted(RuntimeError):
+    """A reserved number no longer fits the format it is used in."""
+
+
+class IdAllocator:
+    def __init__(self, endpoint: str, name: str, block_size: int):
+        if not _NAME.fullmatch(name):
+            raise ValueError(f"Allocator name '{name}' must be lowercase letters, digits or _")
+        self.endpoint = endpoint
+        self.name = name
+        self.block_size = block_size
+        self.reservations = 0
+        self._next = 0
+        self._end = 0  # exclusive
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        rpc_request = {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "reserve_ids",
+            "params": {"name": self.name, "count": self.block_size},
+        }
+        response = requests.post(
+            self.endpoint, json=rpc_request, headers={"X-Request-ID": uuid.uuid4().hex}, timeout=10,
+        )
+        response.raise_for_status()
+        reply = response.json()
+        if "error" in reply:
+            raise RuntimeError(f"reserve_ids failed: {reply['error']}")
+        block = reply["result"]
+        self._next, self._end = block["first"], block["first"] + block["count"]
+        self.reservations += 1
+
+    def next(self) -> int:
+        """The next unused number; reserves a new block when this one is spent."""
+        with self._lock:
+            if self._next >= self._end:
+                self._reserve()
+            n = self._next
+            self._next += 1
+            return n
+
+
+def _slug(value: Optional[str], default: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "", (value or "").lower()) or default
+
+
+def phone_number(n: int) -> str:
+    """+1 555 and n as 7 digits; IdRangeExhausted once n no longer fits."""
+    if not 0 <= n < 10 ** PHONE_DIGITS:
+        raise IdRangeExhausted(
+            f"Generated phone numbers are used up: {n} does not fit in {PHONE_DIGITS} digits after +1555"
+        )
+    return f"+1555{n:0{PHONE_DIGITS}d}"
+
+
+def account_fields(
+    allocator: str, n: int, phone_n: int, first_name: Optional[str], last_name: Optional[str]
+) -> Dict[str, str]:
+    """
+    user_id, email and phone_number for number `n` of `allocator`, with
+    number `phone_n` of the phone allocator. Each is unique because the
+    (allocator, n) pair and phone_n are, whatever the names. The dashes keep
+    them apart from accounts generated before the allocator, whose ids ended
+    in 8 hex digits.
+    """
+    first, last = _slug(first_name, "user"), _slug(last_name, "test")
+    tag = f"{settings.ID_PREFIX}-{allocator}-{n}"
+    return {
+        "user_id": f"{first}_{tag}",
+        "email": f"{first}.{last}.{tag}@example.com",
+        "phone_number": phone_number(phone_n),
+    }
+
+
+_allocator: Optional[IdAllocator] = None
+_phone_allocator: Optional[IdAllocator] = None
+_allocator_lock = threading.Lock()
+
+
+def get_allocators() -> Tuple[IdAllocator, IdAllocator]:
+    """The process-wide allocators for generated accounts and their phone numbers (possibly the same one)."""
+    global _allocator, _phone_allocator
+    with _allocator_lock:
+        if _allocator is None:
+            _allocator = IdAllocator(settings.ID_ALLOCATOR_ENDPOINT, settings.ID_ALLOCATOR_NAME, settings.ID_BLOCK_SIZE)
+            _phone_allocator = (
+                _allocator if settings.ID_PHONE_ALLOCATOR_NAME == settings.ID_ALLOCATOR_NAME
+                else IdAllocator(settings.ID_ALLOCATOR_ENDPOINT, settings.ID_PHONE_ALLOCATOR_NAME, settings.ID_BLOCK_SIZE)
+            )
+        return _allocator, _phone_allocator
+
+
+def next_account_fields(first_name: Optional[str], last_name: Optional[str]) -> Dict[str, str]:
+    """account_fields for the next reserved number(s)."""
+    allocator, phones = get_allocators()
+    n = allocator.next()
+    phone_n = n if phones is allocator else phones.next()
+    return account_fields(allocator.name, n, phone_n, first_name, last_name)
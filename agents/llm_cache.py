@@ -0,0 +1,185 @@
+# agents/llm_cache.py
+"""
+Content-addressed cache for Ollama chat calls.
+
+A call is keyed by the SHA-256 of its model, messages and the parameters that
+shape the answer (options, format, think, tools). Transport settings such as
+keep_alive are left out. Identical prompts for identical inputs are answered
+without running the model. There are two tiers:
+
+- memory: an LRU of LLM_CACHE_MEMORY_ITEMS responses, per process.
+- disk: a SQLite file at LLM_CACHE_PATH in WAL mode, shared by concurrent
+  agent processes and kept across runs. Entries expire after LLM_CACHE_TTL
+  seconds. Once the file holds more than LLM_CACHE_MAX_MB of responses, the
+  least recently used ones are evicted.
+
+Caching is opt-in per call site: `client.chat(..., cache=True)`. Classifiers,
+whose answer for a given input should never change, opt in. Payload generators
+want fresh output each time, so they only opt in with LLM_CACHE_GENERATORS.
+`stats()` reports hits per tier, misses and evictions.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from ollama import ChatResponse
+
+from agents.config import settings
+
+# chat() parameters that change the answer; everything else is transport
+KEY_PARAMS = ("options", "format", "think", "tools")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chat_cache (
+    key      TEXT PRIMARY KEY,
+    created  REAL NOT NULL,
+    accessed REAL NOT NULL,
+    size     INTEGER NOT NULL,
+    response TEXT NOT NULL
+)
+"""
+
+
+def cache_key(model: str, messages, params: Mapping[str, Any]) -> str:
+    material = {"model": model, "messages": messages}
+    material.update({k: params[k] for k in KEY_PARAMS if params.get(k) is not None})
+    # Message / Options models and tool callables serialise too
+    canonical = json.dumps(material, sort_keys=True, separators=(",", ":"), default=_plain)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _plain(value):
+    if hasattr(value, "model_dump"):
+        return value.model_dump(exclude_none=True)
+    return str(value)
+
+
+class ChatCache:
+    def __init__(self, memory_items: int, path: Optional[str], ttl: float, max_bytes: int):
+        self.memory_items = memory_items
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._memory: "OrderedDict[str, Tuple[ChatResponse, float]]" = OrderedDict()  # key -> (response, expires)
+        self._lock = threading.Lock()
+        self._counts = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5.0)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(SCHEMA)
+            self._db.execute("CREATE INDEX IF NOT EXISTS chat_cache_accessed_idx ON chat_cache (accessed)")
+            self._db.execute("DELETE FROM chat_cache WHERE created < ?", (time.time() - ttl,))
+
+    # ─── Lookup ─────────────────────────────────────────────────
+    def get(self, key: str) -> Optional[ChatResponse]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[1] > now:
+                self._memory.move_to_end(key)
+                self._counts["memory_hits"] += 1
+                return entry[0]
+            response = self._disk_get(key, now)
+            if response is None:
+                self._counts["misses"] += 1
+                return None
+            self._counts["disk_hits"] += 1
+            return response
+
+    def _disk_get(self, key: str, now: float) -> Optional[ChatResponse]:
+        if self._db is None:
+            return None
+        row = self._db.execute(
+            "SELECT created, response FROM chat_cache WHERE key = ? AND created >= ?", (key, now - self.ttl)
+        ).fetchone()
+        if row is None:
+            return None
+        self._db.execute("UPDATE chat_cache SET accessed = ? WHERE key = ?", (now, key))
+        response = ChatResponse.model_validate_json(row[1])
+        self._remember(key, response, row[0] + self.ttl)
+        return response
+
+    # ─── Store ──────────────────────────────────────────────────
+    def put(self, key: str, response: ChatResponse):
+        now = time.time()
+        with self._lock:
+            self._remember(key, response, now + self.ttl)
+            self._counts["stores"] += 1
+            if self._db is not None:
+                body = response.model_dump_json(exclude_none=True)
+                self._db.execute(
+                    "INSERT OR REPLACE INTO chat_cache (key, created, accessed, size, response) VALUES (?, ?, ?, ?, ?)",
+                    (key, now, now, len(body.encode("utf-8")), body),
+                )
+                self._evict()
+
+    def _remember(self, key: str, response: ChatResponse, expires: float):
+        self._memory[key] = (response, expires)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _evict(self):
+        # Other processes write too, so measure the file's contents rather than tracking a total
+        (total,) = self._db.execute("SELECT coalesce(sum(size), 0) FROM chat_cache").fetchone()
+        if total <= self.max_bytes:
+            return
+        # Down to 90%, so a full cache doesn't evict on every store
+        excess = total - int(self.max_bytes * 0.9)
+        # Least recently used first, until `excess` bytes are gone
+        evicted = self._db.execute(
+            "DELETE FROM chat_cache WHERE key IN ("
+            "  SELECT key FROM ("
+            "    SELECT key, sum(size) OVER (ORDER BY accessed, key) - size AS before FROM chat_cache"
+            "  ) WHERE before < ?"
+            ")",
+            (excess,),
+        ).rowcount
+        self._counts["evictions"] += evicted
+
+    # ─── Stats ──────────────────────────────────────────────────
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+            counts["memory_items"] = len(self._memory)
+        lookups = counts["memory_hits"] + counts["disk_hits"] + counts["misses"]
+        counts["hit_rate"] = round((counts["memory_hits"] + counts["disk_hits"]) / lookups, 4) if lookups else None
+        if self._db is not None:
+            with self._lock:
+                counts["disk_items"], counts["disk_bytes"] = self._db.execute(
+                    "SELECT count(*), coalesce(sum(size), 0) FROM chat_cache"
+                ).fetchone()
+        return counts
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM chat_cache")
+
+
+_cache: Optional[ChatCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> Optional[ChatCache]:
+    """The process-wide cache, or None when LLM_CACHE_ENABLED is off."""
+    global _cache
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ChatCache(
+                memory_items=settings.LLM_CACHE_MEMORY_ITEMS,
+                path=os.path.expanduser(settings.LLM_CACHE_PATH) if settings.LLM_CACHE_PATH else None,
+                ttl=settings.LLM_CACHE_TTL,
+                max_bytes=int(settings.LLM_CACHE_MAX_MB * 1024 * 1024),
+            )
+        return _cache
@@ -1,7 +1,8 @@
-from client import get_ollama_client
+from agents.client import get_ollama_client
 from agents.classifiers.intent_classifier import classify_intent_via_llm
 from agents.classifiers.project_classifier import classify_project_via_llm
 from agents.classifiers.action_classifier import classify_action_via_llm
+from agents.classifiers.request_classifier import classify_request
 from agents.common_actions import (
     handle_add_data,
     handle_do_curl,
@@ -34,33 +35,16 @@ def main():
         print(err)
         return
 
-    # # Step 1: Ask and classify intent
+    # # Steps 1-3: intent, project and action from one request (follow-ups only for missing slots)
     # user_input = input("Hello, Friday! 🤖\nWhat do you want to do today?\n>>")
     # try:
-    #     intent = classify_intent_via_llm(client, user_input)
-    #     print(f"👉 Detected intent: {intent}")
-    # except ResponseError as err:
-    #     print(f"Ollama error ({err.status_code}): {err.error}")
-    #     return
-    #
-    # # Step 2: Ask and classify project
-    # project_input = input("Which project would you like to work on?\n>>")
-    # try:
-    #     project = classify_project_via_llm(client, project_input)
-    #     print(f"🎯 You chose to do **{intent}** on project **{project}**.")
-    # except ResponseError as err:
-    #     print(f"Ollama error ({err.status_code}): {err.error}")
-    #
-    # # Step 3: Classify action
-    # action_input = input(
-    #     "What would you like to do first? (add data, do a curl, open a new account)\n>>"
-    # )
-    # try:
-    #     action = classify_action_via_llm(client, action_input)
-    #     print(f"🚀 Next action: {action}")
+    #     slots = classify_request(client, user_input)
     # except ResponseError as err:
     #     print(f"Ollama error ({err.status_code}): {err.error}")
     #     return
+    # intent, project, action = slots["intent"], slots["project"], slots["action"]
+    # print(f"🎯 You chose to do **{intent}** on project **{project}**.")
+    # print(f"🚀 Next action: {action}")
     #
     # # Step 4: Execute chosen action
     # if action == "add data":
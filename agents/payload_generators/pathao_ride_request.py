@@ -1,12 +1,14 @@
 import json
-import re
 import time
 import random
 import requests
 from typing import Dict, List
 from dataclasses import dataclass
 from ollama import Client, ResponseError
+from pydantic import BaseModel, ValidationError
 from agents.config import settings
+from agents.results_recorder import http
+from agents.structured_output import chat_json
 
 @dataclass
 class PathaoConfig:
@@ -19,6 +21,18 @@ class PathaoConfig:
         "/api/v1/pathao/raw-ride-request"
     )
 
+class RideRequestPayload(BaseModel):
+    fare: str
+    bonus: str
+    pickup_location: str
+    destination_location: str
+    distance: str
+    is_surge: bool
+    coordinates: str
+    device_id: str
+    timestamp: int
+
+
 class PathaoPayloadGenerator:
     """LLM-backed and fallback payload generator for Pathao ride requests."""
 
@@ -50,30 +64,25 @@ class PathaoPayloadGenerator:
             "Output ONLY the JSON object—no markdown or extra text."
         )
 
-    def _extract_json(self, text: str) -> str:
-        m = re.search(r'```(?:json)?\s*([\s\S]*?)\s*```', text)
-        if m: return m.group(1).strip()
-        m2 = re.search(r'\{[\s\S]*\}', text)
-        return m2.group(0).strip() if m2 else text.strip()
-
     def generate_via_llm(self) -> Dict:
         """Ask the LLM for a payload; fallback to random if parsing fails."""
         try:
-            resp = self.client.chat(
+            payload = chat_json(
+                self.client,
+                "ride request payload",
                 model="deepseek-r1:8b",
                 messages=[
                     {"role":"system","content":self._system_prompt()},
                     {"role":"user","content":"Please generate one payload."}
-                ]
-            )
-            content = resp.message.content
-            json_str = self._extract_json(content)
-            payload = json.loads(json_str)
+                ],
+                schema=RideRequestPayload,
+                cache=settings.LLM_CACHE_GENERATORS,
+            ).model_dump()
             # override dynamic fields
             payload["device_id"] = self.config.device_id
             payload["timestamp"] = int(time.time() * 1000)
             return payload
-        except (ResponseError, json.JSONDecodeError, KeyError) as e:
+        except (ResponseError, ValidationError, KeyError) as e:
             print(f"❌ LLM failed, using fallback: {e}")
             return self._fallback_payload()
 
@@ -105,7 +114,7 @@ class PathaoPayloadGenerator:
         }
         print(f"\n🚀 Sending POST {self.config.base_url}\nHeaders: {headers}\nPayload:\n{json.dumps(payload, indent=2)}")
         try:
-            r = requests.post(self.config.base_url, headers=headers, json=payload, timeout=10)
+            r = http.post(self.config.base_url, headers=headers, json=payload, timeout=10)
             r.raise_for_status()
             print("✅ Success:", r.json())
             return True
@@ -1,11 +1,22 @@
 import json
 import random
 import time
-import re
 import requests
 from typing import Dict
 from ollama import Client, ResponseError
+from pydantic import BaseModel, ValidationError
 from agents.config import settings
+from agents.results_recorder import http
+from agents.structured_output import chat_json
+
+
+class RideStartedPayload(BaseModel):
+    coordinates: str
+    destination_location: str
+    device_id: str
+    event: str
+    timestamp: int
+
 
 class PathaoRideStartedGenerator:
     """LLM-backed and fallback payload generator for Pathao ride_started events."""
@@ -44,34 +55,26 @@ class PathaoRideStartedGenerator:
             "Output ONLY the JSON object—no markdown or extra text."
         )
 
-    def _extract_json(self, text: str) -> str:
-        # Try fenced JSON first
-        m = re.search(r'```(?:json)?\s*([\s\S]*?)\s*```', text)
-        if m:
-            return m.group(1).strip()
-        # Fallback to first {...}
-        m2 = re.search(r'\{[\s\S]*\}', text)
-        return m2.group(0).strip() if m2 else text.strip()
-
     def generate_via_llm(self) -> Dict:
         """Ask the LLM for a ride_started payload; fallback on error."""
         try:
-            resp = self.client.chat(
+            payload = chat_json(
+                self.client,
+                "ride started payload",
                 model="deepseek-r1:8b",
                 messages=[
                     {"role": "system", "content": self._system_prompt()},
                     {"role": "user",   "content": "Please generate one ride_started payload."}
-                ]
-            )
-            content = resp.message.content
-            json_str = self._extract_json(content)
-            payload = json.loads(json_str)
+                ],
+                schema=RideStartedPayload,
+                cache=settings.LLM_CACHE_GENERATORS,
+            ).model_dump()
             # enforce our dynamic fields
             payload["device_id"] = self.config.device_id
             payload["event"] = "ride_started"
             payload["timestamp"] = int(time.time() * 1000)
             return payload
-        except (ResponseError, json.JSONDecodeError, KeyError) as e:
+        except (ResponseError, ValidationError, KeyError) as e:
             print(f"❌ LLM failed, using fallback: {e}")
             return self._fallback_payload()
 
@@ -96,7 +99,7 @@ class PathaoRideStartedGenerator:
         }
         print(f"🚀 Sending POST {self.config.base_url}\nPayload:\n{json.dumps(payload, indent=2)}")
         try:
-            r = requests.post(
+            r = http.post(
                 self.config.base_url,
                 headers=headers,
                 json=payload,
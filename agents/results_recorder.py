@@ -0,0 +1,268 @@
+# agents/results_recorder.py
+"""
+Buffered recorder for QA test results: runs, their steps, and the timing of
+every HTTP request made inside a step through the `http` session.
+
+Recording only appends to an in-memory buffer. A background thread sends the
+buffer to the MCP server every RESULTS_FLUSH_INTERVAL seconds, or as soon as
+RESULTS_FLUSH_SIZE items are waiting, as one JSON-RPC batch (record_test_runs,
+record_test_steps, record_request_timings). The test itself never waits on the
+results store. A flush that fails is retried on the next tick; at most
+RESULTS_MAX_BUFFERED items are kept, oldest dropped first. Retrying is safe
+even when the failed flush was stored: runs are upserted by run_id, and every
+step and timing carries a record_id the server stores once.
+
+    recorder = get_recorder()
+    with recorder.run("verify_trip_increment", project=project) as run:
+        with run.step("summary_before"):
+            ...              # http.get / post calls in here are timed too
+        with run.step("verify") as step:
+            if not ok:
+                step.fail("totalTrips did not increment")
+
+Set RECORD_RESULTS=true to enable it; otherwise runs and steps are no-ops.
+"""
+import atexit
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import requests
+
+from agents.config import settings
+
+# JSON-RPC errors worth retrying: server busy / rate limited
+RETRYABLE_CODES = (-32003, -32004)
+
+_context = threading.local()  # .run / .step of the test running on this thread
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class StepRecorder:
+    def __init__(self, run: "RunRecorder", name: str):
+        self.run = run
+        self.name = name
+        self.status = "passed"
+        self.detail: Optional[Dict[str, Any]] = None
+
+    def fail(self, reason: Optional[str] = None, status: str = "failed"):
+        """Mark the step (and so its run) failed without raising."""
+        self.status = status
+        if reason:
+            self.detail = {**(self.detail or {}), "reason": reason}
+        self.run.status = "failed"
+
+
+class RunRecorder:
+    def __init__(self, recorder: "ResultsRecorder", name: str, project: Optional[str]):
+        self.recorder = recorder
+        self.run_id = uuid.uuid4().hex
+        self.name = name
+        self.project = project
+        self.status = "passed"
+        self.started_at = _now()
+
+    def _record(self, status: str, finished_at: Optional[str] = None, metadata: Optional[Dict] = None):
+        self.recorder.add("record_test_runs", {
+            "run_id": self.run_id, "name": self.name, "project": self.project, "status": status,
+            "started_at": self.started_at, "finished_at": finished_at, "metadata": metadata,
+        })
+
+    @contextmanager
+    def step(self, name: str):
+        """Time a step; an exception marks it (and the run) as error and propagates."""
+        step = StepRecorder(self, name)
+        started_at = _now()
+        start = time.perf_counter()
+        _context.step = name
+        try:
+            yield step
+        except Exception as e:
+            step.fail(repr(e), status="error")
+            self.status = "error"
+            raise
+        finally:
+            _context.step = None
+            self.recorder.add("record_test_steps", {
+                "run_id": self.run_id, "step": name, "status": step.status, "started_at": started_at,
+                "duration_ms": (time.perf_counter() - start) * 1000, "detail": step.detail,
+                "record_id": uuid.uuid4().hex,
+            })
+
+
+class ResultsRecorder:
+    def __init__(
+        self,
+        endpoint: str,
+        flush_interval: float,
+        flush_size: int,
+        max_buffered: int,
+        enabled: bool = True,
+    ):
+        self.endpoint = endpoint
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.enabled = enabled
+        self.dropped = 0
+        self._buffer: Deque[Tuple[str, Dict]] = deque(maxlen=max_buffered)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self._session = requests.Session()
+
+    # ─── Recording (test thread) ────────────────────────────────
+    def add(self, method: str, item: Dict):
+        if not self.enabled:
+            return
+        with self._lock:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1
+            self._buffer.append((method, item))
+            size = len(self._buffer)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._flush_loop, name="results-recorder", daemon=True)
+                self._thread.start()
+        if size >= self.flush_size:
+            self._wake.set()
+
+    @contextmanager
+    def run(self, name: str, project: Optional[str] = None, metadata: Optional[Dict] = None):
+        """
+        Record one test run. Its final status is passed, failed (a step called
+        fail()) or error (an exception escaped); set `run.status` to override.
+        """
+        run = RunRecorder(self, name, project)
+        run._record("running", metadata=metadata)
+        _context.run = run
+        try:
+            yield run
+        except Exception:
+            run.status = "error"
+            raise
+        finally:
+            _context.run = None
+            run._record(run.status, finished_at=_now())
+
+    # ─── Flushing (background thread) ───────────────────────────
+    def _flush_loop(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Send everything buffered as one JSON-RPC batch; failed items go back for the next try."""
+        with self._lock:
+            items = list(self._buffer)
+            self._buffer.clear()
+        if not items:
+            return
+
+        grouped: Dict[str, List[Dict]] = {}
+        for method, item in items:
+            grouped.setdefault(method, []).append(item)
+        field = {"record_test_runs": "runs", "record_test_steps": "steps", "record_request_timings": "timings"}
+        batch = [
+            {"jsonrpc": "2.0", "id": i, "method": method, "params": {field[method]: rows}}
+            for i, (method, rows) in enumerate(grouped.items())
+        ]
+
+        retry: List[Tuple[str, Dict]] = []
+        try:
+            response = self._session.post(self.endpoint, json=batch, timeout=10)
+            if response.status_code == 429:
+                raise requests.HTTPError("results store busy (429)")
+            response.raise_for_status()
+            for reply in response.json():
+                error = reply.get("error")
+                if error is None:
+                    continue
+                method = batch[reply["id"]]["method"]
+                if error.get("code") in RETRYABLE_CODES:
+                    retry.extend((method, row) for row in grouped[method])
+                else:
+                    # Bad data won't get better on retry
+                    print(f"⚠️ Results store rejected {method}: {error.get('message')}")
+        except Exception as e:
+            print(f"⚠️ Could not flush {len(items)} test results, will retry: {e}")
+            retry = items
+
+        if retry:
+            with self._lock:
+                # Put them back ahead of anything recorded meanwhile. extendleft on a full
+                # deque would drop the newest, so rebuild it and let maxlen drop the oldest.
+                pending = retry + list(self._buffer)
+                self.dropped += max(0, len(pending) - self._buffer.maxlen)
+                self._buffer = deque(pending, maxlen=self._buffer.maxlen)
+
+    def close(self):
+        """Stop the flush thread and send whatever is still buffered."""
+        self._closed = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 10)
+        self.flush()
+
+
+# ─── Per-request timing ─────────────────────────────────────────
+class TimedSession(requests.Session):
+    """
+    A Session whose requests are recorded as timings when they are made inside
+    a recorded run; outside one it is a plain Session. Only calls made through
+    it are timed, so other sessions (the recorder's own flushes included) and
+    anything else using requests in the process are left alone.
+    """
+
+    def send(self, request, **kwargs):
+        run = getattr(_context, "run", None)
+        if run is None:
+            return super().send(request, **kwargs)
+        started_at = _now()
+        start = time.perf_counter()
+        status_code = None
+        try:
+            response = super().send(request, **kwargs)
+            status_code = response.status_code
+            return response
+        finally:
+            run.recorder.add("record_request_timings", {
+                "run_id": run.run_id,
+                "step": getattr(_context, "step", None),
+                "method": request.method,
+                # Without the query string, so timings of one endpoint trend together
+                "url": request.url.split("?", 1)[0],
+                "status_code": status_code,
+                "started_at": started_at,
+                "duration_ms": (time.perf_counter() - start) * 1000,
+                "record_id": uuid.uuid4().hex,
+            })
+
+
+# Shared by the actions whose requests should show up in the results store
+http = TimedSession()
+
+
+_recorder: Optional[ResultsRecorder] = None
+
+
+def get_recorder() -> ResultsRecorder:
+    """The process-wide recorder, flushed once more at exit."""
+    global _recorder
+    if _recorder is None:
+        _recorder = ResultsRecorder(
+            endpoint=settings.RESULTS_ENDPOINT,
+            flush_interval=settings.RESULTS_FLUSH_INTERVAL,
+            flush_size=settings.RESULTS_FLUSH_SIZE,
+            max_buffered=settings.RESULTS_MAX_BUFFERED,
+            enabled=settings.RECORD_RESULTS,
+        )
+        atexit.register(_recorder.close)
+    return _recorder
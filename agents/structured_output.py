@@ -0,0 +1,98 @@
+# agents/structured_output.py
+"""
+Schema-constrained JSON answers and per-call-site token budgets.
+
+`chat_json(client, site, model, messages, Schema)` sends Schema's JSON schema
+as Ollama's `format`, so the model can only produce a matching object. The
+result is validated into a Schema instance, which means no fence, `<think>`
+or `{...}` scraping afterwards. A reply that still doesn't validate (e.g. cut
+off by num_predict) raises pydantic.ValidationError. `chat_label` is the
+variant for classifiers: it returns the `label` field, or None for such a
+reply, so callers can treat it as unrecognised input.
+
+Every call site has a Budget in BUDGETS:
+
+- num_predict caps the answer, sized to the answer the site needs.
+- num_ctx is shared by default (LLM_NUM_CTX). Ollama reloads a model whose
+  context size changes, so a site should only differ when its prompt needs it.
+- think is off unless LLM_THINK is set. Reasoning models then answer directly
+  instead of spending hundreds of tokens on a trace nobody reads.
+
+`budget(site)` gives the same options for calls that parse the reply
+themselves.
+"""
+from typing import Any, Dict, List, Literal, NamedTuple, Optional, Type, TypeVar
+
+from ollama import Client
+from pydantic import BaseModel, ValidationError, create_model
+
+from agents.client import cached_chat
+from agents.config import settings
+
+T = TypeVar("T", bound=BaseModel)
+
+
+class Budget(NamedTuple):
+    num_predict: int
+    num_ctx: Optional[int] = None   # None: LLM_NUM_CTX
+    think: bool = False
+
+
+BUDGETS: Dict[str, Budget] = {
+    # one label as {"label": "..."}
+    "intent": Budget(num_predict=32),
+    "project": Budget(num_predict=32),
+    "action": Budget(num_predict=32),
+    "pathao intent": Budget(num_predict=32),
+    # three labels or nulls
+    "request slots": Budget(num_predict=96),
+    # names only; the ids are allocated
+    "account payload": Budget(num_predict=64),
+    # a flat payload of up to 9 fields
+    "ride request payload": Budget(num_predict=320),
+    "ride started payload": Budget(num_predict=256),
+    "trip finished payload": Budget(num_predict=256),
+}
+
+
+def budget(site: str) -> Dict[str, Any]:
+    """chat() keyword arguments (options, think) for call site `site`."""
+    b = BUDGETS[site]
+    return {
+        "options": {"num_predict": b.num_predict, "num_ctx": b.num_ctx or settings.LLM_NUM_CTX},
+        "think": b.think or settings.LLM_THINK,
+    }
+
+
+def label_schema(name: str, labels: List[str]) -> Type[BaseModel]:
+    """A model whose only field, `label`, must be one of `labels`."""
+    return create_model(name, label=(Literal[tuple(labels)], ...))
+
+
+def chat_json(
+    client: Client, site: str, model: str, messages: List[Dict], schema: Type[T], cache: bool = False
+) -> T:
+    """
+    The model's answer for `messages`, constrained to and validated as `schema`.
+    `cache` only applies to an OllamaClient (see client.cached_chat).
+    """
+    response = cached_chat(
+        client,
+        cache,
+        model=model,
+        messages=messages,
+        format=schema.model_json_schema(),
+        **budget(site),
+    )
+    return schema.model_validate_json(response.message.content)
+
+
+def chat_label(
+    client: Client, site: str, model: str, messages: List[Dict], schema: Type[BaseModel], cache: bool = False
+) -> Optional[str]:
+    """chat_json for a label_schema: the label, or None when the reply isn't a valid one."""
+    try:
+        return chat_json(client, site, model, messages, schema, cache).label
+    except ValidationError as e:
+        print(f"⚠️ {site}: the model's answer was not a valid label ({e.error_count()} errors)")
+        return None
@@ -0,0 +1,182 @@
+# app/admission.py
+"""
+Admission control in front of the database paths (/mcp, /insert_user,
+/bulk/insert_credentials).
+
+- Per-client token bucket: ADMISSION_RATE requests/s with bursts of up to
+  ADMISSION_BURST. Clients are keyed by their peer address. The X-Client-ID
+  header is only used when the peer is one of ADMISSION_TRUSTED_PROXIES, to
+  tell apart the callers of a proxy that authenticated them; anyone else
+  could dodge the limit with a fresh id per request. A rate of 0 disables
+  the limit.
+- Global cap: at most ADMISSION_MAX_IN_FLIGHT requests do database work at
+  once. Up to ADMISSION_MAX_QUEUED more wait for a slot, each for at most
+  ADMISSION_QUEUE_TIMEOUT seconds. Beyond that, requests are turned away
+  immediately.
+
+Rejected requests get a 429 with Retry-After, or a JSON-RPC -32003 (server
+busy) / -32004 (rate limited) error with `data.retry_after`. Refusing excess
+work up front keeps admitted requests at full speed, instead of letting every
+request queue on the pool until all of them time out.
+"""
+import asyncio
+import ipaddress
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Union
+
+from starlette.requests import Request
+
+from .cache import TTLCache
+from .config import settings
+from .metrics import ADMISSION_REJECTED, gauge_collector, observe_phase
+
+SERVER_BUSY = -32003
+RATE_LIMITED = -32004
+
+
+class Rejected(Exception):
+    """Request turned away before doing any database work."""
+
+    def __init__(self, reason: str, retry_after: float):
+        self.reason = reason  # "busy" or "rate_limited"
+        self.retry_after = round(retry_after, 3)
+        self.code = SERVER_BUSY if reason == "busy" else RATE_LIMITED
+        self.message = "Server busy" if reason == "busy" else "Rate limit exceeded"
+        super().__init__(f"{self.message}, retry after {self.retry_after}s")
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        # Retry-After takes whole seconds
+        return {"Retry-After": str(max(1, math.ceil(self.retry_after)))}
+
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Take one token; returns 0, or the seconds until a token is available."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    def __init__(self, rate: float, burst: float, max_clients: int):
+        self.rate = rate
+        self.burst = burst
+        # An idle bucket is full again after burst / rate seconds, so dropping
+        # it then (or when the LRU is full) loses nothing
+        self._buckets = TTLCache(max_clients, burst / rate)
+
+    def check(self, client: str):
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = TokenBucket(self.rate, self.burst)
+        wait = bucket.take()
+        self._buckets.put(client, bucket)
+        if wait:
+            ADMISSION_REJECTED.inc("rate_limited")
+            raise Rejected("rate_limited", wait)
+
+
+class Gate:
+    """Concurrency cap with a bounded, time-limited wait for a slot."""
+
+    def __init__(self, max_in_flight: int, max_queued: int, queue_timeout: float):
+        self.max_in_flight = max_in_flight
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.queued = 0
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._hold = 0.01  # moving average of seconds a slot is held
+
+    def retry_after(self) -> float:
+        # Roughly how long until the current queue has drained
+        return max(self._hold, self._hold * (self.queued + 1) / self.max_in_flight)
+
+    def _busy(self) -> Rejected:
+        ADMISSION_REJECTED.inc("busy")
+        return Rejected("busy", self.retry_after())
+
+    @asynccontextmanager
+    async def slot(self):
+        if self._slots.locked():
+            if self.queued >= self.max_queued:
+                raise self._busy()
+            self.queued += 1
+            start = time.perf_counter()
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                raise self._busy()
+            finally:
+                self.queued -= 1
+            observe_phase("admission_wait", time.perf_counter() - start)
+        else:
+            await self._slots.acquire()
+
+        self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._hold += 0.1 * ((time.perf_counter() - start) - self._hold)
+            self._slots.release()
+
+
+def _networks(spec: str) -> List[Union[ipaddress.IPv4Network, ipaddress.IPv6Network]]:
+    return [ipaddress.ip_network(part.strip(), strict=False) for part in spec.split(",") if part.strip()]
+
+
+trusted_proxies = _networks(settings.ADMISSION_TRUSTED_PROXIES)
+
+
+def _trusted(host: str) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in trusted_proxies)
+
+
+def client_key(request: Request) -> str:
+    host = request.client.host if request.client else "unknown"
+    client_id = request.headers.get("x-client-id")
+    if client_id and _trusted(host):
+        # Still under the proxy's address, and bounded so ids can't bloat the buckets
+        return f"{host} {client_id[:128]}"
+    return host
+
+
+limiter: Optional[RateLimiter] = (
+    RateLimiter(settings.ADMISSION_RATE, settings.ADMISSION_BURST, settings.ADMISSION_MAX_CLIENTS)
+    if settings.ADMISSION_RATE > 0 else None
+)
+gate = Gate(settings.ADMISSION_MAX_IN_FLIGHT, settings.ADMISSION_MAX_QUEUED, settings.ADMISSION_QUEUE_TIMEOUT)
+
+
+def check_rate(request: Request):
+    """Charge the caller one request; raises Rejected when over its rate."""
+    if limiter is not None:
+        limiter.check(client_key(request))
+
+
+@gauge_collector
+def _admission_gauges():
+    yield "mcp_admission_in_flight", "Requests holding a database slot", {}, gate.in_flight
+    yield "mcp_admission_queued", "Requests waiting for a database slot", {}, gate.queued
+    yield "mcp_admission_max_in_flight", "Configured database slot cap", {}, gate.max_in_flight
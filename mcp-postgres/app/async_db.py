@@ -0,0 +1,89 @@
+# app/async_db.py
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+import asyncpg
+
+from .config import settings
+from . import metrics, slow_queries, tracing
+
+logger = logging.getLogger(__name__)
+
+
+# one global asyncpg pool for the async MCP handlers, opened on app startup
+pool: Optional[asyncpg.Pool] = None
+
+
+async def open_pool() -> asyncpg.Pool:
+    """
+    Open the async pool. search_path is passed as a startup parameter, so it is
+    set once per physical connection and survives the pool's RESET ALL on release.
+    Every new connection gets the slow-statement logger. The registered MCP
+    statements are prepared by asyncpg's statement cache on first use.
+    """
+    global pool
+    if pool is None:
+        pool = await asyncpg.create_pool(
+            settings.DATABASE_URL,
+            min_size=settings.ASYNC_DB_POOL_MIN_SIZE,
+            max_size=settings.ASYNC_DB_POOL_MAX_SIZE,
+            max_inactive_connection_lifetime=settings.ASYNC_DB_POOL_MAX_IDLE,
+            server_settings={
+                "search_path": settings.DB_SCHEMA_NAME,
+                "application_name": settings.DB_APPLICATION_NAME,
+            },
+            init=_init_connection,
+        )
+        logger.info(
+            f"Async database pool opened (min={pool.get_min_size()}, max={pool.get_max_size()})"
+        )
+    return pool
+
+
+async def _init_connection(conn):
+    slow_queries.watch(conn)
+
+
+async def close_pool():
+    global pool
+    if pool is not None:
+        await pool.close()
+        pool = None
+
+
+@asynccontextmanager
+async def acquire():
+    """
+    Check out a connection, waiting at most DB_POOL_TIMEOUT seconds. It carries
+    the request id in application_name until the pool's RESET ALL on release.
+    """
+    start = time.perf_counter()
+    conn = await pool.acquire(timeout=settings.DB_POOL_TIMEOUT)
+    try:
+        await tracing.tag_connection(conn)
+        metrics.observe_phase("pool_wait", time.perf_counter() - start)
+        yield conn
+    finally:
+        await pool.release(conn)
+
+
+def stats() -> Dict[str, float]:
+    if pool is None:
+        return {}
+    size, idle = pool.get_size(), pool.get_idle_size()
+    return {
+        "min_size": pool.get_min_size(),
+        "max_size": pool.get_max_size(),
+        "size": size,
+        "idle": idle,
+        "in_use": size - idle,
+        "saturation": round((size - idle) / pool.get_max_size(), 4),
+    }
+
+
+@metrics.gauge_collector
+def _pool_gauges():
+    for key, value in stats().items():
+        yield f"db_pool_{key}", f"Connection pool {key}", {"pool": "async"}, value
@@ -0,0 +1,168 @@
+# app/bulk.py
+import asyncio
+import csv
+import json
+import logging
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from pydantic import ValidationError
+
+from .config import settings
+from .schemas import InsertCredentialsRequest
+from . import reads, storage
+
+logger = logging.getLogger(__name__)
+
+
+class CopyLoader:
+    """
+    Validates rows against InsertCredentialsRequest in chunks and streams
+    the valid ones to the storage backend's bulk load
+    (`COPY user_login_credentials FROM STDIN` on Postgres).
+
+    The backend pulls chunks from an async generator as it writes them, so
+    the source is read only as fast as the database accepts data and the
+    upload is never buffered in full. The load is all-or-nothing at the
+    database level; rows that fail validation are skipped and reported by
+    row number.
+    """
+
+    def __init__(self, chunk_size: Optional[int] = None, on_progress: Optional[Callable[[int], None]] = None):
+        self.chunk_size = chunk_size or settings.BULK_CHUNK_SIZE
+        # Called with the number of rows handled so far, after each chunk is written
+        self.on_progress = on_progress
+        self.accepted = 0
+        self.rejected = 0
+        self.rejected_rows: List[Dict] = []
+
+    def reject(self, row_number: int, error: str):
+        self.rejected += 1
+        if len(self.rejected_rows) < settings.BULK_MAX_REPORTED_ERRORS:
+            self.rejected_rows.append({"row": row_number, "error": error})
+
+    async def _valid_chunks(
+        self, rows: AsyncIterator[Tuple[int, object]]
+    ) -> AsyncIterator[List[InsertCredentialsRequest]]:
+        pending: List[InsertCredentialsRequest] = []
+        async for row_number, raw in rows:
+            try:
+                if isinstance(raw, Exception):
+                    raise raw
+                if not isinstance(raw, dict):
+                    raise ValueError("Row must be an object")
+                pending.append(InsertCredentialsRequest(**raw))
+            except (ValidationError, ValueError, TypeError) as e:
+                self.reject(row_number, str(e))
+                continue
+            if len(pending) >= self.chunk_size:
+                yield pending
+                self.accepted += len(pending)
+                pending = []
+                await self._chunk_written()
+        if pending:
+            yield pending
+            self.accepted += len(pending)
+            await self._chunk_written()
+
+    async def _chunk_written(self):
+        if self.on_progress is not None:
+            self.on_progress(self.accepted + self.rejected)
+        # Validation is CPU-bound and the driver only awaits when its socket
+        # buffer is full: yield so other requests aren't starved for the whole load
+        await asyncio.sleep(0)
+
+    async def load(self, rows: AsyncIterator[Tuple[int, object]]) -> Dict:
+        try:
+            copied = await storage.backend.copy_credentials(self._valid_chunks(rows))
+            # New rows only affect list pages; cached lookups stay valid
+            reads.invalidate()
+            return self.report(copied=copied)
+        except Exception as e:
+            logger.error(f"Bulk load failed: {e}")
+            return self.report(error=str(e))
+
+    def report(self, copied: int = 0, error: Optional[str] = None) -> Dict:
+        report = {
+            "copied": copied,
+            "accepted": self.accepted if error is None else 0,
+            "rejected": self.rejected,
+            "rejected_rows": self.rejected_rows,
+        }
+        if error is not None:
+            report["error"] = error
+        return report
+
+
+# ─── Body parsers ─────────────────────────────────────────────
+def _decode(line: bytes) -> Union[str, ValueError]:
+    # A line that isn't UTF-8 becomes that row's rejection, not the end of the load
+    try:
+        return line.decode("utf-8").rstrip("\r")
+    except UnicodeDecodeError as e:
+        return ValueError(f"Invalid UTF-8 at byte {e.start}: {e.reason}")
+
+
+async def _iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[Union[str, ValueError]]:
+    tail = b""
+    async for chunk in stream:
+        tail += chunk
+        *lines, tail = tail.split(b"\n")
+        for line in lines:
+            yield _decode(line)
+    if tail:
+        yield _decode(tail)
+
+
+async def _iter_ndjson(stream: AsyncIterator[bytes]):
+    row_number = 0
+    async for line in _iter_lines(stream):
+        if isinstance(line, ValueError):
+            row_number += 1
+            yield row_number, line
+            continue
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            yield row_number, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row_number, ValueError(f"Invalid JSON: {e}")
+
+
+async def _iter_csv(stream: AsyncIterator[bytes]):
+    """CSV with a header row naming the columns; one record per line."""
+    header = None
+    row_number = 0
+    async for line in _iter_lines(stream):
+        if isinstance(line, ValueError):
+            if header is None:
+                raise ValueError(f"CSV header: {line}")
+            row_number += 1
+            yield row_number, line
+            continue
+        if not line.strip():
+            continue
+        values = next(csv.reader([line]))
+        if header is None:
+            header = [h.strip() for h in values]
+            continue
+        row_number += 1
+        if len(values) != len(header):
+            yield row_number, ValueError(f"Expected {len(header)} columns, got {len(values)}")
+            continue
+        # Empty CSV cells mean "not provided" so optional fields fall back to defaults
+        yield row_number, {k: v for k, v in zip(header, values) if v != ""}
+
+
+async def bulk_load_stream(stream: AsyncIterator[bytes], fmt: str) -> Dict:
+    """Stream an NDJSON or CSV body into user_login_credentials via COPY."""
+    rows = _iter_csv(stream) if fmt == "csv" else _iter_ndjson(stream)
+    return await CopyLoader().load(rows)
+
+
+async def bulk_load_rows(rows: Iterable, on_progress: Optional[Callable[[int], None]] = None) -> Dict:
+    """Same COPY path for rows that are already decoded (MCP method)."""
+    async def numbered():
+        for row_number, raw in enumerate(rows, start=1):
+            yield row_number, raw
+    return await CopyLoader(on_progress=on_progress).load(numbered())
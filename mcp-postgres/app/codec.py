@@ -0,0 +1,138 @@
+# app/codec.py
+import json
+import logging
+import random
+from typing import Any
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # /mcp then speaks JSON only
+    msgpack = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+_MSGPACK_TYPES = (MSGPACK, "application/x-msgpack")
+
+
+class BodyTooLarge(Exception):
+    """Request body exceeds MCP_MAX_BODY_BYTES."""
+
+
+def loads(data: bytes) -> Any:
+    """Parse a JSON body once; raises ValueError on malformed input."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, default=str)
+    return json.dumps(obj, default=str, separators=(",", ":")).encode("utf-8")
+
+
+def _msgpack_default(obj: Any) -> Any:
+    # Same text the JSON encoders produce, e.g. ISO timestamps for created_at
+    return obj.isoformat() if hasattr(obj, "isoformat") else str(obj)
+
+
+def packb(obj: Any) -> bytes:
+    return msgpack.packb(obj, default=_msgpack_default)
+
+
+def unpackb(data: bytes) -> Any:
+    """Parse a MessagePack body; raises ValueError on malformed input."""
+    try:
+        return msgpack.unpackb(data, raw=False)
+    except Exception as e:  # msgpack's errors don't share a useful base class
+        raise ValueError(f"Invalid MessagePack: {e!r}") from e
+
+
+class UnsupportedMediaType(Exception):
+    """Body sent as MessagePack, but msgpack isn't installed."""
+
+
+def _is_msgpack(header: str) -> bool:
+    return any(t in header for t in _MSGPACK_TYPES)
+
+
+def request_format(request: Request) -> str:
+    """Media type of the request body: MSGPACK or JSON (the default)."""
+    if _is_msgpack(request.headers.get("content-type", "")):
+        if msgpack is None:
+            raise UnsupportedMediaType("application/msgpack needs the msgpack package")
+        return MSGPACK
+    return JSON
+
+
+def response_format(request: Request) -> str:
+    """
+    Media type to answer in: MessagePack when the client accepts it, JSON when
+    it asks for JSON, otherwise whatever the request body was sent as.
+    """
+    if msgpack is None:
+        return JSON
+    accept = request.headers.get("accept", "")
+    if _is_msgpack(accept):
+        return MSGPACK
+    if JSON in accept:
+        return JSON
+    return MSGPACK if _is_msgpack(request.headers.get("content-type", "")) else JSON
+
+
+def decode(data: bytes, media_type: str) -> Any:
+    return unpackb(data) if media_type == MSGPACK else loads(data)
+
+
+class RPCResponse(Response):
+    """
+    JSON-RPC response rendered with the fast encoder, as JSON or, when created
+    with media_type=MSGPACK, as MessagePack.
+    """
+    media_type = JSON
+
+    def render(self, content: Any) -> bytes:
+        if self.media_type == MSGPACK:
+            return packb(content)
+        return dumps(content)
+
+
+async def read_body(request: Request, max_bytes: int) -> bytes:
+    """Read the request body, refusing anything larger than `max_bytes`."""
+    declared = request.headers.get("content-length")
+    if declared is not None and declared.isdigit() and int(declared) > max_bytes:
+        raise BodyTooLarge(f"Body of {declared} bytes exceeds {max_bytes}")
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > max_bytes:
+            raise BodyTooLarge(f"Body exceeds {max_bytes} bytes")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def log_body(prefix: str, body: bytes):
+    """Log a sampled, truncated copy of a request body instead of every one in full."""
+    rate = settings.MCP_LOG_SAMPLE_RATE
+    if rate <= 0 or not logger.isEnabledFor(logging.INFO):
+        return
+    if rate < 1 and random.random() >= rate:
+        return
+    limit = settings.MCP_LOG_MAX_BODY_CHARS
+    text = body[:limit].decode("utf-8", errors="replace")
+    if len(body) > limit:
+        text += f"... [{len(body)} bytes]"
+    logger.info(f"{prefix}: {text}")
@@ -1,5 +1,7 @@
 # app/core/config.py
 
+import os
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import Optional
 
@@ -10,6 +12,95 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     DB_SCHEMA_NAME: str
 
+    # ─── Storage backend ─────────────────────────────────────
+    STORAGE_BACKEND: str = "postgres"        # "postgres", or "memory" to run without a database
+
+    # ─── Schema migrations (python -m app.migrations) ────────
+    DB_MIGRATE_ON_STARTUP: bool = True       # apply pending migrations when a worker starts
+    MIGRATIONS_DIR: str = os.path.join(os.path.dirname(os.path.dirname(__file__)), "migrations")
+
+    # ─── Server launcher (python -m app.server) ──────────────
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 0                  # worker processes; 0 = one per CPU core
+    SERVER_DRAIN_DELAY: float = 5.0          # seconds /readyz reports 503 before shutdown starts
+    SERVER_GRACEFUL_TIMEOUT: float = 30.0    # then wait this long for in-flight requests
+    SERVER_RESTART_MIN_UPTIME: float = 30.0  # a worker that dies sooner counts as a fast failure
+    SERVER_RESTART_BACKOFF: float = 1.0      # restart delay after a fast failure, doubled for each one in a row
+    SERVER_RESTART_BACKOFF_MAX: float = 60.0
+    SERVER_RESTART_MAX_FAST_FAILURES: int = 5  # in a row, in one worker slot: stop everything and exit 1
+
+    # ─── Connection pool ─────────────────────────────────────
+    DB_POOL_MIN_SIZE: int = 2
+    DB_POOL_MAX_SIZE: int = 20
+    DB_POOL_TIMEOUT: float = 5.0             # seconds to wait for a free connection
+    DB_POOL_HEALTHCHECK_IDLE: float = 30.0   # ping connections idle longer than this
+
+    # ─── Async pool (asyncpg, used by /mcp) ──────────────────
+    ASYNC_DB_POOL_MIN_SIZE: int = 2
+    ASYNC_DB_POOL_MAX_SIZE: int = 20
+    ASYNC_DB_POOL_MAX_IDLE: float = 300.0    # close connections idle longer than this
+
+    # ─── Bulk COPY ingestion ─────────────────────────────────
+    BULK_CHUNK_SIZE: int = 1000              # rows validated and sent to COPY at a time
+    BULK_MAX_REPORTED_ERRORS: int = 1000     # cap on rejected row numbers in a report
+
+    # ─── Background jobs ─────────────────────────────────────
+    JOBS_WORKERS: int = 2                    # jobs running at once per worker process
+    JOBS_MAX_QUEUED: int = 100               # jobs waiting beyond that
+    JOBS_RETENTION: float = 3600.0           # seconds finished jobs stay queryable
+    JOBS_EVENT_INTERVAL: float = 0.5         # minimum seconds between SSE progress events
+
+    # ─── Admission control (/mcp, /insert_user, /bulk) ───────
+    ADMISSION_MAX_IN_FLIGHT: int = 64        # requests doing database work at once
+    ADMISSION_MAX_QUEUED: int = 256          # more than this waiting: reject at once
+    ADMISSION_QUEUE_TIMEOUT: float = 1.0     # longest a request waits for a slot
+    ADMISSION_RATE: float = 0.0              # requests/s per client address; 0 = off
+    ADMISSION_BURST: float = 100.0
+    ADMISSION_MAX_CLIENTS: int = 10000       # token buckets kept per worker
+    ADMISSION_TRUSTED_PROXIES: str = ""      # comma-separated addresses / CIDRs whose X-Client-ID is honoured
+
+    # ─── /mcp request handling ───────────────────────────────
+    MCP_MAX_BODY_BYTES: int = 10 * 1024 * 1024
+    MCP_LOG_SAMPLE_RATE: float = 0.01        # fraction of request bodies logged at INFO
+    MCP_LOG_MAX_BODY_CHARS: int = 512        # logged bodies are truncated to this
+
+    # ─── Idempotency keys (insert_credentials retries) ───────
+    IDEMPOTENCY_TTL: float = 24 * 3600       # seconds a key keeps returning its first result
+    IDEMPOTENCY_CACHE_SIZE: int = 10000      # recent keys remembered in memory per worker
+
+    # ─── Read tools (get_credentials / list_credentials) ─────
+    READ_CACHE_SIZE: int = 10000             # cached rows / pages per worker
+    READ_CACHE_TTL: float = 30.0             # bounds staleness from other workers' writes
+    LIST_MAX_LIMIT: int = 1000               # largest page list_credentials returns
+
+    # ─── Streaming export ────────────────────────────────────
+    EXPORT_FETCH_SIZE: int = 1000            # rows per server-side cursor fetch / chunk
+    EXPORT_MAX_FETCH_SIZE: int = 50000
+    EXPORT_DIR: str = ""                     # export_credentials job files; "" = <tmp>/mcp-exports
+
+    # ─── Group commit (concurrent insert_credentials) ────────
+    GROUP_COMMIT_ENABLED: bool = False
+    GROUP_COMMIT_WINDOW_MS: float = 2.0      # longest a queued insert waits for company
+    GROUP_COMMIT_MAX_BATCH: int = 100        # flush as soon as this many are queued
+
+    # ─── Test-run results store ──────────────────────────────
+    RESULTS_MAX_BATCH: int = 5000            # runs / steps / timings per record_* call
+
+    # ─── Id blocks (reserve_ids) ─────────────────────────────
+    ID_BLOCK_MAX: int = 1_000_000            # largest block one reserve_ids call hands out
+
+    # ─── Request tracing and slow statements ─────────────────
+    DB_APPLICATION_NAME: str = "mcp-postgres"  # application_name of pooled connections
+    DB_TAG_APPLICATION_NAME: bool = True     # "<name>:<request id>" while a request holds a connection (one SET per checkout)
+    SLOW_REQUEST_MS: float = 1000.0          # log /mcp and /insert_user requests slower than this, per phase; 0 = off
+    SLOW_QUERY_MS: float = 200.0             # log and record statements slower than this; 0 = off
+    SLOW_QUERY_EXPLAIN: bool = True          # capture plans: EXPLAIN ANALYZE for reads, plain EXPLAIN for writes
+    SLOW_QUERY_EXPLAIN_INTERVAL: float = 300.0  # explain each distinct statement at most this often
+    SLOW_QUERY_EXPLAIN_TIMEOUT: float = 5.0  # statement_timeout for the EXPLAIN run
+    SLOW_QUERY_QUEUE: int = 1000             # slow statements waiting to be recorded; more are dropped
+    SLOW_QUERY_RETENTION: float = 7 * 24 * 3600  # seconds recorded statements are kept
+
     # ─── Tell Pydantic-Settings how to load .env ─────────────
     model_config = SettingsConfigDict(
         env_file=".env",
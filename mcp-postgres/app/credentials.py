@@ -0,0 +1,142 @@
+# app/credentials.py
+import logging
+from typing import List, Union
+
+import asyncpg
+import psycopg2
+from psycopg2.extras import execute_values
+
+from .metrics import phase
+from .schemas import InsertCredentialsRequest
+
+logger = logging.getLogger(__name__)
+
+CREDENTIALS_COLUMNS = ["user_id", "first_name", "last_name", "email", "phone_number", "is_active"]
+LOOKUP_FIELDS = ("user_id", "email", "phone_number")
+_COLUMNS_SQL = f"({', '.join(CREDENTIALS_COLUMNS)})"
+_SELECT_SQL = f"SELECT id, {', '.join(CREDENTIALS_COLUMNS)}, created_at FROM user_login_credentials"
+
+# psycopg2 (sync pool)
+INSERT_ONE_SQL = (
+    f"INSERT INTO user_login_credentials {_COLUMNS_SQL} "
+    "VALUES (%s,%s,%s,%s,%s,%s) RETURNING id"
+)
+INSERT_MANY_SQL = f"INSERT INTO user_login_credentials {_COLUMNS_SQL} VALUES %s RETURNING id"
+
+# asyncpg (async pool) — kept prepared by asyncpg's statement cache after first use;
+# unnest() keeps one statement text for any batch size, so it stays prepared
+INSERT_ONE_SQL_ASYNC = (
+    f"INSERT INTO user_login_credentials {_COLUMNS_SQL} "
+    "VALUES ($1, $2, $3, $4, $5, $6) RETURNING id"
+)
+INSERT_MANY_SQL_ASYNC = (
+    f"INSERT INTO user_login_credentials {_COLUMNS_SQL} "
+    "SELECT * FROM unnest($1::text[], $2::text[], $3::text[], $4::text[], $5::text[], $6::bool[]) "
+    "RETURNING id"
+)
+# Conflicts resolve inside the one statement, so nothing is aborted or rolled back.
+# "update" arbitrates on user_id and also returns the replaced email / phone_number
+# so their cached lookups can be dropped; "ignore" skips a clash on any unique column.
+_UPSERT_VALUES = f"INSERT INTO user_login_credentials {_COLUMNS_SQL} VALUES ($1, $2, $3, $4, $5, $6) "
+UPSERT_SQL_ASYNC = (
+    "WITH previous AS (SELECT email, phone_number FROM user_login_credentials WHERE user_id = $1) "
+    + _UPSERT_VALUES
+    + "ON CONFLICT (user_id) DO UPDATE SET "
+    + ", ".join(f"{c} = EXCLUDED.{c}" for c in CREDENTIALS_COLUMNS if c != "user_id")
+    + " RETURNING id, xmax = 0 AS inserted, "
+    "(SELECT email FROM previous) AS previous_email, "
+    "(SELECT phone_number FROM previous) AS previous_phone_number"
+)
+INSERT_IGNORE_SQL_ASYNC = _UPSERT_VALUES + "ON CONFLICT DO NOTHING RETURNING id"
+GET_SQL_ASYNC = {f: f"{_SELECT_SQL} WHERE {f} = $1" for f in LOOKUP_FIELDS}
+LIST_SQL_ASYNC = f"{_SELECT_SQL} WHERE id > $1 ORDER BY id LIMIT $2"
+COUNT_SQL_ASYNC = "SELECT count(*) FROM user_login_credentials WHERE id > $1"
+
+
+def credentials_row(req: InsertCredentialsRequest) -> tuple:
+    return (req.user_id, req.first_name, req.last_name,
+            req.email, req.phone_number, req.is_active)
+
+
+def insert_credentials_many(conn, reqs: List[InsertCredentialsRequest]) -> List[Union[int, Exception]]:
+    """
+    Insert all rows in one transaction with a single multi-row INSERT.
+    If the statement fails (e.g. one duplicate user_id), the rows are retried
+    one by one under savepoints so every row still gets its own id or error.
+    Returns one entry per request, in order.
+    """
+    cur = conn.cursor()
+    try:
+        with phase("sql"):
+            inserted = execute_values(
+                cur,
+                INSERT_MANY_SQL,
+                [credentials_row(r) for r in reqs],
+                page_size=len(reqs),
+                fetch=True,
+            )
+        with phase("commit"):
+            conn.commit()
+        return [row["id"] for row in inserted]
+    except psycopg2.Error as e:
+        conn.rollback()
+        if len(reqs) == 1:
+            return [e]
+        logger.info(f"Multi-row insert failed ({e.pgcode}), retrying {len(reqs)} rows individually")
+
+    results: List[Union[int, Exception]] = []
+    with phase("sql"):
+        for req in reqs:
+            cur.execute("SAVEPOINT batch_row")
+            try:
+                cur.execute(INSERT_ONE_SQL, credentials_row(req))
+                results.append(cur.fetchone()["id"])
+                cur.execute("RELEASE SAVEPOINT batch_row")
+            except psycopg2.Error as e:
+                cur.execute("ROLLBACK TO SAVEPOINT batch_row")
+                results.append(e)
+    with phase("commit"):
+        conn.commit()
+    return results
+
+
+async def insert_credentials_many_async(conn, reqs: List[InsertCredentialsRequest]) -> List[Union[int, Exception]]:
+    """
+    asyncpg version of `insert_credentials_many`: one `INSERT ... SELECT unnest(...)`
+    in one transaction, falling back to per-row savepoints if it fails.
+    Both statements stay prepared in asyncpg's statement cache after first use.
+    """
+    # Single statements run in autocommit, so their commit is part of the "sql" phase
+    if len(reqs) == 1:
+        try:
+            with phase("sql"):
+                return [await conn.fetchval(INSERT_ONE_SQL_ASYNC, *credentials_row(reqs[0]))]
+        except asyncpg.PostgresError as e:
+            return [e]
+
+    columns = list(zip(*(credentials_row(r) for r in reqs)))
+    try:
+        with phase("sql"):
+            rows = await conn.fetch(INSERT_MANY_SQL_ASYNC, *columns)
+        return [row["id"] for row in rows]
+    except asyncpg.PostgresError as e:
+        logger.info(f"Multi-row insert failed ({e.sqlstate}), retrying {len(reqs)} rows individually")
+
+    results: List[Union[int, Exception]] = []
+    tx = conn.transaction()
+    await tx.start()
+    try:
+        with phase("sql"):
+            for req in reqs:
+                try:
+                    # Nested transaction = savepoint
+                    async with conn.transaction():
+                        results.append(await conn.fetchval(INSERT_ONE_SQL_ASYNC, *credentials_row(req)))
+                except asyncpg.PostgresError as e:
+                    results.append(e)
+    except BaseException:
+        await tx.rollback()
+        raise
+    with phase("commit"):
+        await tx.commit()
+    return results
@@ -0,0 +1,291 @@
+# app/db.py
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+from .config import settings
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes available within the checkout timeout."""
+
+
+class ConnectionPool:
+    """
+    Thread-safe psycopg2 connection pool that lives for the whole process.
+
+    - Opens `min_size` connections up front and grows lazily up to `max_size`.
+    - Runs `SET search_path` once per physical connection, not per checkout.
+    - Health-checks connections on checkout: closed connections are always
+      replaced, and connections idle longer than `healthcheck_idle` seconds
+      are pinged with `SELECT 1` before being handed out.
+    - Tracks saturation stats (in use, idle, waiters, wait time, timeouts).
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        schema: str,
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout: float = 5.0,
+        healthcheck_idle: float = 30.0,
+    ):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"Invalid pool size: min={min_size}, max={max_size}")
+        self.dsn = dsn
+        self.schema = schema
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.healthcheck_idle = healthcheck_idle
+
+        # Idle connections as (conn, last_used_monotonic) — LIFO keeps hot connections hot
+        self._idle = queue.LifoQueue()
+        # One permit per connection that may exist (idle or in use)
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._size = 0
+        self._closed = False
+
+        self._waiting = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+        self._replaced = 0
+
+        for _ in range(min_size):
+            self._slots.acquire()
+            self._idle.put((self._connect(), time.monotonic()))
+
+    # ─── Physical connections ───────────────────────────────────
+    def _connect(self):
+        conn = psycopg2.connect(
+            self.dsn, cursor_factory=RealDictCursor, application_name=settings.DB_APPLICATION_NAME,
+        )
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SET search_path TO %s", (self.schema,))
+            conn.commit()
+        except psycopg2.Error:
+            conn.close()
+            raise
+        with self._lock:
+            self._size += 1
+        return conn
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._lock:
+            self._size -= 1
+
+    def _is_healthy(self, conn, last_used: float) -> bool:
+        if conn.closed:
+            return False
+        if time.monotonic() - last_used < self.healthcheck_idle:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error as e:
+            logger.warning(f"Pooled connection failed health check: {e}")
+            return False
+
+    # ─── Checkout / checkin ─────────────────────────────────────
+    def getconn(self):
+        """Check out a healthy connection, waiting up to `timeout` seconds for a free slot."""
+        if self._closed:
+            raise PoolTimeout("Connection pool is closed")
+
+        start = time.monotonic()
+        # Fast path: an idle connection is ready and already owns a slot
+        try:
+            conn, last_used = self._idle.get_nowait()
+        except queue.Empty:
+            conn = None
+            with self._lock:
+                self._waiting += 1
+            try:
+                # Wait for either an idle connection or room to open a new one
+                while conn is None:
+                    if self._slots.acquire(blocking=False):
+                        try:
+                            conn, last_used = self._connect(), time.monotonic()
+                        except Exception:
+                            self._slots.release()
+                            raise
+                        break
+                    remaining = self.timeout - (time.monotonic() - start)
+                    if remaining <= 0:
+                        with self._lock:
+                            self._timeouts += 1
+                        raise PoolTimeout(
+                            f"No database connection available within {self.timeout}s "
+                            f"(max_size={self.max_size})"
+                        )
+                    try:
+                        conn, last_used = self._idle.get(timeout=min(remaining, 0.05))
+                    except queue.Empty:
+                        continue
+            finally:
+                with self._lock:
+                    self._waiting -= 1
+
+        if not self._is_healthy(conn, last_used):
+            with self._lock:
+                self._replaced += 1
+            self._discard(conn)
+            try:
+                conn = self._connect()
+            except Exception:
+                self._slots.release()
+                raise
+
+        waited = time.monotonic() - start
+        metrics.observe_phase("pool_wait", waited)
+        with self._lock:
+            self._checkouts += 1
+            self._wait_time_total += waited
+            if waited > self._wait_time_max:
+                self._wait_time_max = waited
+        return conn
+
+    def putconn(self, conn):
+        """Return a connection, rolling back any transaction left open."""
+        if self._closed or conn.closed:
+            self._discard(conn)
+            self._slots.release()
+            return
+        try:
+            if conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+        except psycopg2.Error:
+            self._discard(conn)
+            self._slots.release()
+            return
+        self._idle.put((conn, time.monotonic()))
+
+    @contextmanager
+    def connection(self):
+        conn = self.getconn()
+        try:
+            yield conn
+        finally:
+            self.putconn(conn)
+
+    def ping_idle(self):
+        """Health-check every idle connection now, replacing broken ones (startup warm-up)."""
+        entries = []
+        while True:
+            try:
+                entries.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            while entries:
+                conn, _ = entries.pop(0)
+                if not self._is_healthy(conn, float("-inf")):
+                    with self._lock:
+                        self._replaced += 1
+                    self._discard(conn)
+                    try:
+                        conn = self._connect()
+                    except Exception:
+                        self._slots.release()
+                        raise
+                self._idle.put((conn, time.monotonic()))
+        finally:
+            # A failed reconnect must not strand the ones not checked yet
+            for entry in entries:
+                self._idle.put(entry)
+
+    def closeall(self):
+        self._closed = True
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+    # ─── Stats ──────────────────────────────────────────────────
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            size = self._size
+            idle = self._idle.qsize()
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "size": size,
+                "idle": idle,
+                "in_use": size - idle,
+                "waiting": self._waiting,
+                "saturation": round((size - idle) / self.max_size, 4),
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "replaced": self._replaced,
+                "wait_time_avg_ms": round(
+                    1000 * self._wait_time_total / self._checkouts, 3
+                ) if self._checkouts else 0.0,
+                "wait_time_max_ms": round(1000 * self._wait_time_max, 3),
+            }
+
+
+# one global pool, opened on app startup
+pool: Optional[ConnectionPool] = None
+
+
+@metrics.gauge_collector
+def _pool_gauges():
+    if pool is None:
+        return
+    stats = pool.stats()
+    for key in ("min_size", "max_size", "size", "idle", "in_use", "waiting", "saturation"):
+        yield f"db_pool_{key}", f"Connection pool {key}", {"pool": "sync"}, stats[key]
+
+
+@metrics.counter_collector
+def _pool_counters():
+    if pool is None:
+        return
+    yield "db_pool_checkout_timeouts_total", "Checkouts that timed out", {"pool": "sync"}, pool.stats()["timeouts"]
+
+
+def open_pool() -> ConnectionPool:
+    global pool
+    if pool is None:
+        pool = ConnectionPool(
+            settings.DATABASE_URL,
+            settings.DB_SCHEMA_NAME,
+            min_size=settings.DB_POOL_MIN_SIZE,
+            max_size=settings.DB_POOL_MAX_SIZE,
+            timeout=settings.DB_POOL_TIMEOUT,
+            healthcheck_idle=settings.DB_POOL_HEALTHCHECK_IDLE,
+        )
+        logger.info(
+            f"Database pool opened (min={pool.min_size}, max={pool.max_size})"
+        )
+    return pool
+
+
+def close_pool():
+    global pool
+    if pool is not None:
+        pool.closeall()
+        pool = None
@@ -0,0 +1,147 @@
+# app/export.py
+"""
+Streaming NDJSON export of user_login_credentials.
+
+Rows are read through a named (server-side) cursor, `fetch_size` at a time,
+and each batch is sent as soon as it is encoded, so memory stays flat however
+large the table is. Rows come out in id order and every line carries its id:
+after a disconnect, pass the last id received as `after_id` to resume.
+
+ExportResponse owns the pool connection and cursor the export reads from. It
+closes the cursor and returns the connection once the response is over,
+whether the stream finished, failed, was cut off by the client, or never
+started.
+
+For exports too large to take in one response, the export_credentials MCP
+method runs `export_to_file` as a background job instead: the same NDJSON,
+paged through the storage backend by id into a file under EXPORT_DIR, with
+progress reported per page. GET /jobs/{id}/export serves the file once the
+job has succeeded; it is deleted when the job is pruned.
+"""
+import asyncio
+import functools
+import logging
+import os
+import tempfile
+import uuid
+from typing import AsyncIterator, Dict
+
+import psycopg2
+import psycopg2.extensions
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import StreamingResponse
+
+from .codec import dumps
+from .config import settings
+from .credentials import CREDENTIALS_COLUMNS
+from . import db, storage
+
+logger = logging.getLogger(__name__)
+
+EXPORT_COLUMNS = ["id"] + CREDENTIALS_COLUMNS + ["created_at"]
+EXPORT_SQL = (
+    f"SELECT {', '.join(EXPORT_COLUMNS)} FROM user_login_credentials "
+    "WHERE id > %s ORDER BY id"
+)
+
+
+def export_cursor(conn):
+    """A named (server-side) cursor on `conn`; nothing is sent until it executes."""
+    # Plain tuple cursor: rows are encoded straight away, no per-row dict from the driver
+    return conn.cursor(name=f"export_{uuid.uuid4().hex}", cursor_factory=psycopg2.extensions.cursor)
+
+
+async def export_ndjson(cur, after_id: int, fetch_size: int) -> AsyncIterator[bytes]:
+    """
+    Yield NDJSON chunks (one per fetched batch) of rows with id > after_id,
+    read through `cur` (see export_cursor). Fetches run in the threadpool.
+    Closing the cursor and returning its connection is up to the caller
+    (see ExportResponse).
+    """
+    exported = 0
+    try:
+        await run_in_threadpool(cur.execute, EXPORT_SQL, (after_id,))
+        while True:
+            rows = await run_in_threadpool(cur.fetchmany, fetch_size)
+            if not rows:
+                break
+            yield b"".join(dumps(dict(zip(EXPORT_COLUMNS, row))) + b"\n" for row in rows)
+            exported += len(rows)
+    except psycopg2.Error as e:
+        # Headers are already sent; the client sees a truncated stream and resumes
+        logger.error(f"Export failed after {exported} rows: {e}")
+    finally:
+        logger.info(f"Exported {exported} rows (after_id={after_id})")
+
+
+def release(conn, cur=None):
+    """Close `cur` (a CLOSE round trip) and return `conn` to the pool (a rollback). Blocking."""
+    try:
+        if cur is not None:
+            cur.close()
+    except psycopg2.Error:
+        pass
+    finally:
+        db.pool.putconn(conn)
+
+
+class ExportResponse(StreamingResponse):
+    """The NDJSON export as a response that gives `conn` back to the pool when it is done."""
+
+    def __init__(self, conn, after_id: int, fetch_size: int):
+        self.conn = conn
+        self.cursor = export_cursor(conn)
+        self._stream = export_ndjson(self.cursor, after_id, fetch_size)
+        super().__init__(self._stream, media_type="application/x-ndjson")
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            # The generator's finally doesn't await, so closing it can't be interrupted
+            await self._stream.aclose()
+            # Off the event loop, and shielded: if this request is cancelled
+            # meanwhile, the cleanup still runs to the end in its thread
+            await asyncio.shield(run_in_threadpool(release, self.conn, self.cursor))
+
+
+# ─── Background export (export_credentials job) ───────────────
+def export_path(job_id: str) -> str:
+    directory = settings.EXPORT_DIR or os.path.join(tempfile.gettempdir(), "mcp-exports")
+    return os.path.join(directory, f"credentials_{job_id}.ndjson")
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _open(path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return open(path, "wb")
+
+
+async def export_to_file(job, after_id: int, fetch_size: int) -> Dict:
+    """
+    Write rows with id > after_id to export_path(job.id), `fetch_size` at a
+    time. A cancelled or failed job leaves a partial file until it is pruned.
+    """
+    path = export_path(job.id)
+    job.cleanup = functools.partial(_remove, path)
+    exported, last_id = 0, after_id
+    f = await run_in_threadpool(_open, path)
+    try:
+        while True:
+            rows = await storage.backend.list_credentials(last_id, fetch_size)
+            if not rows:
+                break
+            await run_in_threadpool(f.write, b"".join(dumps(row) + b"\n" for row in rows))
+            exported += len(rows)
+            last_id = rows[-1]["id"]
+            job.progress(exported)
+    finally:
+        await run_in_threadpool(f.close)
+    logger.info(f"Exported {exported} rows to {path} (after_id={after_id})")
+    return {"exported": exported, "last_id": last_id, "download": f"/jobs/{job.id}/export"}
@@ -0,0 +1,111 @@
+# app/group_commit.py
+"""
+Optional group commit for insert_credentials (GROUP_COMMIT_ENABLED).
+
+Concurrent single-row inserts are queued for up to GROUP_COMMIT_WINDOW_MS, or
+until GROUP_COMMIT_MAX_BATCH are waiting. Then they are written together with
+the backend's `insert_credentials_many`. On Postgres that is one multi-row
+statement and one transaction, so one WAL flush instead of one per row.
+Each caller awaits its own future and
+gets its own inserted_id or error back, exactly as if it had inserted alone.
+"""
+import asyncio
+import logging
+import time
+from typing import List, Optional, Set, Tuple, Union
+
+from .config import settings
+from .metrics import GROUP_COMMIT_BATCH, GROUP_COMMIT_FLUSHES, gauge_collector, observe_phase
+from .schemas import InsertCredentialsRequest
+from . import storage
+
+logger = logging.getLogger(__name__)
+
+
+class GroupCommitter:
+    def __init__(self, window: float, max_batch: int):
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: List[Tuple[InsertCredentialsRequest, asyncio.Future, float]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._writes: Set[asyncio.Task] = set()
+
+    @property
+    def pending(self) -> int:
+        """Inserts queued for the next flush."""
+        return len(self._pending)
+
+    async def insert(self, req: InsertCredentialsRequest) -> Union[int, Exception]:
+        """Queue one row; resolves to its inserted_id, or the database error for it."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((req, future, time.perf_counter()))
+        if len(self._pending) >= self.max_batch:
+            self._flush("size")
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush, "window")
+        return await future
+
+    def _flush(self, reason: str):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        GROUP_COMMIT_FLUSHES.inc(reason)
+        GROUP_COMMIT_BATCH.observe(len(batch))
+        task = asyncio.create_task(self._write(batch))
+        # Keep a reference until done so the task isn't garbage collected mid-write
+        self._writes.add(task)
+        task.add_done_callback(self._writes.discard)
+
+    async def _write(self, batch: List[Tuple[InsertCredentialsRequest, asyncio.Future, float]]):
+        now = time.perf_counter()
+        for _, _, queued_at in batch:
+            observe_phase("group_wait", now - queued_at)
+        try:
+            results = await storage.backend.insert_credentials_many([req for req, _, _ in batch])
+        except Exception as e:
+            logger.error(f"Group commit of {len(batch)} rows failed: {e}")
+            results = [e] * len(batch)
+        for (_, future, _), result in zip(batch, results):
+            # A caller that gave up (cancelled) still had its row written
+            if not future.done():
+                future.set_result(result)
+
+    async def close(self):
+        """Write whatever is queued and wait for in-flight writes."""
+        self._flush("shutdown")
+        if self._writes:
+            await asyncio.gather(*self._writes, return_exceptions=True)
+
+
+# one committer per process when GROUP_COMMIT_ENABLED, started with the app
+committer: Optional[GroupCommitter] = None
+
+
+def start() -> Optional[GroupCommitter]:
+    global committer
+    if settings.GROUP_COMMIT_ENABLED and committer is None:
+        committer = GroupCommitter(settings.GROUP_COMMIT_WINDOW_MS / 1000, settings.GROUP_COMMIT_MAX_BATCH)
+        logger.info(
+            f"Group commit enabled (window={settings.GROUP_COMMIT_WINDOW_MS}ms, "
+            f"max_batch={settings.GROUP_COMMIT_MAX_BATCH})"
+        )
+    return committer
+
+
+async def stop():
+    global committer
+    if committer is not None:
+        await committer.close()
+        committer = None
+
+
+@gauge_collector
+def _settings_gauges():
+    if committer is not None:
+        yield "mcp_group_commit_window_seconds", "Group commit window", {}, committer.window
+        yield "mcp_group_commit_max_batch", "Group commit batch size limit", {}, committer.max_batch
+        yield "mcp_group_commit_queued", "Inserts waiting for the next group commit", {}, committer.pending
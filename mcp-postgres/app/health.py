@@ -0,0 +1,28 @@
+# app/health.py
+"""
+Process readiness for /readyz. A worker is ready once its storage backend is
+open and warmed up, and stops being ready as soon as it starts draining, so
+a load balancer routes new traffic elsewhere before it exits.
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+_ready = False
+_draining = False
+
+
+def mark_ready():
+    global _ready
+    _ready = True
+
+
+def start_draining():
+    global _draining
+    _draining = True
+
+
+def status() -> str:
+    if _draining:
+        return "draining"
+    return "ready" if _ready else "starting"
@@ -0,0 +1,94 @@
+# app/idempotency.py
+"""
+Idempotency keys for insert_credentials.
+
+A retried insert that carries the same key gets the first call's inserted_id
+back. Recent results are kept in a bounded in-memory TTL cache, so repeats
+served by the same worker never reach the storage backend. On Postgres the
+mcp_idempotency_keys table (migration 0002) dedups across workers. The key
+row is claimed in the same transaction as the INSERT, so concurrent retries
+wait on the key and a failed insert releases it.
+"""
+import logging
+from typing import Optional, Union
+
+import asyncpg
+
+from .cache import TTLCache
+from .config import settings
+from .credentials import INSERT_ONE_SQL_ASYNC, credentials_row
+from .metrics import IDEMPOTENT_REPLAYS, phase
+from .schemas import InsertCredentialsRequest
+from . import db
+
+logger = logging.getLogger(__name__)
+
+PURGE_SQL = "DELETE FROM mcp_idempotency_keys WHERE created_at < now() - make_interval(secs => %s)"
+
+# Claim the key, or take over one whose TTL has run out. Returns no row if a
+# live key exists; if another transaction holds it, this waits for it to finish.
+_CLAIM = (
+    "INSERT INTO mcp_idempotency_keys (key) VALUES ({key}) "
+    "ON CONFLICT (key) DO UPDATE SET inserted_id = NULL, created_at = now() "
+    "WHERE mcp_idempotency_keys.created_at < now() - make_interval(secs => {ttl}) "
+    "RETURNING key"
+)
+_LOOKUP = "SELECT inserted_id FROM mcp_idempotency_keys WHERE key = {key}"
+_RECORD = "UPDATE mcp_idempotency_keys SET inserted_id = {id} WHERE key = {key}"
+
+# asyncpg (async pool) — declared in the MCP registry, prepared by asyncpg on first use
+CLAIM_SQL_ASYNC = _CLAIM.format(key="$1", ttl="$2::float8")
+LOOKUP_SQL_ASYNC = _LOOKUP.format(key="$1")
+RECORD_SQL_ASYNC = _RECORD.format(key="$1", id="$2")
+
+_cache = TTLCache(settings.IDEMPOTENCY_CACHE_SIZE, settings.IDEMPOTENCY_TTL)
+
+
+def purge_expired():
+    """Drop expired keys from mcp_idempotency_keys (run once at startup)."""
+    with db.pool.connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(PURGE_SQL, (settings.IDEMPOTENCY_TTL,))
+            purged = cur.rowcount
+        conn.commit()
+    if purged:
+        logger.info(f"Purged {purged} expired idempotency keys")
+
+
+def cached(key: str) -> Optional[int]:
+    """inserted_id of a recent call with this key on this worker, if any."""
+    inserted_id = _cache.get(key)
+    if inserted_id is not None:
+        IDEMPOTENT_REPLAYS.inc("cache")
+    return inserted_id
+
+
+def remember(key: str, inserted_id: int):
+    _cache.put(key, inserted_id)
+
+
+async def insert_once_async(conn, key: str, req: InsertCredentialsRequest) -> Union[int, Exception]:
+    """
+    Postgres side of `StorageBackend.insert_credentials_once`: claim the key,
+    then insert and record the id, in one transaction. If the key is already
+    taken, return the id it recorded. Database errors are returned, not raised.
+    """
+    tx = conn.transaction()
+    await tx.start()
+    try:
+        with phase("sql"):
+            if await conn.fetchval(CLAIM_SQL_ASYNC, key, settings.IDEMPOTENCY_TTL) is None:
+                inserted_id = await conn.fetchval(LOOKUP_SQL_ASYNC, key)
+                IDEMPOTENT_REPLAYS.inc("backend")
+            else:
+                inserted_id = await conn.fetchval(INSERT_ONE_SQL_ASYNC, *credentials_row(req))
+                await conn.execute(RECORD_SQL_ASYNC, key, inserted_id)
+    except asyncpg.PostgresError as e:
+        await tx.rollback()
+        return e
+    except BaseException:
+        await tx.rollback()
+        raise
+    with phase("commit"):
+        await tx.commit()
+    return inserted_id
@@ -0,0 +1,215 @@
+# app/jobs.py
+"""
+In-process job queue for MCP methods that can outlive an HTTP request.
+
+A method called with `"background": true` gets a job id back immediately.
+The work runs on one of JOBS_WORKERS asyncio workers, and at most
+JOBS_MAX_QUEUED jobs may wait. Clients poll `jobs/status`, or follow
+`GET /jobs/{id}/events` (server-sent events), and can stop a job with
+`jobs/cancel`. Jobs report rows processed, rate and ETA while running, and
+stop at their next progress report once cancelled.
+Finished jobs are kept for JOBS_RETENTION seconds; anything a job left behind
+(e.g. an export file) is removed through its `cleanup` when it is forgotten.
+
+Jobs live in the worker process that accepted them. With several workers
+behind one socket (app.server), follow-up calls must reach the same process.
+Run job-heavy clients against a single worker, or route by connection.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .config import settings
+from .registry import RPCError
+
+logger = logging.getLogger(__name__)
+
+JOB_NOT_FOUND = -32001
+JOB_QUEUE_FULL = -32002
+
+TERMINAL = ("succeeded", "failed", "cancelled")
+
+
+class Job:
+    def __init__(self, method: str, fn: Callable[["Job"], Awaitable[Any]], total: Optional[int] = None):
+        self.id = uuid.uuid4().hex
+        self.method = method
+        self.fn = fn
+        self.status = "queued"
+        self.total = total
+        self.processed = 0
+        self.result: Any = None
+        self.error: Optional[Dict] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.cancel_requested = False
+        self.task: Optional[asyncio.Task] = None
+        # Set by work that leaves something behind; run when the job is pruned
+        self.cleanup: Optional[Callable[[], None]] = None
+        self._changed = asyncio.Event()
+
+    # ─── Progress ───────────────────────────────────────────────
+    def progress(self, processed: int):
+        """
+        Called by the running work as rows are done. This is also where a
+        cancelled job stops: work is only interrupted between progress
+        reports, never halfway through a write it can't roll back.
+        """
+        self.processed = processed
+        self._notify()
+        if self.cancel_requested:
+            raise asyncio.CancelledError()
+
+    def _notify(self):
+        # Wake everyone waiting on the current event, then start a fresh one
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait_changed(self, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def _finish(self, status: str, result: Any = None, error: Optional[Dict] = None):
+        self.status = status
+        self.result = result
+        self.error = error
+        self.finished_at = time.time()
+        self._notify()
+
+    def to_dict(self) -> Dict:
+        end = self.finished_at or time.time()
+        elapsed = end - self.started_at if self.started_at else 0.0
+        rate = self.processed / elapsed if elapsed > 0 else 0.0
+        eta = None
+        if self.status == "running" and self.total is not None and rate > 0:
+            eta = round(max(self.total - self.processed, 0) / rate, 1)
+        return {
+            "job_id": self.id,
+            "method": self.method,
+            "status": self.status,
+            "cancel_requested": self.cancel_requested,
+            "processed": self.processed,
+            "total": self.total,
+            "rate_per_sec": round(rate, 1),
+            "eta_seconds": eta,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobQueue:
+    def __init__(self, workers: int, max_queued: int, retention: float):
+        self.retention = retention
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queued)
+        self._jobs: Dict[str, Job] = {}
+        self._closing = False
+        self._workers: List[asyncio.Task] = [
+            asyncio.create_task(self._worker()) for _ in range(workers)
+        ]
+
+    def submit(self, method: str, fn: Callable[[Job], Awaitable[Any]], total: Optional[int] = None) -> Job:
+        self._prune()
+        job = Job(method, fn, total)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise RPCError(JOB_QUEUE_FULL, "Job queue full", {"max_queued": self._queue.maxsize})
+        self._jobs[job.id] = job
+        logger.info(f"Queued job {job.id} ({method}, total={total})")
+        return job
+
+    def get(self, job_id: str) -> Job:
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise RPCError(JOB_NOT_FOUND, "Job not found", job_id)
+        return job
+
+    def cancel(self, job_id: str) -> Job:
+        job = self.get(job_id)
+        if job.status in TERMINAL:
+            return job
+        job.cancel_requested = True
+        if job.task is None:
+            # Still queued: the worker skips it
+            job._finish("cancelled")
+        # A running job stops at its next progress() call
+        return job
+
+    def _prune(self):
+        cutoff = time.time() - self.retention
+        for job_id in [j.id for j in self._jobs.values() if j.finished_at and j.finished_at < cutoff]:
+            self._forget(self._jobs.pop(job_id))
+
+    def _forget(self, job: Job):
+        if job.cleanup is not None:
+            try:
+                job.cleanup()
+            except Exception as e:
+                logger.warning(f"Cleanup of job {job.id} failed: {e}")
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            if job.status != "queued":
+                continue
+            job.status = "running"
+            job.started_at = time.time()
+            job._notify()
+            job.task = asyncio.create_task(job.fn(job))
+            try:
+                result = await job.task
+            except asyncio.CancelledError:
+                job._finish("cancelled")
+                if self._closing or not job.cancel_requested:
+                    raise  # the worker itself is being stopped
+                logger.info(f"Job {job.id} cancelled after {job.processed} rows")
+            except RPCError as e:
+                job._finish("failed", error={"code": e.code, "message": e.message, "data": e.data})
+            except Exception as e:
+                logger.error(f"Job {job.id} failed: {e}")
+                job._finish("failed", error={"code": -32000, "message": str(e)})
+            else:
+                job._finish("succeeded", result)
+
+    async def close(self):
+        self._closing = True
+        for job in self._jobs.values():
+            if job.status not in TERMINAL:
+                job.cancel_requested = True
+                if job.task is not None:
+                    job.task.cancel()
+                else:
+                    job._finish("cancelled")
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        # Jobs don't outlive the process, so neither does what they left behind
+        for job in self._jobs.values():
+            self._forget(job)
+
+
+# one queue per worker process, started with the app
+queue: Optional[JobQueue] = None
+
+
+def start() -> JobQueue:
+    global queue
+    if queue is None:
+        queue = JobQueue(settings.JOBS_WORKERS, settings.JOBS_MAX_QUEUED, settings.JOBS_RETENTION)
+    return queue
+
+
+async def stop():
+    global queue
+    if queue is not None:
+        await queue.close()
+        queue = None
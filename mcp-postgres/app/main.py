@@ -1,122 +1,392 @@
-from fastapi import FastAPI, HTTPException, Depends, status, Request
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Header, Query, status, Request
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from pydantic import ValidationError
+from typing import Dict, List, Optional, Tuple
 from .schemas import InsertCredentialsRequest
 from .config import settings
+from . import admission
+from . import db
+from . import async_db
+from . import bulk
+from . import export
+from . import storage
+from . import group_commit
+from . import health
+from . import jobs
+from . import slow_queries
+from . import tracing
+from . import codec
+from . import registry
+from . import metrics
+from . import methods  # registers the MCP methods
+from .codec import RPCResponse
+from .registry import RPCError
 import logging
-from fastapi.responses import JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
 
-def get_db_connection():
-    """Get a database connection with schema set correctly"""
-    conn = psycopg2.connect(settings.DATABASE_URL, cursor_factory=RealDictCursor)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pools are opened and exercised before uvicorn starts accepting connections
+    backend = await storage.open_backend()
+    await backend.warm_up()
+    registry.list_tools()
+    group_commit.start()
+    jobs.start()
+    slow_queries.start(async_db.pool)
+    health.mark_ready()
+    yield
+    await jobs.stop()
+    await group_commit.stop()
+    await slow_queries.stop()
+    await storage.close_backend()
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(metrics.MetricsMiddleware, skip=("/mcp", "/metrics", "/healthz", "/readyz"))
+# Outermost, so the request id covers everything the request does
+app.add_middleware(tracing.RequestIdMiddleware, slow_paths=("/mcp", "/insert_user"))
+
+def _checkout():
     try:
-        with conn.cursor() as cursor:
-            cursor.execute("SET search_path TO %s", (settings.DB_SCHEMA_NAME,))
-        return conn
+        conn = db.pool.getconn()
+    except db.PoolTimeout as e:
+        logger.error(f"Database pool exhausted: {e}")
+        raise HTTPException(status_code=503, detail="Database busy, try again")
     except psycopg2.Error as e:
         logger.error(f"Database connection error: {e}")
-        conn.close()
         raise HTTPException(status_code=500, detail="Database connection failed")
-
-def get_conn():
     try:
-        conn = psycopg2.connect(settings.DATABASE_URL, cursor_factory=RealDictCursor)
-        try:
-            # Set schema if needed
-            with conn.cursor() as cursor:
-                cursor.execute("SET search_path TO %s", (settings.DB_SCHEMA_NAME,))
-            yield conn
-        finally:
-            conn.close()
+        tracing.tag_sync_connection(conn)
     except psycopg2.Error as e:
+        # putconn rolls back the failed transaction before the connection is reused
+        db.pool.putconn(conn)
         logger.error(f"Database connection error: {e}")
         raise HTTPException(status_code=500, detail="Database connection failed")
+    return conn
+
+@app.exception_handler(admission.Rejected)
+async def admission_rejected(request: Request, e: admission.Rejected):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": e.message, "retry_after": e.retry_after},
+        headers=e.headers,
+    )
+
+@app.get("/healthz")
+async def healthz():
+    """Liveness: the worker's event loop is responding"""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: pools warmed up and not draining; 503 otherwise"""
+    state = health.status()
+    return JSONResponse(status_code=200 if state == "ready" else 503, content={"status": state})
+
+@app.get("/pool/stats")
+def pool_stats():
+    """Saturation stats for the shared database pools"""
+    return {"sync": db.pool.stats() if db.pool else {}, "async": async_db.stats()}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    """Prometheus text format: per-method counts/errors, phase latencies, pool gauges"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/admin/slow_queries")
+async def admin_slow_queries(
+    limit: int = Query(default=50, ge=1, le=1000),
+    hours: int = Query(default=24, ge=1, le=24 * 90),
+    request_id: Optional[str] = Query(default=None, max_length=64),
+    method: Optional[str] = Query(default=None, max_length=255),
+):
+    """
+    Slowest recorded statements of the last `hours`, with the request id and
+    method that ran them and their plan if captured (EXPLAIN ANALYZE for
+    reads, plain EXPLAIN for writes)
+    """
+    if async_db.pool is None:
+        raise HTTPException(status_code=501, detail="Slow statements need STORAGE_BACKEND=postgres")
+    async with async_db.acquire() as conn:
+        rows = await slow_queries.slowest(conn, limit, hours, request_id, method)
+    return {"threshold_ms": settings.SLOW_QUERY_MS, "items": rows}
 
 @app.post("/insert_user", status_code=status.HTTP_201_CREATED)
-def insert_credentials(req: InsertCredentialsRequest, conn=Depends(get_conn)):
+async def insert_credentials(
+    req: InsertCredentialsRequest,
+    request: Request,
+    idempotency_key: Optional[str] = Header(default=None, max_length=255),
+):
+    admission.check_rate(request)
     try:
-        cur = conn.cursor()
-        cur.execute(
-            """
-            INSERT INTO user_login_credentials
-              (user_id, first_name, last_name, email, phone_number, is_active)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            RETURNING id
-            """,
-            (
-                req.user_id,
-                req.first_name,
-                req.last_name,
-                req.email,
-                req.phone_number,
-                req.is_active,
-            ),
-        )
-        new_id = cur.fetchone()["id"]
-        conn.commit()
-        return {"inserted_id": new_id}
-    except psycopg2.Error as e:
-        conn.rollback()
-        logger.error(f"Database error: {e}")
-        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+        async with admission.gate.slot():
+            new_id = await methods.insert_one(req, idempotency_key or None)
+    except admission.Rejected:
+        raise
+    except asyncio.TimeoutError:
+        logger.error("Database pool exhausted")
+        raise HTTPException(status_code=503, detail="Database busy, try again")
     except Exception as e:
-        conn.rollback()
         logger.error(f"Unexpected error: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
+    if isinstance(new_id, Exception):
+        logger.error(f"Database error: {new_id}")
+        raise HTTPException(status_code=500, detail=f"Database error: {str(new_id)}")
+    return {"inserted_id": new_id}
+
+
+def _rpc_error(req_id, code: int, message: str, data=None) -> dict:
+    error = {"code": code, "message": message}
+    if data is not None:
+        error["data"] = data
+    return {"jsonrpc": "2.0", "id": req_id, "error": error}
+
+
+def _rpc_result(req_id, result) -> dict:
+    if isinstance(result, Exception):
+        if isinstance(result, RPCError):
+            return _rpc_error(req_id, result.code, result.message, result.data)
+        return _rpc_error(req_id, -32000, "DB error", str(result))
+    return {"jsonrpc": "2.0", "id": req_id, "result": result}
+
+
+def _is_valid_envelope(rpc) -> bool:
+    # params may be omitted (JSON-RPC 2.0 §4.2), e.g. for tools/list
+    return (
+        isinstance(rpc, dict)
+        and rpc.get("jsonrpc") == "2.0"
+        and isinstance(rpc.get("method"), str) and "id" in rpc
+    )
+
+
+def _resolve(rpc) -> Tuple[Optional[registry.MCPMethod], object, Optional[dict]]:
+    """Look up the method and validate params; returns (method, params, error response)."""
+    req_id = rpc["id"]
+    method = registry.get(rpc["method"])
+    if method is None:
+        _record(None, -32601)
+        return None, None, _rpc_error(req_id, -32601, "Method not found", rpc["method"])
+    metrics.current_method.set(method.name)
+    try:
+        with metrics.phase("validation"):
+            return method, method.parse_params(rpc.get("params")), None
+    except ValidationError as ve:
+        _record(method.name, -32602)
+        return None, None, _rpc_error(req_id, -32602, "Invalid params", str(ve))
+
+
+def _record(method_name: Optional[str], error_code: Optional[int] = None, seconds: Optional[float] = None):
+    name = method_name or "<unknown>"
+    metrics.REQUESTS.inc(name)
+    if error_code is not None:
+        metrics.ERRORS.inc(name, str(error_code))
+    if seconds is not None:
+        metrics.LATENCY.observe(seconds, name)
+
+
+async def _call(method: registry.MCPMethod, req_id, params) -> dict:
+    metrics.current_method.set(method.name)
+    start = time.perf_counter()
+    try:
+        response = _rpc_result(req_id, await method.handler(params))
+    except Exception as e:
+        logger.error(f"MCP method {method.name} failed: {e}")
+        response = _rpc_result(req_id, e)
+    error = response.get("error")
+    _record(method.name, error["code"] if error else None, time.perf_counter() - start)
+    return response
+
+
+async def handle_mcp_batch(batch: list) -> list:
+    """
+    Handle a JSON-RPC 2.0 batch. Every element is validated on its own.
+    Calls to methods with a batch handler (e.g. insert_credentials) are run
+    together — one multi-row INSERT and one commit — and the rest one by one.
+    Responses come back in request order.
+    """
+    responses: List[Optional[dict]] = [None] * len(batch)
+    grouped: Dict[str, List[Tuple[int, object, object]]] = {}
+
+    for i, rpc in enumerate(batch):
+        if not _is_valid_envelope(rpc):
+            req_id = rpc.get("id") if isinstance(rpc, dict) else None
+            _record(None, -32600)
+            responses[i] = _rpc_error(req_id, -32600, "Invalid Request")
+            continue
+        method, params, error = _resolve(rpc)
+        if error is not None:
+            responses[i] = error
+        elif method.batch_handler is not None:
+            grouped.setdefault(method.name, []).append((i, rpc["id"], params))
+        else:
+            responses[i] = await _call(method, rpc["id"], params)
+
+    for name, calls in grouped.items():
+        method = registry.get(name)
+        metrics.current_method.set(name)
+        start = time.perf_counter()
+        try:
+            results = await method.batch_handler([params for _, _, params in calls])
+        except Exception as e:
+            logger.error(f"Batch {name} failed: {e}")
+            results = [e] * len(calls)
+        # Every call in the group shares the batch's latency
+        elapsed = time.perf_counter() - start
+        for (i, req_id, _), result in zip(calls, results):
+            responses[i] = _rpc_result(req_id, result)
+            error = responses[i].get("error")
+            _record(name, error["code"] if error else None, elapsed)
+
+    return responses
+
+
+def _http_status(response: dict) -> int:
+    error = response.get("error")
+    if error is None:
+        return 200
+    if error["code"] == jobs.JOB_QUEUE_FULL:
+        return 503
+    if error["code"] == jobs.JOB_NOT_FOUND:
+        return 404
+    return 500 if error["code"] in (-32000, -32603) else 400
+
 
 @app.post("/mcp")
 async def mcp_endpoint(request: Request):
-    body = await request.body()
-    logger.info(f"MCP request received - Raw body: {body.decode()}")
-    rpc = await request.json()
+    # JSON or MessagePack, by Content-Type; answered per Accept (default: same as the request)
+    fmt = codec.response_format(request)
+    parse_start = time.perf_counter()
+    try:
+        body_format = codec.request_format(request)
+        body = await codec.read_body(request, settings.MCP_MAX_BODY_BYTES)
+    except codec.UnsupportedMediaType as e:
+        _record(None, -32600)
+        return RPCResponse(status_code=415, content=_rpc_error(None, -32600, "Unsupported media type", str(e)))
+    except codec.BodyTooLarge as e:
+        _record(None, -32600)
+        return RPCResponse(status_code=413, content=_rpc_error(None, -32600, "Request too large", str(e)), media_type=fmt)
+    if body_format == codec.JSON:
+        codec.log_body("MCP request received - Raw body", body)
+    try:
+        rpc = codec.decode(body, body_format)
+    except ValueError as e:
+        _record(None, -32700)
+        return RPCResponse(status_code=400, content=_rpc_error(None, -32700, "Parse error", str(e)), media_type=fmt)
+    metrics.observe_phase("parse", time.perf_counter() - parse_start)
+
+    if isinstance(rpc, list):
+        if not rpc:
+            return RPCResponse(status_code=400, content=_rpc_error(None, -32600, "Invalid Request"), media_type=fmt)
     # Basic JSON-RPC 2.0 validation
-    if rpc.get("jsonrpc") != "2.0" or "method" not in rpc or "params" not in rpc or "id" not in rpc:
+    elif not _is_valid_envelope(rpc):
+        _record(None, -32600)
         raise HTTPException(400, "Invalid JSON-RPC 2.0 envelope")
-    method, params, req_id = rpc["method"], rpc["params"], rpc["id"]
 
-    if method == "insert_credentials":
-        # Validate params
-        try:
-            body = InsertCredentialsRequest(**params)
-        except Exception as ve:
-            return JSONResponse(
-                status_code=400,
-                content={"jsonrpc":"2.0","id":req_id,
-                         "error":{"code":-32602,"message":"Invalid params","data":str(ve)}}
-            )
-        # Perform DB insertion
-        conn = None
-        try:
-            conn = get_db_connection()  # Use the direct function instead
-            cur = conn.cursor()
-            cur.execute(
-                """
-                INSERT INTO user_login_credentials
-                  (user_id, first_name, last_name, email, phone_number, is_active)
-                VALUES (%s,%s,%s,%s,%s,%s)
-                RETURNING id
-                """,
-                (body.user_id, body.first_name, body.last_name,
-                 body.email, body.phone_number, body.is_active),
-            )
-            inserted = cur.fetchone()["id"]
-            conn.commit()
-            result = {"inserted_id": inserted}
-        except Exception as e:
-            if conn:
-                conn.rollback()
-            return JSONResponse(
-                status_code=500,
-                content={"jsonrpc":"2.0","id":req_id,
-                         "error":{"code":-32000,"message":"DB error","data":str(e)}}
-            )
-        finally:
-            if conn:
-                conn.close()
-        return {"jsonrpc":"2.0","id":req_id,"result":result}
\ No newline at end of file
+    try:
+        admission.check_rate(request)
+        async with admission.gate.slot():
+            if isinstance(rpc, list):
+                return RPCResponse(await handle_mcp_batch(rpc), media_type=fmt)
+            # O(1) registry lookup + precompiled params validation
+            method, params, response = _resolve(rpc)
+            if response is None:
+                response = await _call(method, rpc["id"], params)
+            return RPCResponse(status_code=_http_status(response), content=response, media_type=fmt)
+    except admission.Rejected as e:
+        return RPCResponse(status_code=429, content=_rejected(rpc, e), headers=e.headers, media_type=fmt)
+
+
+def _rejected(rpc, e: admission.Rejected):
+    """One error per call, so batch clients can match them up by id."""
+    data = {"retry_after": e.retry_after}
+    calls = rpc if isinstance(rpc, list) else [rpc]
+    for call in calls:
+        method = call.get("method") if isinstance(call, dict) else None
+        _record(method if isinstance(method, str) and registry.get(method) else None, e.code)
+    errors = [_rpc_error(c.get("id") if isinstance(c, dict) else None, e.code, e.message, data) for c in calls]
+    return errors if isinstance(rpc, list) else errors[0]
+
+
+@app.post("/bulk/insert_credentials")
+async def bulk_insert_credentials(request: Request):
+    """
+    Stream NDJSON (one object per line) or CSV (header row + one record per
+    line, selected by a text/csv Content-Type) into user_login_credentials
+    using COPY. Reports accepted/rejected counts and the failed row numbers.
+    """
+    content_type = request.headers.get("content-type", "")
+    fmt = "csv" if "csv" in content_type else "ndjson"
+    admission.check_rate(request)
+    async with admission.gate.slot():
+        report = await bulk.bulk_load_stream(request.stream(), fmt)
+    return JSONResponse(status_code=500 if "error" in report else 200, content=report)
+
+
+@app.get("/export/credentials")
+async def export_credentials(
+    after_id: int = Query(default=0, ge=0),
+    fetch_size: int = Query(default=settings.EXPORT_FETCH_SIZE, ge=1, le=settings.EXPORT_MAX_FETCH_SIZE),
+):
+    """
+    Stream user_login_credentials as NDJSON in id order through a server-side
+    cursor. To resume after a disconnect, pass the last id received as after_id.
+    """
+    if db.pool is None:
+        raise HTTPException(status_code=501, detail="Export needs STORAGE_BACKEND=postgres")
+    # Check out here rather than inside the stream, so a busy pool is still a 503;
+    # the response returns the connection when it is done
+    conn = await run_in_threadpool(_checkout)
+    try:
+        return export.ExportResponse(conn, after_id, fetch_size)
+    except Exception:
+        await asyncio.shield(run_in_threadpool(export.release, conn))
+        raise
+
+
+@app.get("/jobs/{job_id}/export")
+async def job_export(job_id: str):
+    """The NDJSON file written by a succeeded export_credentials job."""
+    try:
+        job = jobs.queue.get(job_id)
+    except RPCError:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.method != "export_credentials":
+        raise HTTPException(status_code=404, detail="Not an export job")
+    if job.status != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Export is {job.status}")
+    return FileResponse(export.export_path(job.id), media_type="application/x-ndjson")
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """
+    Server-sent events for a background job: a `progress` event whenever it
+    changes (at most every JOBS_EVENT_INTERVAL seconds) and a final `done` event.
+    """
+    try:
+        job = jobs.queue.get(job_id)
+    except RPCError:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        while True:
+            state = job.to_dict()
+            if state["status"] in jobs.TERMINAL:
+                yield b"event: done\ndata: " + codec.dumps(state) + b"\n\n"
+                return
+            yield b"event: progress\ndata: " + codec.dumps(state) + b"\n\n"
+            if not await job.wait_changed(timeout=15.0):
+                yield b": keep-alive\n\n"
+            # Coalesce bursts of progress updates
+            await asyncio.sleep(settings.JOBS_EVENT_INTERVAL)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
@@ -0,0 +1,268 @@
+# app/methods.py
+from typing import Any, Awaitable, Callable, List, Optional, Union
+
+from . import bulk, credentials, export, group_commit, id_blocks, idempotency, jobs, reads, registry, results, storage
+from .registry import RPCError, batch_handler, mcp_method
+from .schemas import (
+    BulkInsertCredentialsRequest,
+    ExportCredentialsRequest,
+    GetCredentialsRequest,
+    InsertCredentialsParams,
+    InsertCredentialsRequest,
+    JobRequest,
+    LatencyTrendsRequest,
+    ListCredentialsRequest,
+    RecordRequestTimingsRequest,
+    RecordTestRunsRequest,
+    RecordTestStepsRequest,
+    ReserveIdsRequest,
+    UpsertCredentialsParams,
+)
+
+
+async def insert_one(req: InsertCredentialsRequest, idempotency_key: Optional[str] = None) -> Union[int, Exception]:
+    """
+    Single-row insert shared by /insert_user and insert_credentials: idempotent
+    when keyed, group-committed when enabled. Returns the id or the error.
+    """
+    if idempotency_key is not None:
+        result = idempotency.cached(idempotency_key)
+        if result is not None:
+            return result
+        result = await storage.backend.insert_credentials_once(idempotency_key, req)
+        if not isinstance(result, Exception):
+            idempotency.remember(idempotency_key, result)
+    elif group_commit.committer is not None:
+        result = await group_commit.committer.insert(req)
+    else:
+        result = (await storage.backend.insert_credentials_many([req]))[0]
+    if not isinstance(result, Exception):
+        reads.invalidate([req])
+    return result
+
+
+@mcp_method(
+    "insert_credentials",
+    InsertCredentialsParams,
+    description=(
+        "Insert a row into user_login_credentials. Retries that pass the same "
+        "idempotency_key get the original inserted_id back"
+    ),
+    statements={
+        "insert_credentials": credentials.INSERT_ONE_SQL_ASYNC,
+        "insert_credentials_many": credentials.INSERT_MANY_SQL_ASYNC,
+        "idempotency_claim": idempotency.CLAIM_SQL_ASYNC,
+        "idempotency_lookup": idempotency.LOOKUP_SQL_ASYNC,
+        "idempotency_record": idempotency.RECORD_SQL_ASYNC,
+    },
+)
+async def insert_credentials(params: InsertCredentialsParams):
+    result = await insert_one(params, params.idempotency_key)
+    if isinstance(result, Exception):
+        raise result
+    return {"inserted_id": result}
+
+
+@batch_handler("insert_credentials")
+async def insert_credentials_batch(params_list: List[InsertCredentialsParams]):
+    """
+    Every insert_credentials call in a batch: one multi-row INSERT, one commit.
+    Calls with an idempotency key are deduplicated one by one instead.
+    """
+    results: List[Union[int, Exception, None]] = [None] * len(params_list)
+    plain = []
+    for i, params in enumerate(params_list):
+        if params.idempotency_key is not None:
+            results[i] = await insert_one(params, params.idempotency_key)
+        else:
+            plain.append(i)
+    if plain:
+        inserted = await storage.backend.insert_credentials_many([params_list[i] for i in plain])
+        for i, result in zip(plain, inserted):
+            results[i] = result
+        reads.invalidate(params_list[i] for i, r in zip(plain, inserted) if not isinstance(r, Exception))
+    return [r if isinstance(r, Exception) else {"inserted_id": r} for r in results]
+
+
+@mcp_method(
+    "upsert_credentials",
+    UpsertCredentialsParams,
+    description=(
+        "Insert a row into user_login_credentials, resolving conflicts in the same "
+        "statement: on_conflict=update overwrites the row with the same user_id, "
+        "on_conflict=ignore skips rows that clash on any unique column"
+    ),
+    statements={
+        "upsert_credentials": credentials.UPSERT_SQL_ASYNC,
+        "insert_credentials_ignore": credentials.INSERT_IGNORE_SQL_ASYNC,
+    },
+)
+async def upsert_credentials(params: UpsertCredentialsParams):
+    result = await storage.backend.upsert_credentials(params, update=params.on_conflict == "update")
+    if isinstance(result, Exception):
+        raise result
+    if result["action"] != "skipped":
+        # The replaced email / phone_number may still be cached as lookups
+        reads.invalidate([params, result.pop("previous", {})])
+    return result
+
+
+@mcp_method(
+    "bulk_insert_credentials",
+    BulkInsertCredentialsRequest,
+    description=(
+        "Load many rows into user_login_credentials with COPY. "
+        "With background=true, returns a job id to follow with jobs/status"
+    ),
+)
+async def bulk_insert_credentials(params: BulkInsertCredentialsRequest):
+    async def run(job=None):
+        report = await bulk.bulk_load_rows(params.rows, on_progress=job.progress if job else None)
+        if "error" in report:
+            raise RPCError(-32000, "DB error", report)
+        return report
+
+    if params.background:
+        job = jobs.queue.submit("bulk_insert_credentials", run, total=len(params.rows))
+        return {"job_id": job.id, "status": job.status}
+    return await run()
+
+
+@mcp_method(
+    "export_credentials",
+    ExportCredentialsRequest,
+    description=(
+        "Export user_login_credentials rows with id > after_id as NDJSON in a background "
+        "job. Follow it with jobs/status, then download GET /jobs/{job_id}/export"
+    ),
+    # Pages are read with list_credentials' statement
+    statements={"count_credentials": credentials.COUNT_SQL_ASYNC},
+)
+async def export_credentials(params: ExportCredentialsRequest):
+    async def run(job):
+        return await export.export_to_file(job, params.after_id, params.fetch_size)
+
+    total = await storage.backend.count_credentials(params.after_id)
+    job = jobs.queue.submit("export_credentials", run, total=total)
+    return {"job_id": job.id, "status": job.status}
+
+
+@mcp_method("jobs/status", JobRequest, description="Status, progress, rate and ETA of a background job")
+async def jobs_status(params: JobRequest):
+    return jobs.queue.get(params.job_id).to_dict()
+
+
+@mcp_method("jobs/cancel", JobRequest, description="Cancel a queued or running background job")
+async def jobs_cancel(params: JobRequest):
+    return jobs.queue.cancel(params.job_id).to_dict()
+
+
+@mcp_method(
+    "get_credentials",
+    GetCredentialsRequest,
+    description="Look up one user_login_credentials row by user_id, email or phone_number",
+    statements={f"get_credentials_by_{f}": sql for f, sql in credentials.GET_SQL_ASYNC.items()},
+)
+async def get_credentials(params: GetCredentialsRequest):
+    return {"credentials": await reads.get_credentials(*params.lookup)}
+
+
+@mcp_method(
+    "list_credentials",
+    ListCredentialsRequest,
+    description="Page through user_login_credentials by id; pass next_after_id as after_id",
+    statements={"list_credentials": credentials.LIST_SQL_ASYNC},
+)
+async def list_credentials(params: ListCredentialsRequest):
+    return await reads.list_credentials(params.after_id, params.limit)
+
+
+@mcp_method(
+    "reserve_ids",
+    ReserveIdsRequest,
+    description=(
+        "Reserve a block of `count` consecutive ids from a named allocator. No other "
+        "caller ever gets ids from the block, so agents can build unique user_id / "
+        "email / phone_number values from it locally"
+    ),
+    statements={"reserve_ids": id_blocks.RESERVE_SQL_ASYNC},
+)
+async def reserve_ids(params: ReserveIdsRequest):
+    first = await storage.backend.reserve_ids(params.name, params.count)
+    return {"name": params.name, "first": first, "count": params.count}
+
+
+# ─── Test-run results ─────────────────────────────────────────
+async def _record_together(
+    lists: List[List[Any]], write: Callable[[List[Any]], Awaitable[int]]
+) -> List[Union[dict, Exception]]:
+    """Batch handler body for record_*: every call's rows in one write."""
+    try:
+        await write([item for items in lists for item in items])
+    except Exception as e:
+        return [e] * len(lists)
+    return [{"recorded": len(items)} for items in lists]
+
+
+@mcp_method(
+    "record_test_runs",
+    RecordTestRunsRequest,
+    description="Record QA test runs; recording a run_id again updates its status, finished_at and metadata",
+    statements={"record_test_runs": results.RECORD_RUNS_SQL_ASYNC},
+)
+async def record_test_runs(params: RecordTestRunsRequest):
+    return {"recorded": await storage.backend.record_test_runs(params.runs)}
+
+
+@batch_handler("record_test_runs")
+async def record_test_runs_batch(params_list: List[RecordTestRunsRequest]):
+    return await _record_together([p.runs for p in params_list], storage.backend.record_test_runs)
+
+
+@mcp_method(
+    "record_test_steps",
+    RecordTestStepsRequest,
+    description="Record the steps of QA test runs with their status and duration",
+    statements={"record_test_steps": results.RECORD_STEPS_SQL_ASYNC},
+)
+async def record_test_steps(params: RecordTestStepsRequest):
+    return {"recorded": await storage.backend.record_test_steps(params.steps)}
+
+
+@batch_handler("record_test_steps")
+async def record_test_steps_batch(params_list: List[RecordTestStepsRequest]):
+    return await _record_together([p.steps for p in params_list], storage.backend.record_test_steps)
+
+
+@mcp_method(
+    "record_request_timings",
+    RecordRequestTimingsRequest,
+    description="Record per-request HTTP timings made during QA test runs",
+    statements={"record_request_timings": results.RECORD_TIMINGS_SQL_ASYNC},
+)
+async def record_request_timings(params: RecordRequestTimingsRequest):
+    return {"recorded": await storage.backend.record_request_timings(params.timings)}
+
+
+@batch_handler("record_request_timings")
+async def record_request_timings_batch(params_list: List[RecordRequestTimingsRequest]):
+    return await _record_together([p.timings for p in params_list], storage.backend.record_request_timings)
+
+
+@mcp_method(
+    "get_latency_trends",
+    LatencyTrendsRequest,
+    description=(
+        "Per-hour/day/week latency (avg, p50, p95, max) and failure counts of each "
+        "test step, or of each request made by the tests, over the last N days"
+    ),
+    statements={f"latency_trends_{source}": sql for source, sql in results.TRENDS_SQL_ASYNC.items()},
+)
+async def get_latency_trends(params: LatencyTrendsRequest):
+    rows = await storage.backend.latency_trends(params)
+    return {"source": params.source, "bucket": params.bucket, "series": results.series(rows)}
+
+
+@mcp_method("tools/list", description="List the methods this server provides")
+async def tools_list(params):
+    return {"tools": registry.list_tools()}
@@ -0,0 +1,250 @@
+# app/metrics.py
+"""
+Prometheus-style metrics with lock-free recording.
+
+Every metric keeps one shard per thread (`threading.local`), so the hot path is a
+plain dict update on data no other thread writes to. The only lock is taken once
+per thread, when its shard is first created. `/metrics` sums the shards at scrape
+time.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# JSON-RPC method (or REST route) the current request is serving; phase timings
+# recorded deep in the DB helpers are attributed to it
+current_method: ContextVar[str] = ContextVar("current_method", default="")
+# phase -> seconds summed over the current request (set by tracing.RequestIdMiddleware)
+request_phases: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_phases", default=None)
+
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+_registry: List["_Metric"] = []
+Collector = Callable[[], Iterable[Tuple[str, str, Dict[str, str], float]]]
+_collectors: List[Tuple[str, Collector]] = []   # (kind, collector)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self._local = threading.local()
+        self._shards: List[Dict] = []
+        self._shards_lock = threading.Lock()
+        _registry.append(self)
+
+    def _shard(self) -> Dict:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+            return shard
+
+    def _snapshot(self) -> List[Tuple[Tuple, object]]:
+        with self._shards_lock:
+            shards = list(self._shards)
+        # dict.items() copied under the GIL; values are only summed here
+        return [item for shard in shards for item in list(shard.items())]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *label_values, amount: float = 1.0):
+        shard = self._shard()
+        shard[label_values] = shard.get(label_values, 0.0) + amount
+
+    def collect(self) -> Iterable[str]:
+        totals: Dict[Tuple, float] = {}
+        for key, value in self._snapshot():
+            totals[key] = totals.get(key, 0.0) + value
+        for key, value in sorted(totals.items()):
+            yield f"{self.name}{_format_labels(self.labels, key)} {value}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *label_values):
+        shard = self._shard()
+        state = shard.get(label_values)
+        if state is None:
+            # [per-bucket counts..., +Inf count, sum]
+            state = shard[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+        state[bisect.bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    def collect(self) -> Iterable[str]:
+        totals: Dict[Tuple, List] = {}
+        for key, state in self._snapshot():
+            agg = totals.get(key)
+            if agg is None:
+                totals[key] = list(state)
+            else:
+                for i, v in enumerate(state):
+                    agg[i] += v
+        for key, state in sorted(totals.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), state[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield f"{self.name}_bucket{_format_labels(self.labels + ('le',), key + (le,))} {cumulative}"
+            labels = _format_labels(self.labels, key)
+            yield f"{self.name}_sum{labels} {state[-1]}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+def gauge_collector(fn: Collector):
+    """
+    Register a function producing (name, help, labels, value) gauge samples at
+    scrape time — used for pool stats, which are read rather than recorded.
+    """
+    _collectors.append(("gauge", fn))
+    return fn
+
+
+def counter_collector(fn: Collector):
+    """gauge_collector for totals that only ever increase; names end in _total."""
+    _collectors.append(("counter", fn))
+    return fn
+
+
+# ─── Metrics ──────────────────────────────────────────────────
+REQUESTS = Counter("mcp_requests_total", "Requests handled, per JSON-RPC method or REST route", ("method",))
+ERRORS = Counter("mcp_errors_total", "Requests that returned an error", ("method", "code"))
+LATENCY = Histogram("mcp_request_duration_seconds", "End-to-end handler latency", ("method",))
+PHASES = Histogram(
+    "mcp_phase_duration_seconds",
+    "Time spent per phase: parse, admission_wait, validation, group_wait, pool_wait, sql, commit",
+    ("method", "phase"),
+)
+GROUP_COMMIT_BATCH = Histogram(
+    "mcp_group_commit_batch_size",
+    "Rows written per group commit",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+)
+GROUP_COMMIT_FLUSHES = Counter(
+    "mcp_group_commit_flushes_total",
+    "Group commits, by what triggered them: window, size or shutdown",
+    ("reason",),
+)
+ADMISSION_REJECTED = Counter(
+    "mcp_admission_rejected_total",
+    "Requests turned away by admission control: busy or rate_limited",
+    ("reason",),
+)
+SLOW_QUERIES = Counter(
+    "mcp_slow_queries_total",
+    "Statements slower than SLOW_QUERY_MS, per JSON-RPC method or REST route",
+    ("method",),
+)
+SLOW_QUERIES_DROPPED = Counter(
+    "mcp_slow_queries_dropped_total",
+    "Slow statements logged but not recorded because the recorder queue was full",
+)
+IDEMPOTENT_REPLAYS = Counter(
+    "mcp_idempotent_replays_total",
+    "Inserts answered from an earlier call with the same idempotency key",
+    ("source",),
+)
+
+
+def observe_phase(phase: str, seconds: float):
+    PHASES.observe(seconds, current_method.get() or "*", phase)
+    phases = request_phases.get()
+    if phases is not None:
+        phases[phase] = phases.get(phase, 0.0) + seconds
+
+
+@contextmanager
+def phase(name: str):
+    """Time a block as one request phase of the current method."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_phase(name, time.perf_counter() - start)
+
+
+class MetricsMiddleware:
+    """
+    Plain ASGI middleware: tags the request with its route (so phase timings can
+    be attributed) and records count/latency/errors for REST routes. /mcp calls
+    are recorded per JSON-RPC method by the dispatcher instead.
+    """
+
+    def __init__(self, app, skip: Tuple[str, ...] = ("/mcp", "/metrics")):
+        self.app = app
+        self.skip = skip
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        route = scope["path"]
+        current_method.set(route)
+        if route in self.skip:
+            return await self.app(scope, receive, send)
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Label by route template (e.g. /jobs/{job_id}) to keep cardinality bounded
+            label = getattr(scope.get("route"), "path", route)
+            REQUESTS.inc(label)
+            LATENCY.observe(time.perf_counter() - start, label)
+            if status >= 400:
+                ERRORS.inc(label, str(status))
+
+
+def render() -> str:
+    """Prometheus text exposition format (0.0.4)."""
+    lines: List[str] = []
+    for metric in _registry:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.collect())
+    # Samples of one family may come from several collectors; keep each family contiguous
+    families: Dict[str, Tuple[str, str, List[str]]] = {}
+    for kind, collector in _collectors:
+        for name, help_text, labels, value in collector():
+            samples = families.setdefault(name, (kind, help_text, []))[2]
+            samples.append(f"{name}{_format_labels(tuple(labels), tuple(labels.values()))} {value}")
+    for name, (kind, help_text, samples) in families.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,141 @@
+# app/migrations.py
+"""
+Versioned schema migrations.
+
+Each file in MIGRATIONS_DIR named `NNNN_description.sql` is applied once, in
+version order, in its own transaction, and recorded in `schema_migrations`.
+Workers run this at startup (DB_MIGRATE_ON_STARTUP). A session advisory lock
+makes concurrent workers wait for whichever one got there first, so each
+migration runs exactly once. To migrate out of band instead:
+
+    python -m app.migrations            # apply pending migrations
+    python -m app.migrations --list     # show applied / pending
+"""
+import argparse
+import hashlib
+import logging
+import os
+import re
+from typing import List, NamedTuple, Optional, Set
+
+from psycopg2 import sql
+
+from .config import settings
+from . import db
+
+logger = logging.getLogger(__name__)
+
+# Any constant works as long as every worker uses the same one
+LOCK_ID = 0x6D63705F6D6967  # "mcp_mig"
+
+_FILENAME = re.compile(r"^(\d+)_(\w+)\.sql$")
+
+CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version    integer PRIMARY KEY,
+    name       text NOT NULL,
+    checksum   text NOT NULL,
+    applied_at timestamptz NOT NULL DEFAULT now()
+)
+"""
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    path: str
+
+    def read(self) -> str:
+        with open(self.path, encoding="utf-8") as f:
+            return f.read()
+
+    def checksum(self) -> str:
+        return hashlib.sha256(self.read().encode("utf-8")).hexdigest()
+
+
+def discover(path: Optional[str] = None) -> List[Migration]:
+    """Migration files in `path`, in version order."""
+    path = path or settings.MIGRATIONS_DIR
+    migrations = []
+    for filename in os.listdir(path):
+        match = _FILENAME.match(filename)
+        if match:
+            migrations.append(Migration(int(match.group(1)), match.group(2), os.path.join(path, filename)))
+    migrations.sort()
+    for a, b in zip(migrations, migrations[1:]):
+        if a.version == b.version:
+            raise ValueError(f"Duplicate migration version {a.version}: {a.name}, {b.name}")
+    return migrations
+
+
+def _applied(cur) -> dict:
+    cur.execute("SELECT version, checksum FROM schema_migrations")
+    return {row["version"]: row["checksum"] for row in cur.fetchall()}
+
+
+def migrate(conn, migrations: Optional[List[Migration]] = None) -> List[Migration]:
+    """Apply pending migrations on `conn`; returns the ones applied."""
+    migrations = discover() if migrations is None else migrations
+    applied_now = []
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_advisory_lock(%s)", (LOCK_ID,))
+        try:
+            cur.execute(sql.SQL("CREATE SCHEMA IF NOT EXISTS {}").format(sql.Identifier(settings.DB_SCHEMA_NAME)))
+            cur.execute(CREATE_TABLE_SQL)
+            conn.commit()
+            applied = _applied(cur)
+            for migration in migrations:
+                if migration.version in applied:
+                    if applied[migration.version] != migration.checksum():
+                        logger.warning(f"Migration {migration.version:04d}_{migration.name} changed after it was applied")
+                    continue
+                logger.info(f"Applying migration {migration.version:04d}_{migration.name}")
+                try:
+                    cur.execute(migration.read())
+                    cur.execute(
+                        "INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s)",
+                        (migration.version, migration.name, migration.checksum()),
+                    )
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                applied_now.append(migration)
+        finally:
+            conn.rollback()
+            cur.execute("SELECT pg_advisory_unlock(%s)", (LOCK_ID,))
+            conn.commit()
+    return applied_now
+
+
+def pending(conn, migrations: Optional[List[Migration]] = None) -> List[Migration]:
+    migrations = discover() if migrations is None else migrations
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regclass('schema_migrations') IS NOT NULL AS exists")
+        done: Set[int] = set(_applied(cur)) if cur.fetchone()["exists"] else set()
+    conn.rollback()
+    return [m for m in migrations if m.version not in done]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply the SQL migrations in MIGRATIONS_DIR")
+    parser.add_argument("--list", action="store_true", help="show applied and pending migrations, apply nothing")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    db.open_pool()
+    try:
+        with db.pool.connection() as conn:
+            if args.list:
+                todo = {m.version for m in pending(conn)}
+                for m in discover():
+                    print(f"{m.version:04d} {m.name:<40} {'pending' if m.version in todo else 'applied'}")
+            else:
+                applied = migrate(conn)
+                print(f"Applied {len(applied)} migration(s)")
+    finally:
+        db.close_pool()
+
+
+if __name__ == "__main__":
+    main()
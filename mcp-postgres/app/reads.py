@@ -0,0 +1,83 @@
+# app/reads.py
+"""
+Read tools over user_login_credentials: point lookups by user_id / email /
+phone_number, and keyset-paginated listing by id.
+
+Results are kept in bounded LRU+TTL caches, so repeated verification lookups
+are answered from memory. Only rows that were found are cached, so a lookup
+that ran before an insert never hides it. Writes made by this worker call
+`invalidate()`. Writes made by other workers show up once READ_CACHE_TTL expires.
+"""
+from typing import Dict, Iterable, Optional
+
+from .cache import TTLCache
+from .config import settings
+from .credentials import LOOKUP_FIELDS
+from .metrics import gauge_collector
+from . import storage
+
+_rows = TTLCache(settings.READ_CACHE_SIZE, settings.READ_CACHE_TTL)
+_pages = TTLCache(settings.READ_CACHE_SIZE, settings.READ_CACHE_TTL)
+
+
+async def get_credentials(field: str, value: str) -> Optional[Dict]:
+    key = (field, value)
+    row = _rows.get(key)
+    if row is not None:
+        return row
+    row = await storage.backend.get_credentials(field, value)
+    if row is None:
+        return None
+    _remember(row)
+    return row
+
+
+async def list_credentials(after_id: int, limit: int) -> Dict:
+    key = (after_id, limit)
+    page = _pages.get(key)
+    if page is not None:
+        return page
+    items = await storage.backend.list_credentials(after_id, limit)
+    page = {
+        "items": items,
+        # Pass back as after_id for the next page; null once the end is reached
+        "next_after_id": items[-1]["id"] if len(items) == limit else None,
+    }
+    _pages.put(key, page)
+    for row in items:
+        _remember(row)
+    return page
+
+
+def _remember(row: Dict):
+    for field in LOOKUP_FIELDS:
+        if row.get(field) is not None:
+            _rows.put((field, row[field]), row)
+
+
+def invalidate(rows: Iterable = ()):
+    """
+    Called after a local write. New rows can change any page, so the page cache
+    is dropped, along with cached lookups for `rows` (dicts, or anything
+    carrying the lookup fields as attributes, e.g. the insert requests).
+    """
+    _pages.clear()
+    for row in rows:
+        for field in LOOKUP_FIELDS:
+            value = row.get(field) if isinstance(row, dict) else getattr(row, field, None)
+            if value is not None:
+                _rows.pop((field, value))
+
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    return {
+        name: {"size": len(c), "hits": c.hits, "misses": c.misses}
+        for name, c in (("rows", _rows), ("pages", _pages))
+    }
+
+
+@gauge_collector
+def _cache_gauges():
+    for cache, values in cache_stats().items():
+        for key, value in values.items():
+            yield f"mcp_read_cache_{key}", f"Read cache {key}", {"cache": cache}, value
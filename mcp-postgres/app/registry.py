@@ -0,0 +1,107 @@
+# app/registry.py
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Type
+
+from pydantic import BaseModel
+
+
+class RPCError(Exception):
+    """Raised by MCP handlers to return a specific JSON-RPC error."""
+
+    def __init__(self, code: int, message: str, data: Any = None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.data = data
+
+
+@dataclass
+class MCPMethod:
+    """
+    One MCP method: its params model, the SQL it runs and its handler, declared once.
+
+    - `handler(params)` gets the validated params model and returns the result.
+    - `batch_handler(params_list)` (optional) handles every call to this method in
+      a JSON-RPC batch at once and returns one result or Exception per call.
+    - `statements` maps statement names to the exact SQL text the handler runs.
+      asyncpg's statement cache prepares each text on a pooled connection the
+      first time it runs there and reuses it for the connection's lifetime, so
+      handlers must pass these exact strings to `fetch()`/`execute()`.
+    """
+    name: str
+    handler: Callable[[Any], Awaitable[Any]]
+    params_model: Optional[Type[BaseModel]] = None
+    description: str = ""
+    statements: Dict[str, str] = field(default_factory=dict)
+    batch_handler: Optional[Callable[[List[Any]], Awaitable[List[Any]]]] = None
+
+    def __post_init__(self):
+        # Bind the model's compiled validator once instead of looking it up per call
+        self.validate = self.params_model.model_validate if self.params_model else None
+        self.input_schema = (
+            self.params_model.model_json_schema() if self.params_model
+            else {"type": "object", "properties": {}}
+        )
+
+    def parse_params(self, params: Any) -> Any:
+        if self.validate is None:
+            return params
+        return self.validate(params if params is not None else {})
+
+
+_methods: Dict[str, MCPMethod] = {}
+_tools_cache: Optional[List[Dict]] = None
+
+
+def mcp_method(
+    name: str,
+    params_model: Optional[Type[BaseModel]] = None,
+    description: str = "",
+    statements: Optional[Dict[str, str]] = None,
+):
+    """Decorator registering an async handler as an MCP method."""
+    def decorator(handler):
+        register(MCPMethod(
+            name=name,
+            handler=handler,
+            params_model=params_model,
+            description=description or (handler.__doc__ or "").strip(),
+            statements=statements or {},
+        ))
+        return handler
+    return decorator
+
+
+def batch_handler(name: str):
+    """Decorator attaching a batch handler to an already registered method."""
+    def decorator(handler):
+        _methods[name].batch_handler = handler
+        return handler
+    return decorator
+
+
+def register(method: MCPMethod):
+    global _tools_cache
+    if method.name in _methods:
+        raise ValueError(f"MCP method '{method.name}' is already registered")
+    for stmt in method.statements:
+        if any(stmt in m.statements for m in _methods.values()):
+            raise ValueError(f"Prepared statement '{stmt}' is already registered")
+    _methods[method.name] = method
+    _tools_cache = None
+
+
+def get(name: str) -> Optional[MCPMethod]:
+    return _methods.get(name)
+
+
+def list_tools() -> List[Dict]:
+    """tools/list payload, built once from the registered methods."""
+    global _tools_cache
+    if _tools_cache is None:
+        _tools_cache = [
+            {"name": m.name, "description": m.description, "inputSchema": m.input_schema}
+            for m in _methods.values()
+        ]
+    return _tools_cache
+
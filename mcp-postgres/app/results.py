@@ -0,0 +1,154 @@
+# app/results.py
+"""
+Test-run results store: QA runs, their steps and per-request timings
+(migration 0003), recorded by agents through the record_* MCP tools and
+summarised by get_latency_trends.
+
+Every record_* call, and every JSON-RPC batch of them, is one multi-row
+`INSERT ... SELECT unnest(...)` per table, so an agent flushing its buffer
+costs one round trip per table however many rows it carries. Steps and
+timings carry a client-generated record_id (migration 0007), so re-sending
+a flush stores each row once.
+"""
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+
+from .codec import dumps
+from .metrics import phase
+from .schemas import RequestTiming, TestRun, TestStep
+
+# Re-recording a run keeps its name / started_at and updates the rest
+RECORD_RUNS_SQL_ASYNC = (
+    "INSERT INTO test_runs (run_id, name, project, status, started_at, finished_at, metadata) "
+    "SELECT run_id, name, project, status, started_at, finished_at, metadata::jsonb FROM unnest("
+    "$1::text[], $2::text[], $3::text[], $4::text[], $5::timestamptz[], $6::timestamptz[], $7::text[]"
+    ") AS t(run_id, name, project, status, started_at, finished_at, metadata) "
+    "ON CONFLICT (run_id) DO UPDATE SET status = EXCLUDED.status, "
+    "finished_at = coalesce(EXCLUDED.finished_at, test_runs.finished_at), "
+    "metadata = coalesce(EXCLUDED.metadata, test_runs.metadata)"
+)
+# Rows whose record_id is already stored are skipped
+RECORD_STEPS_SQL_ASYNC = (
+    "INSERT INTO test_steps (run_id, step, status, started_at, duration_ms, detail, record_id) "
+    "SELECT run_id, step, status, started_at, duration_ms, detail::jsonb, record_id FROM unnest("
+    "$1::text[], $2::text[], $3::text[], $4::timestamptz[], $5::float8[], $6::text[], $7::text[]"
+    ") AS t(run_id, step, status, started_at, duration_ms, detail, record_id) "
+    "ON CONFLICT (record_id) DO NOTHING"
+)
+RECORD_TIMINGS_SQL_ASYNC = (
+    "INSERT INTO test_request_timings "
+    "(run_id, step, method, url, status_code, started_at, duration_ms, record_id) "
+    "SELECT * FROM unnest("
+    "$1::text[], $2::text[], $3::text[], $4::text[], $5::int[], $6::timestamptz[], $7::float8[], $8::text[]) "
+    "ON CONFLICT (record_id) DO NOTHING"
+)
+
+# $1 bucket ("hour" | "day" | "week"), $2 days back, $3 test name, $4 step
+_TRENDS = (
+    "SELECT date_trunc($1, t.started_at) AS bucket, {key} AS key, count(*) AS samples, "
+    "avg(t.duration_ms) AS avg_ms, "
+    "percentile_cont(0.5) WITHIN GROUP (ORDER BY t.duration_ms) AS p50_ms, "
+    "percentile_cont(0.95) WITHIN GROUP (ORDER BY t.duration_ms) AS p95_ms, "
+    "max(t.duration_ms) AS max_ms, "
+    "count(*) FILTER (WHERE {failed}) AS failures "
+    "FROM {table} t "
+    "WHERE t.started_at >= now() - make_interval(days => $2) "
+    "AND ($3::text IS NULL OR t.run_id IN (SELECT run_id FROM test_runs WHERE name = $3)) "
+    "AND ($4::text IS NULL OR t.step = $4) "
+    "GROUP BY 1, 2 ORDER BY 2, 1"
+)
+TRENDS_SQL_ASYNC = {
+    "steps": _TRENDS.format(
+        key="t.step", failed="t.status IN ('failed', 'error')", table="test_steps",
+    ),
+    "requests": _TRENDS.format(
+        key="t.method || ' ' || t.url", failed="t.status_code IS NULL OR t.status_code >= 400",
+        table="test_request_timings",
+    ),
+}
+
+
+def _json(value: Optional[Dict]) -> Optional[str]:
+    return dumps(value).decode("utf-8") if value is not None else None
+
+
+def merge_runs(runs: Iterable[TestRun]) -> List[TestRun]:
+    """One entry per run_id, later entries applied over earlier ones like the upsert does."""
+    merged: Dict[str, TestRun] = {}
+    for run in runs:
+        previous = merged.get(run.run_id)
+        if previous is not None:
+            run = previous.model_copy(update={
+                "status": run.status,
+                "finished_at": run.finished_at or previous.finished_at,
+                "metadata": run.metadata if run.metadata is not None else previous.metadata,
+            })
+        merged[run.run_id] = run
+    return list(merged.values())
+
+
+async def record_runs_async(conn, runs: List[TestRun]) -> int:
+    runs = merge_runs(runs)
+    with phase("sql"):
+        await conn.execute(
+            RECORD_RUNS_SQL_ASYNC,
+            [r.run_id for r in runs], [r.name for r in runs], [r.project for r in runs],
+            [r.status for r in runs], [r.started_at for r in runs], [r.finished_at for r in runs],
+            [_json(r.metadata) for r in runs],
+        )
+    return len(runs)
+
+
+async def record_steps_async(conn, steps: List[TestStep]) -> int:
+    with phase("sql"):
+        await conn.execute(
+            RECORD_STEPS_SQL_ASYNC,
+            [s.run_id for s in steps], [s.step for s in steps], [s.status for s in steps],
+            [s.started_at for s in steps], [s.duration_ms for s in steps], [_json(s.detail) for s in steps],
+            [s.record_id for s in steps],
+        )
+    return len(steps)
+
+
+async def record_timings_async(conn, timings: List[RequestTiming]) -> int:
+    with phase("sql"):
+        await conn.execute(
+            RECORD_TIMINGS_SQL_ASYNC,
+            [t.run_id for t in timings], [t.step for t in timings], [t.method for t in timings],
+            [t.url for t in timings], [t.status_code for t in timings], [t.started_at for t in timings],
+            [t.duration_ms for t in timings], [t.record_id for t in timings],
+        )
+    return len(timings)
+
+
+# ─── Trends ─────────────────────────────────────────────────────
+def truncate(ts: datetime, bucket: str) -> datetime:
+    """Python equivalent of date_trunc (in UTC) for the memory backend."""
+    ts = ts.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    if bucket == "hour":
+        return ts
+    ts = ts.replace(hour=0)
+    if bucket == "week":
+        ts -= timedelta(days=ts.weekday())
+    return ts
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Linear interpolation between closest ranks, like percentile_cont."""
+    pos = (len(sorted_values) - 1) * q
+    lo, hi = math.floor(pos), math.ceil(pos)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def series(rows: Iterable[Dict]) -> Dict[str, List[Dict]]:
+    """Group trend rows by step (or request) into time-ordered points."""
+    grouped: Dict[str, List[Dict]] = {}
+    for row in rows:
+        grouped.setdefault(row["key"], []).append({
+            "bucket": row["bucket"],
+            "samples": row["samples"],
+            "failures": row["failures"],
+            **{k: round(row[k], 3) for k in ("avg_ms", "p50_ms", "p95_ms", "max_ms")},
+        })
+    return grouped
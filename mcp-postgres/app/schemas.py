@@ -1,6 +1,8 @@
 # app/schemas.py
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+from pydantic import AwareDatetime, BaseModel, EmailStr, Field, model_validator
+from typing import Any, Dict, List, Literal, Optional
+
+from .config import settings
 
 class InsertCredentialsRequest(BaseModel):
     user_id: str
@@ -9,3 +11,119 @@ class InsertCredentialsRequest(BaseModel):
     email: Optional[EmailStr] = None
     phone_number: Optional[str] = None
     is_active: Optional[bool] = True
+
+
+class InsertCredentialsParams(InsertCredentialsRequest):
+    # MCP params for insert_credentials; retries with the same key return the first inserted_id
+    idempotency_key: Optional[str] = Field(default=None, min_length=1, max_length=255)
+
+
+class UpsertCredentialsParams(InsertCredentialsRequest):
+    # "update": overwrite the row with the same user_id; "ignore": skip any unique clash
+    on_conflict: Literal["update", "ignore"] = "update"
+
+
+class BulkInsertCredentialsRequest(BaseModel):
+    # Rows are validated one by one by the COPY loader so bad rows can be reported
+    rows: List[Dict[str, Any]]
+    # Return a job id at once and load in the background (see jobs/status)
+    background: bool = False
+
+
+class ReserveIdsRequest(BaseModel):
+    # Allocator name, e.g. one per kind of generated account
+    name: str = Field(default="accounts", min_length=1, max_length=64, pattern=r"^[A-Za-z0-9_.:-]+$")
+    count: int = Field(default=1000, ge=1, le=settings.ID_BLOCK_MAX)
+
+
+class JobRequest(BaseModel):
+    job_id: str
+
+
+class ExportCredentialsRequest(BaseModel):
+    # Resume point, as for GET /export/credentials
+    after_id: int = Field(default=0, ge=0)
+    fetch_size: int = Field(default=settings.EXPORT_FETCH_SIZE, ge=1, le=settings.EXPORT_MAX_FETCH_SIZE)
+
+
+class GetCredentialsRequest(BaseModel):
+    # Exactly one lookup key
+    user_id: Optional[str] = None
+    email: Optional[str] = None
+    phone_number: Optional[str] = None
+
+    @model_validator(mode="after")
+    def _one_key(self):
+        given = [f for f in ("user_id", "email", "phone_number") if getattr(self, f) is not None]
+        if len(given) != 1:
+            raise ValueError("Pass exactly one of user_id, email, phone_number")
+        return self
+
+    @property
+    def lookup(self):
+        for field in ("user_id", "email", "phone_number"):
+            value = getattr(self, field)
+            if value is not None:
+                return field, value
+
+
+class ListCredentialsRequest(BaseModel):
+    # Keyset pagination: pass the previous page's next_after_id
+    after_id: int = Field(default=0, ge=0)
+    limit: int = Field(default=100, ge=1, le=settings.LIST_MAX_LIMIT)
+
+
+# Test-run results (record_* tools and get_latency_trends)
+class TestRun(BaseModel):
+    # Recording a run_id again updates its status / finished_at / metadata
+    run_id: str = Field(min_length=1, max_length=64)
+    name: str
+    project: Optional[str] = None
+    status: Literal["running", "passed", "failed", "error"] = "running"
+    started_at: AwareDatetime
+    finished_at: Optional[AwareDatetime] = None
+    metadata: Optional[Dict[str, Any]] = None
+
+
+class TestStep(BaseModel):
+    run_id: str = Field(min_length=1, max_length=64)
+    step: str
+    status: Literal["passed", "failed", "error", "skipped"]
+    started_at: AwareDatetime
+    duration_ms: float = Field(ge=0)
+    detail: Optional[Dict[str, Any]] = None
+    # Client-generated; a re-sent step with the same id is stored once
+    record_id: Optional[str] = Field(default=None, min_length=1, max_length=64)
+
+
+class RequestTiming(BaseModel):
+    run_id: str = Field(min_length=1, max_length=64)
+    step: Optional[str] = None
+    method: str
+    url: str
+    status_code: Optional[int] = None
+    started_at: AwareDatetime
+    duration_ms: float = Field(ge=0)
+    # Client-generated; a re-sent timing with the same id is stored once
+    record_id: Optional[str] = Field(default=None, min_length=1, max_length=64)
+
+
+class RecordTestRunsRequest(BaseModel):
+    runs: List[TestRun] = Field(min_length=1, max_length=settings.RESULTS_MAX_BATCH)
+
+
+class RecordTestStepsRequest(BaseModel):
+    steps: List[TestStep] = Field(min_length=1, max_length=settings.RESULTS_MAX_BATCH)
+
+
+class RecordRequestTimingsRequest(BaseModel):
+    timings: List[RequestTiming] = Field(min_length=1, max_length=settings.RESULTS_MAX_BATCH)
+
+
+class LatencyTrendsRequest(BaseModel):
+    # Per-bucket latency of each step (or of each request, grouped as "METHOD url")
+    source: Literal["steps", "requests"] = "steps"
+    bucket: Literal["hour", "day", "week"] = "day"
+    days: int = Field(default=30, ge=1, le=365)
+    name: Optional[str] = None   # only runs of this test
+    step: Optional[str] = None   # only this step
@@ -0,0 +1,198 @@
+# app/server.py
+"""
+Production entry point: one listening socket shared by N uvicorn workers.
+
+    python -m app.server --workers 4 --port 8000
+
+- Each worker opens and warms its own pools in the app lifespan before it
+  starts accepting connections on the shared socket.
+- /healthz reports liveness and /readyz readiness (503 while starting or draining).
+- On SIGTERM a worker first turns /readyz to 503 and keeps serving for
+  SERVER_DRAIN_DELAY seconds, so load balancers can take it out of rotation.
+  Then it stops accepting and finishes in-flight requests for up to
+  SERVER_GRACEFUL_TIMEOUT. A second signal skips the drain delay.
+- Workers that die unexpectedly are restarted. One that dies within
+  SERVER_RESTART_MIN_UPTIME (e.g. bad DSN, failed migration) is restarted
+  after an exponential backoff instead. After SERVER_RESTART_MAX_FAST_FAILURES
+  of those in a row the launcher stops all workers and exits with status 1,
+  so its own supervisor sees the failure instead of a spawn loop.
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import time
+from typing import List, Optional
+
+import uvicorn
+
+from .config import settings
+from . import health
+
+# Not __name__: spawned workers import this module as __mp_main__
+logger = logging.getLogger("app.server")
+
+APP = "app.main:app"
+
+
+class DrainingServer(uvicorn.Server):
+    """uvicorn server whose first exit signal starts a drain period instead of shutting down."""
+
+    def __init__(self, config: uvicorn.Config, drain_delay: float):
+        super().__init__(config)
+        self.drain_delay = drain_delay
+        self._drain_until: Optional[float] = None
+
+    def handle_exit(self, sig, frame):
+        if self._drain_until is not None or not self.started or self.drain_delay <= 0:
+            # Nothing to drain yet, or a second signal: regular uvicorn shutdown
+            return super().handle_exit(sig, frame)
+        health.start_draining()
+        self._drain_until = time.monotonic() + self.drain_delay
+        logger.info(f"Worker [{os.getpid()}] draining for {self.drain_delay}s before shutdown")
+
+    async def on_tick(self, counter: int) -> bool:
+        if self._drain_until is not None and time.monotonic() >= self._drain_until:
+            self.should_exit = True
+        return await super().on_tick(counter)
+
+
+def _config(host: str, port: int) -> uvicorn.Config:
+    return uvicorn.Config(
+        APP,
+        host=host,
+        port=port,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_TIMEOUT,
+    )
+
+
+def _run_worker(host: str, port: int, sockets):
+    # Runs in a spawned child; the socket is inherited from the parent
+    config = _config(host, port)
+    config.configure_logging()
+    DrainingServer(config, settings.SERVER_DRAIN_DELAY).run(sockets=sockets)
+
+
+class Launcher:
+    """Binds the socket once and supervises the worker processes."""
+
+    def __init__(self, host: str, port: int, workers: int):
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.processes: List[multiprocessing.Process] = []
+        # Per worker slot: start time, fast failures in a row, pending restart time
+        self._started: List[float] = []
+        self._fast_failures: List[int] = []
+        self._restart_at: List[Optional[float]] = []
+        self._signal: Optional[int] = None
+        self._gave_up = False
+        self._ctx = multiprocessing.get_context("spawn")
+
+    def _spawn(self, sock) -> multiprocessing.Process:
+        process = self._ctx.Process(target=_run_worker, args=(self.host, self.port, [sock]))
+        process.start()
+        return process
+
+    def _on_signal(self, sig, frame):
+        self._signal = sig
+
+    def run(self):
+        config = _config(self.host, self.port)
+        config.configure_logging()
+        sock = config.bind_socket()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, self._on_signal)
+
+        per_worker = settings.DB_POOL_MAX_SIZE + settings.ASYNC_DB_POOL_MAX_SIZE
+        logger.info(
+            f"Starting {self.workers} workers on {self.host}:{self.port} "
+            f"(up to {self.workers * per_worker} database connections)"
+        )
+        self.processes = [self._spawn(sock) for _ in range(self.workers)]
+        self._started = [time.monotonic()] * self.workers
+        self._fast_failures = [0] * self.workers
+        self._restart_at = [None] * self.workers
+        try:
+            while self._signal is None and not self._gave_up:
+                time.sleep(0.5)
+                for i in range(self.workers):
+                    if self._signal is None and not self._gave_up:
+                        self._supervise(i, sock)
+        finally:
+            self._shutdown()
+            sock.close()
+        if self._gave_up:
+            raise SystemExit(1)
+
+    def _supervise(self, i: int, sock):
+        """Restart worker slot `i` if it died, backing off while it keeps dying young."""
+        now = time.monotonic()
+        if self._restart_at[i] is not None:
+            if now >= self._restart_at[i]:
+                self._restart_at[i] = None
+                self.processes[i] = self._spawn(sock)
+                self._started[i] = now
+            return
+        process = self.processes[i]
+        if process.is_alive():
+            return
+        uptime = now - self._started[i]
+        if uptime >= settings.SERVER_RESTART_MIN_UPTIME:
+            self._fast_failures[i] = 0
+            logger.warning(f"Worker [{process.pid}] exited with {process.exitcode}, restarting")
+            self._restart_at[i] = now
+            return
+        self._fast_failures[i] += 1
+        if self._fast_failures[i] >= settings.SERVER_RESTART_MAX_FAST_FAILURES:
+            logger.error(
+                f"Worker [{process.pid}] exited with {process.exitcode} after {uptime:.1f}s, "
+                f"the {self._fast_failures[i]}th fast failure in a row; giving up"
+            )
+            self._gave_up = True
+            return
+        delay = min(
+            settings.SERVER_RESTART_BACKOFF_MAX,
+            settings.SERVER_RESTART_BACKOFF * 2 ** (self._fast_failures[i] - 1),
+        )
+        logger.warning(
+            f"Worker [{process.pid}] exited with {process.exitcode} after {uptime:.1f}s, "
+            f"restarting in {delay:.1f}s"
+        )
+        self._restart_at[i] = now + delay
+
+    def _shutdown(self):
+        sig = self._signal or signal.SIGTERM
+        for process in self.processes:
+            if process.is_alive():
+                os.kill(process.pid, sig)
+        deadline = time.monotonic() + settings.SERVER_DRAIN_DELAY + settings.SERVER_GRACEFUL_TIMEOUT + 5
+        for process in self.processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.warning(f"Worker [{process.pid}] did not stop in time, killing it")
+                process.kill()
+                process.join()
+        logger.info("All workers stopped")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the MCP Postgres server with N worker processes")
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=settings.SERVER_WORKERS,
+                        help="worker processes; 0 = one per CPU core")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    workers = args.workers or os.cpu_count() or 1
+
+    if workers == 1:
+        config = _config(args.host, args.port)
+        DrainingServer(config, settings.SERVER_DRAIN_DELAY).run()
+    else:
+        Launcher(args.host, args.port, workers).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+# app/slow_queries.py
+"""
+Slow-statement capture for the async (asyncpg) pool.
+
+Every pooled connection gets a query logger (`watch`). Statements that take
+longer than SLOW_QUERY_MS are logged with their duration, request id and MCP
+method, then queued for a background recorder. The recorder stores them in
+mcp_slow_queries (migration 0004), which GET /admin/slow_queries reads.
+
+With SLOW_QUERY_EXPLAIN, the recorder also captures the statement's plan,
+with the same arguments, in a transaction that is always rolled back, with
+SLOW_QUERY_EXPLAIN_TIMEOUT as statement_timeout. Read-only queries (SELECT,
+VALUES, and WITH whose CTEs only read) are re-run under
+`EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)` for actual row counts and timings.
+Anything that may write or lock only gets a plain `EXPLAIN (FORMAT JSON)`:
+INSERT/UPDATE/DELETE, a WITH that wraps one, SELECT ... FOR UPDATE/SHARE, and
+calls to nextval/setval or advisory locks. Running those for real would use
+up sequence values, which a rollback does not return, and take row and
+unique-index locks that block live writes. Because an ANALYZE run doubles the
+cost of the statement, each distinct statement is explained at most once per
+SLOW_QUERY_EXPLAIN_INTERVAL. The other occurrences are recorded without a
+plan. Only the plan is stored, never the arguments, although a custom plan
+can still show literal values in its conditions.
+
+Recording never blocks a request. The queue is bounded, so a flood of slow
+statements is dropped and counted (mcp_slow_queries_dropped_total) rather
+than piling more work onto a database that is already struggling.
+"""
+import asyncio
+import logging
+import re
+from contextvars import ContextVar
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import asyncpg
+
+from .cache import TTLCache
+from .codec import loads
+from .config import settings
+from .metrics import SLOW_QUERIES, SLOW_QUERIES_DROPPED, current_method
+from .tracing import request_id
+from . import db
+
+logger = logging.getLogger(__name__)
+
+# Statements that have a plan to capture
+_EXPLAINABLE = ("select", "insert", "update", "delete", "with", "values")
+# ...and those that may be safe to actually run again for EXPLAIN ANALYZE,
+# unless they contain anything that writes or locks. Matching is deliberately
+# loose: a false hit (say, a column named "update") only costs the ANALYZE.
+_ANALYZABLE = ("select", "values", "with")
+_WRITES_OR_LOCKS = re.compile(
+    r"\b(insert|update|delete|merge|nextval|setval|pg_advisory\w*)\b"
+    r"|\bfor\s+(no\s+key\s+update|key\s+share|share)\b",
+    re.IGNORECASE,
+)
+
+INSERT_SQL_ASYNC = (
+    "INSERT INTO mcp_slow_queries (request_id, method, duration_ms, query, plan, explain_error) "
+    "VALUES ($1, $2, $3, $4, $5::jsonb, $6)"
+)
+PURGE_SQL = "DELETE FROM mcp_slow_queries WHERE captured_at < now() - make_interval(secs => %s)"
+
+# $1 limit, $2 hours back, $3 request id, $4 method
+LIST_SQL_ASYNC = (
+    "SELECT id, captured_at, request_id, method, duration_ms, query, plan, explain_error "
+    "FROM mcp_slow_queries "
+    "WHERE captured_at >= now() - make_interval(hours => $2::int) "
+    "AND ($3::text IS NULL OR request_id = $3) AND ($4::text IS NULL OR method = $4) "
+    "ORDER BY duration_ms DESC LIMIT $1"
+)
+
+# Set while the recorder itself runs statements, so they are never captured
+_recording: ContextVar[bool] = ContextVar("slow_query_recording", default=False)
+
+
+class SlowQuery(NamedTuple):
+    request_id: str
+    method: str
+    duration_ms: float
+    query: str
+    args: Tuple
+
+
+class Recorder:
+    def __init__(self, pool: asyncpg.Pool, max_queued: int, explain_interval: float):
+        self.pool = pool
+        self._queue: "asyncio.Queue[SlowQuery]" = asyncio.Queue(max_queued)
+        # statement text -> True while it was explained recently
+        self._explained = TTLCache(1000, explain_interval)
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def submit(self, slow: SlowQuery):
+        try:
+            self._queue.put_nowait(slow)
+        except asyncio.QueueFull:
+            SLOW_QUERIES_DROPPED.inc()
+
+    async def _run(self):
+        _recording.set(True)
+        while True:
+            slow = await self._queue.get()
+            try:
+                await self._record(slow)
+            except Exception as e:
+                logger.warning(f"Could not record slow statement: {e}")
+
+    def _should_explain(self, query: str) -> bool:
+        if not settings.SLOW_QUERY_EXPLAIN or not query.lower().startswith(_EXPLAINABLE):
+            return False
+        if ";" in query.rstrip(";"):
+            # Several commands (e.g. the pool's reset query) can't be prepared as one
+            return False
+        if self._explained.get(query):
+            return False
+        self._explained.put(query, True)
+        return True
+
+    async def _record(self, slow: SlowQuery):
+        plan, error = None, None
+        async with self.pool.acquire(timeout=settings.DB_POOL_TIMEOUT) as conn:
+            if self._should_explain(slow.query):
+                plan, error = await explain(conn, slow.query, slow.args)
+            await conn.execute(
+                INSERT_SQL_ASYNC, slow.request_id or None, slow.method or None,
+                slow.duration_ms, slow.query, plan, error,
+            )
+
+
+def analyzable(query: str) -> bool:
+    """Whether `query` only reads, so EXPLAIN ANALYZE may run it."""
+    return query.lstrip().lower().startswith(_ANALYZABLE) and not _WRITES_OR_LOCKS.search(query)
+
+
+async def explain(conn, query: str, args: Tuple) -> Tuple[Optional[str], Optional[str]]:
+    """
+    (plan JSON, None) or (None, error) for `query`, in a rolled-back transaction.
+    Only read-only statements are executed (EXPLAIN ANALYZE); the rest are just planned.
+    """
+    options = "ANALYZE, BUFFERS, FORMAT JSON" if analyzable(query) else "FORMAT JSON"
+    tr = conn.transaction()
+    await tr.start()
+    try:
+        await conn.execute(f"SET LOCAL statement_timeout = {int(settings.SLOW_QUERY_EXPLAIN_TIMEOUT * 1000)}")
+        rows = await conn.fetch(f"EXPLAIN ({options}) {query}", *args)
+        return rows[0][0], None
+    except asyncpg.PostgresError as e:
+        # e.g. the timeout, or a table dropped since
+        return None, f"{type(e).__name__}: {e}"
+    finally:
+        await tr.rollback()
+
+
+recorder: Optional[Recorder] = None
+
+
+def _on_query(record):
+    # asyncpg runs this via call_soon with the issuing task's context, so the
+    # request id and method are the ones that ran the statement
+    if record.elapsed * 1000 < settings.SLOW_QUERY_MS or _recording.get():
+        return
+    query = record.query.strip()
+    rid, method = request_id.get(), current_method.get()
+    SLOW_QUERIES.inc(method or "*")
+    logger.warning(
+        f"Slow statement {record.elapsed * 1000:.1f}ms request={rid or '-'} method={method or '-'}"
+        f"{' failed' if record.exception else ''}: {query[:500]}"
+    )
+    if recorder is not None:
+        recorder.submit(SlowQuery(rid, method, round(record.elapsed * 1000, 3), query, tuple(record.args or ())))
+
+
+def watch(conn):
+    """Install the slow-statement logger on a new pooled connection."""
+    if settings.SLOW_QUERY_MS > 0:
+        conn.add_query_logger(_on_query)
+
+
+def purge_expired():
+    """Drop recorded statements older than SLOW_QUERY_RETENTION (run once at startup)."""
+    with db.pool.connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(PURGE_SQL, (settings.SLOW_QUERY_RETENTION,))
+            purged = cur.rowcount
+        conn.commit()
+    if purged:
+        logger.info(f"Purged {purged} old slow statements")
+
+
+def start(pool: Optional[asyncpg.Pool]) -> Optional[Recorder]:
+    """Start the recorder for `pool` (None, i.e. no database: nothing to record)."""
+    global recorder
+    if settings.SLOW_QUERY_MS > 0 and pool is not None and recorder is None:
+        recorder = Recorder(pool, settings.SLOW_QUERY_QUEUE, settings.SLOW_QUERY_EXPLAIN_INTERVAL)
+        recorder.start()
+        logger.info(f"Recording statements slower than {settings.SLOW_QUERY_MS}ms")
+    return recorder
+
+
+async def stop():
+    global recorder
+    if recorder is not None:
+        await recorder.stop()
+        recorder = None
+
+
+async def slowest(conn, limit: int, hours: int, rid: Optional[str], method: Optional[str]) -> List[Dict]:
+    """Recorded statements, slowest first."""
+    records = await conn.fetch(LIST_SQL_ASYNC, limit, hours, rid, method)
+    rows = []
+    for r in records:
+        row = dict(r)
+        if row["plan"] is not None:
+            row["plan"] = loads(row["plan"])
+        rows.append(row)
+    return rows
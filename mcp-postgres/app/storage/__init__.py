@@ -0,0 +1,41 @@
+# app/storage/__init__.py
+"""
+Storage behind the HTTP / JSON-RPC handlers, chosen by STORAGE_BACKEND:
+"postgres" (default) or "memory", an in-process stand-in for benchmarking the
+request layer without a database.
+"""
+from typing import Optional
+
+from ..config import settings
+from .base import StorageBackend
+from .memory import MemoryBackend
+from .postgres import PostgresBackend
+
+BACKENDS = {
+    PostgresBackend.name: PostgresBackend,
+    MemoryBackend.name: MemoryBackend,
+}
+
+# the process-wide backend, opened on app startup
+backend: Optional[StorageBackend] = None
+
+
+async def open_backend() -> StorageBackend:
+    global backend
+    if backend is None:
+        try:
+            backend_cls = BACKENDS[settings.STORAGE_BACKEND]
+        except KeyError:
+            raise ValueError(
+                f"Unknown STORAGE_BACKEND '{settings.STORAGE_BACKEND}', expected one of {sorted(BACKENDS)}"
+            )
+        backend = backend_cls()
+        await backend.open()
+    return backend
+
+
+async def close_backend():
+    global backend
+    if backend is not None:
+        await backend.close()
+        backend = None
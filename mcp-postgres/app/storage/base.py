@@ -0,0 +1,103 @@
+# app/storage/base.py
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Dict, List, Optional, Union
+
+from ..schemas import (
+    InsertCredentialsRequest,
+    LatencyTrendsRequest,
+    RequestTiming,
+    TestRun,
+    TestStep,
+)
+
+
+class StorageBackend(ABC):
+    """
+    Everything the HTTP / JSON-RPC handlers need from storage. Per-row failures
+    (e.g. a duplicate user_id) are returned in place of the id rather than
+    raised, so one bad row never fails its neighbours.
+    """
+
+    name = ""
+
+    async def open(self):
+        """Connect and prepare; called once at app startup."""
+
+    async def warm_up(self):
+        """Exercise connections before the worker reports ready; called after `open`."""
+
+    async def close(self):
+        """Release connections; called once at app shutdown."""
+
+    @abstractmethod
+    async def insert_credentials_many(
+        self, reqs: List[InsertCredentialsRequest]
+    ) -> List[Union[int, Exception]]:
+        """Insert rows; one inserted id or Exception per request, in order."""
+
+    @abstractmethod
+    async def insert_credentials_once(
+        self, key: str, req: InsertCredentialsRequest
+    ) -> Union[int, Exception]:
+        """
+        Insert `req` unless idempotency key `key` was used within IDEMPOTENCY_TTL;
+        then return that call's inserted id without inserting.
+        """
+
+    @abstractmethod
+    async def upsert_credentials(
+        self, req: InsertCredentialsRequest, update: bool
+    ) -> Union[Dict, Exception]:
+        """
+        Insert `req` in one statement that resolves conflicts instead of failing.
+        With `update`, an existing row with the same user_id is overwritten;
+        otherwise a clash on any unique column skips the row. Returns
+        {"id", "action": "inserted" | "updated" | "skipped"}, plus
+        "previous" ({"email", "phone_number"} before the write) when updated.
+        """
+
+    @abstractmethod
+    async def get_credentials(self, field: str, value: str) -> Optional[Dict]:
+        """Row whose `field` (user_id, email or phone_number) equals `value`."""
+
+    @abstractmethod
+    async def list_credentials(self, after_id: int, limit: int) -> List[Dict]:
+        """Up to `limit` rows with id > after_id, in id order."""
+
+    @abstractmethod
+    async def count_credentials(self, after_id: int) -> int:
+        """How many rows have id > after_id."""
+
+    @abstractmethod
+    async def copy_credentials(self, chunks: AsyncIterator[List[InsertCredentialsRequest]]) -> int:
+        """
+        Load validated rows, as they arrive, in one all-or-nothing operation.
+        Returns the number of rows written; raises if the load fails.
+        """
+
+    @abstractmethod
+    async def reserve_ids(self, name: str, count: int) -> int:
+        """
+        Reserve `count` consecutive ids from allocator `name`, never handed
+        out to any other caller. Returns the first; the first block starts at 1.
+        """
+
+    # ─── Test-run results ───────────────────────────────────────
+    @abstractmethod
+    async def record_test_runs(self, runs: List[TestRun]) -> int:
+        """Insert or update runs by run_id, in one write. Returns the runs written."""
+
+    @abstractmethod
+    async def record_test_steps(self, steps: List[TestStep]) -> int:
+        """Append steps in one write; returns how many."""
+
+    @abstractmethod
+    async def record_request_timings(self, timings: List[RequestTiming]) -> int:
+        """Append request timings in one write; returns how many."""
+
+    @abstractmethod
+    async def latency_trends(self, req: LatencyTrendsRequest) -> List[Dict]:
+        """
+        One row per (bucket, key), in key then bucket order: bucket, key (the
+        step, or "METHOD url"), samples, failures, avg_ms, p50_ms, p95_ms, max_ms.
+        """
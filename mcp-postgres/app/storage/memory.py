@@ -0,0 +1,218 @@
+# app/storage/memory.py
+import bisect
+import time
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
+
+from ..config import settings
+from ..credentials import CREDENTIALS_COLUMNS, LOOKUP_FIELDS
+from ..metrics import IDEMPOTENT_REPLAYS
+from ..schemas import (
+    InsertCredentialsRequest,
+    LatencyTrendsRequest,
+    RequestTiming,
+    TestRun,
+    TestStep,
+)
+from .. import results
+from .base import StorageBackend
+
+
+class UniqueViolation(Exception):
+    """Same failure Postgres reports for a duplicate user_id / email / phone_number."""
+
+
+class MemoryBackend(StorageBackend):
+    """
+    Process-local stand-in with the same observable behaviour as Postgres:
+    serial ids, the UNIQUE constraints on the lookup fields, idempotency keys
+    with a TTL, and all-or-nothing bulk loads. It is for benchmarking the
+    HTTP / JSON-RPC layer and running perf tests without a database. Nothing
+    is persisted or shared between workers.
+
+    Every method mutates state without awaiting in between, so each call is
+    atomic on the event loop and needs no lock.
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        self._rows: Dict[int, Dict] = {}
+        self._ids: List[int] = []  # ascending, for keyset pagination
+        self._unique: Dict[str, Dict[str, int]] = {f: {} for f in LOOKUP_FIELDS}
+        self._keys: Dict[str, Tuple[int, float]] = {}  # idempotency key -> (id, expires)
+        self._next_id = 1
+        self._id_blocks: Dict[str, int] = {}  # allocator name -> next value
+        self._runs: Dict[str, TestRun] = {}
+        self._steps: List[TestStep] = []
+        self._timings: List[RequestTiming] = []
+        self._record_ids: Dict[str, set] = {"steps": set(), "timings": set()}
+
+    def _violation(
+        self, req: InsertCredentialsRequest, staged: Dict[str, set], own_id: Optional[int] = None
+    ) -> Optional[UniqueViolation]:
+        for field in LOOKUP_FIELDS:
+            value = getattr(req, field)
+            if value is None:
+                continue
+            holder = self._unique[field].get(value)
+            if (holder is not None and holder != own_id) or value in staged[field]:
+                return UniqueViolation(
+                    f'duplicate key value violates unique constraint "user_login_credentials_{field}_key"\n'
+                    f"DETAIL:  Key ({field})=({value}) already exists."
+                )
+        return None
+
+    def _insert(self, req: InsertCredentialsRequest) -> int:
+        new_id = self._next_id
+        self._next_id += 1
+        row = {"id": new_id, **{c: getattr(req, c) for c in CREDENTIALS_COLUMNS},
+               "created_at": datetime.now(timezone.utc)}
+        self._rows[new_id] = row
+        self._ids.append(new_id)
+        for field in LOOKUP_FIELDS:
+            if row[field] is not None:
+                self._unique[field][row[field]] = new_id
+        return new_id
+
+    async def insert_credentials_many(self, reqs: List[InsertCredentialsRequest]) -> List[Union[int, Exception]]:
+        no_staged = {f: set() for f in LOOKUP_FIELDS}
+        results: List[Union[int, Exception]] = []
+        for req in reqs:
+            error = self._violation(req, no_staged)
+            results.append(error if error is not None else self._insert(req))
+        return results
+
+    async def insert_credentials_once(self, key: str, req: InsertCredentialsRequest) -> Union[int, Exception]:
+        entry = self._keys.get(key)
+        if entry is not None and entry[1] > time.monotonic():
+            IDEMPOTENT_REPLAYS.inc("backend")
+            return entry[0]
+        result = (await self.insert_credentials_many([req]))[0]
+        if not isinstance(result, Exception):
+            self._keys[key] = (result, time.monotonic() + settings.IDEMPOTENCY_TTL)
+        return result
+
+    async def upsert_credentials(self, req: InsertCredentialsRequest, update: bool) -> Union[Dict, Exception]:
+        no_staged = {f: set() for f in LOOKUP_FIELDS}
+        existing_id = self._unique["user_id"].get(req.user_id)
+        if existing_id is None or not update:
+            error = self._violation(req, no_staged)
+            if error is None:
+                return {"id": self._insert(req), "action": "inserted"}
+            return error if update else {"id": None, "action": "skipped"}
+
+        # ON CONFLICT (user_id) DO UPDATE: the other unique columns still apply
+        error = self._violation(req, no_staged, own_id=existing_id)
+        if error is not None:
+            return error
+        row = self._rows[existing_id]
+        previous = {"email": row["email"], "phone_number": row["phone_number"]}
+        for field in ("email", "phone_number"):
+            if row[field] is not None:
+                del self._unique[field][row[field]]
+        row.update({c: getattr(req, c) for c in CREDENTIALS_COLUMNS})
+        for field in ("email", "phone_number"):
+            if row[field] is not None:
+                self._unique[field][row[field]] = existing_id
+        return {"id": existing_id, "action": "updated", "previous": previous}
+
+    async def get_credentials(self, field: str, value: str) -> Optional[Dict]:
+        row_id = self._unique[field].get(value)
+        return dict(self._rows[row_id]) if row_id is not None else None
+
+    async def list_credentials(self, after_id: int, limit: int) -> List[Dict]:
+        start = bisect.bisect_right(self._ids, after_id)
+        return [dict(self._rows[i]) for i in self._ids[start:start + limit]]
+
+    async def count_credentials(self, after_id: int) -> int:
+        return len(self._ids) - bisect.bisect_right(self._ids, after_id)
+
+    async def copy_credentials(self, chunks: AsyncIterator[List[InsertCredentialsRequest]]) -> int:
+        # Stage everything first so a duplicate anywhere rejects the whole load, like COPY
+        staged = {f: set() for f in LOOKUP_FIELDS}
+        pending: List[InsertCredentialsRequest] = []
+        async for rows in chunks:
+            for req in rows:
+                error = self._violation(req, staged)
+                if error is not None:
+                    raise error
+                for field in LOOKUP_FIELDS:
+                    if getattr(req, field) is not None:
+                        staged[field].add(getattr(req, field))
+                pending.append(req)
+        # Other calls may have inserted while chunks were still arriving
+        no_staged = {f: set() for f in LOOKUP_FIELDS}
+        for req in pending:
+            error = self._violation(req, no_staged)
+            if error is not None:
+                raise error
+        for req in pending:
+            self._insert(req)
+        return len(pending)
+
+    async def reserve_ids(self, name: str, count: int) -> int:
+        first = self._id_blocks.get(name, 1)
+        self._id_blocks[name] = first + count
+        return first
+
+    async def record_test_runs(self, runs: List[TestRun]) -> int:
+        # Stored runs first, so new entries update them the way the upsert does
+        stored = [self._runs[r.run_id] for r in runs if r.run_id in self._runs]
+        merged = results.merge_runs(stored + runs)
+        self._runs.update((r.run_id, r) for r in merged)
+        return len(merged)
+
+    def _new(self, kind: str, items: list) -> list:
+        # ON CONFLICT (record_id) DO NOTHING; items without a record_id are always new
+        seen = self._record_ids[kind]
+        new = []
+        for item in items:
+            if item.record_id is not None:
+                if item.record_id in seen:
+                    continue
+                seen.add(item.record_id)
+            new.append(item)
+        return new
+
+    async def record_test_steps(self, steps: List[TestStep]) -> int:
+        self._steps.extend(self._new("steps", steps))
+        return len(steps)
+
+    async def record_request_timings(self, timings: List[RequestTiming]) -> int:
+        self._timings.extend(self._new("timings", timings))
+        return len(timings)
+
+    async def latency_trends(self, req: LatencyTrendsRequest) -> List[Dict]:
+        since = datetime.now(timezone.utc) - timedelta(days=req.days)
+        if req.source == "steps":
+            samples = [(s, s.step, s.status in ("failed", "error")) for s in self._steps]
+        else:
+            samples = [
+                (t, f"{t.method} {t.url}", t.status_code is None or t.status_code >= 400) for t in self._timings
+            ]
+        grouped: Dict[Tuple[datetime, str], List[Tuple[float, bool]]] = {}
+        for sample, key, failed in samples:
+            if sample.started_at < since or (req.step is not None and sample.step != req.step):
+                continue
+            if req.name is not None:
+                run = self._runs.get(sample.run_id)
+                if run is None or run.name != req.name:
+                    continue
+            bucket = results.truncate(sample.started_at, req.bucket)
+            grouped.setdefault((bucket, key), []).append((sample.duration_ms, failed))
+
+        rows = []
+        for (bucket, key), values in sorted(grouped.items(), key=lambda item: (item[0][1], item[0][0])):
+            durations = sorted(d for d, _ in values)
+            rows.append({
+                "bucket": bucket,
+                "key": key,
+                "samples": len(durations),
+                "failures": sum(failed for _, failed in values),
+                "avg_ms": sum(durations) / len(durations),
+                "p50_ms": results.percentile(durations, 0.5),
+                "p95_ms": results.percentile(durations, 0.95),
+                "max_ms": durations[-1],
+            })
+        return rows
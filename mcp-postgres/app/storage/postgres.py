@@ -0,0 +1,182 @@
+# app/storage/postgres.py
+import asyncio
+import logging
+from typing import AsyncIterator, Dict, List, Optional, Union
+
+import asyncpg
+from starlette.concurrency import run_in_threadpool
+
+from ..config import settings
+from ..credentials import (
+    COUNT_SQL_ASYNC,
+    CREDENTIALS_COLUMNS,
+    GET_SQL_ASYNC,
+    INSERT_IGNORE_SQL_ASYNC,
+    LIST_SQL_ASYNC,
+    UPSERT_SQL_ASYNC,
+    credentials_row,
+    insert_credentials_many_async,
+)
+from ..metrics import phase
+from ..schemas import (
+    InsertCredentialsRequest,
+    LatencyTrendsRequest,
+    RequestTiming,
+    TestRun,
+    TestStep,
+)
+from .. import async_db, db, id_blocks, idempotency, migrations, results, slow_queries
+from .base import StorageBackend
+
+logger = logging.getLogger(__name__)
+
+COPY_COLUMNS = CREDENTIALS_COLUMNS
+
+
+def _prepare_database():
+    # One pool per driver for the whole process; connections are reused across requests
+    db.open_pool()
+    # Tables must exist before the async pool's connections use them
+    if settings.DB_MIGRATE_ON_STARTUP:
+        with db.pool.connection() as conn:
+            migrations.migrate(conn)
+    idempotency.purge_expired()
+    slow_queries.purge_expired()
+
+
+def _csv_field(value) -> str:
+    # Unquoted empty is NULL in COPY csv; anything else is quoted so
+    # empty strings, commas and quotes survive as-is
+    if value is None:
+        return ""
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def _encode_rows(rows: List[InsertCredentialsRequest]) -> bytes:
+    lines = []
+    for r in rows:
+        is_active = None if r.is_active is None else ("t" if r.is_active else "f")
+        lines.append(",".join(_csv_field(v) for v in (
+            r.user_id, r.first_name, r.last_name, r.email, r.phone_number, is_active,
+        )))
+    lines.append("")
+    return "\n".join(lines).encode("utf-8")
+
+
+class PostgresBackend(StorageBackend):
+    """
+    The real thing: asyncpg pool for the request paths, plus the psycopg2
+    pool for migrations and the server-side-cursor export.
+    """
+
+    name = "postgres"
+
+    async def open(self):
+        # psycopg2 blocks, so keep it off the event loop (other apps may share it)
+        await run_in_threadpool(_prepare_database)
+        await async_db.open_pool()
+
+    async def warm_up(self):
+        """
+        Round-trip every idle connection in both pools, so the first requests
+        don't pay the connect cost.
+        """
+        pool = async_db.pool
+        conns = [await pool.acquire() for _ in range(pool.get_idle_size())]
+        try:
+            await asyncio.gather(*(conn.fetchval("SELECT 1") for conn in conns))
+        finally:
+            for conn in conns:
+                await pool.release(conn)
+        await run_in_threadpool(db.pool.ping_idle)
+        logger.info(f"Warmed {len(conns)} async and {db.pool.stats()['idle']} sync connections")
+
+    async def close(self):
+        await async_db.close_pool()
+        db.close_pool()
+
+    async def insert_credentials_many(self, reqs: List[InsertCredentialsRequest]) -> List[Union[int, Exception]]:
+        async with async_db.acquire() as conn:
+            return await insert_credentials_many_async(conn, reqs)
+
+    async def insert_credentials_once(self, key: str, req: InsertCredentialsRequest) -> Union[int, Exception]:
+        async with async_db.acquire() as conn:
+            return await idempotency.insert_once_async(conn, key, req)
+
+    async def upsert_credentials(self, req: InsertCredentialsRequest, update: bool) -> Union[Dict, Exception]:
+        async with async_db.acquire() as conn:
+            try:
+                with phase("sql"):
+                    if not update:
+                        row_id = await conn.fetchval(INSERT_IGNORE_SQL_ASYNC, *credentials_row(req))
+                        return {"id": row_id, "action": "inserted" if row_id is not None else "skipped"}
+                    record = await conn.fetchrow(UPSERT_SQL_ASYNC, *credentials_row(req))
+            except asyncpg.PostgresError as e:
+                return e
+        if record["inserted"]:
+            return {"id": record["id"], "action": "inserted"}
+        return {
+            "id": record["id"],
+            "action": "updated",
+            "previous": {"email": record["previous_email"], "phone_number": record["previous_phone_number"]},
+        }
+
+    async def get_credentials(self, field: str, value: str) -> Optional[Dict]:
+        async with async_db.acquire() as conn:
+            with phase("sql"):
+                record = await conn.fetchrow(GET_SQL_ASYNC[field], value)
+        return dict(record) if record is not None else None
+
+    async def list_credentials(self, after_id: int, limit: int) -> List[Dict]:
+        async with async_db.acquire() as conn:
+            with phase("sql"):
+                records = await conn.fetch(LIST_SQL_ASYNC, after_id, limit)
+        return [dict(r) for r in records]
+
+    async def count_credentials(self, after_id: int) -> int:
+        async with async_db.acquire() as conn:
+            with phase("sql"):
+                return await conn.fetchval(COUNT_SQL_ASYNC, after_id)
+
+    async def copy_credentials(self, chunks: AsyncIterator[List[InsertCredentialsRequest]]) -> int:
+        """
+        One `COPY ... FROM STDIN`. asyncpg pulls the CSV chunks as the socket
+        drains, so the source is read only as fast as Postgres accepts data.
+        """
+        async def csv_chunks():
+            async for rows in chunks:
+                yield _encode_rows(rows)
+
+        async with async_db.acquire() as conn:
+            with phase("sql"):
+                status = await conn.copy_to_table(
+                    "user_login_credentials",
+                    source=csv_chunks(),
+                    columns=COPY_COLUMNS,
+                    format="csv",
+                )
+        return int(status.split()[-1])
+
+    async def reserve_ids(self, name: str, count: int) -> int:
+        async with async_db.acquire() as conn:
+            return await id_blocks.reserve_async(conn, name, count)
+
+    async def record_test_runs(self, runs: List[TestRun]) -> int:
+        async with async_db.acquire() as conn:
+            return await results.record_runs_async(conn, runs)
+
+    async def record_test_steps(self, steps: List[TestStep]) -> int:
+        async with async_db.acquire() as conn:
+            return await results.record_steps_async(conn, steps)
+
+    async def record_request_timings(self, timings: List[RequestTiming]) -> int:
+        async with async_db.acquire() as conn:
+            return await results.record_timings_async(conn, timings)
+
+    async def latency_trends(self, req: LatencyTrendsRequest) -> List[Dict]:
+        async with async_db.acquire() as conn:
+            with phase("sql"):
+                records = await conn.fetch(
+                    results.TRENDS_SQL_ASYNC[req.source], req.bucket, req.days, req.name, req.step
+                )
+        return [dict(r) for r in records]
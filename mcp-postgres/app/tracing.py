@@ -0,0 +1,100 @@
+# app/tracing.py
+"""
+Request correlation ids.
+
+Every HTTP request gets an id: the caller's X-Request-ID header when it looks
+sane, otherwise a fresh one. It is echoed back in the response header. While
+the request holds an asyncpg connection, Postgres sees it as
+`application_name = "<DB_APPLICATION_NAME>:<id>"`, so it shows up in
+pg_stat_activity and in the server's log_line_prefix (%a). Slow statements are
+recorded under the same id (see app/slow_queries.py).
+
+The middleware also collects the request's phase timings (parse,
+admission_wait, validation, pool_wait, sql, ...). Requests on `slow_paths`
+that take longer than SLOW_REQUEST_MS are logged with that breakdown, which
+shows at a glance whether the time went to JSON handling, waiting, or SQL.
+"""
+import logging
+import re
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+from .config import settings
+from .metrics import current_method, request_phases
+
+logger = logging.getLogger(__name__)
+
+# Short enough that "<DB_APPLICATION_NAME>:<id>" fits application_name (63 bytes),
+# and plain enough to paste into logs and queries
+_VALID_ID = re.compile(r"^[A-Za-z0-9._:-]{1,40}$")
+
+request_id: ContextVar[str] = ContextVar("request_id", default="")
+
+
+def new_request_id(header: Optional[str]) -> str:
+    if header and _VALID_ID.match(header):
+        return header
+    return uuid.uuid4().hex
+
+
+def application_name() -> str:
+    rid = request_id.get()
+    name = settings.DB_APPLICATION_NAME
+    return f"{name}:{rid}"[:63] if rid else name
+
+
+async def tag_connection(conn):
+    """Label an asyncpg connection with the current request id (reset by the pool on release)."""
+    if settings.DB_TAG_APPLICATION_NAME and request_id.get():
+        await conn.execute("SELECT set_config('application_name', $1, false)", application_name())
+
+
+def tag_sync_connection(conn):
+    """Same for a psycopg2 connection; lasts until its transaction ends."""
+    if settings.DB_TAG_APPLICATION_NAME and request_id.get():
+        with conn.cursor() as cur:
+            cur.execute("SELECT set_config('application_name', %s, true)", (application_name(),))
+
+
+class RequestIdMiddleware:
+    """Plain ASGI middleware: assigns the request id and logs slow requests."""
+
+    def __init__(self, app, slow_paths: Tuple[str, ...] = ("/mcp", "/insert_user")):
+        self.app = app
+        self.slow_paths = slow_paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        header = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                header = value.decode("latin-1")
+                break
+        rid = new_request_id(header)
+        request_id.set(rid)
+        phases: Dict[str, float] = {}
+        request_phases.set(phases)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", rid.encode())]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            if (
+                settings.SLOW_REQUEST_MS > 0
+                and elapsed * 1000 >= settings.SLOW_REQUEST_MS
+                and scope["path"] in self.slow_paths
+            ):
+                breakdown = " ".join(f"{k}={v * 1000:.1f}ms" for k, v in sorted(phases.items(), key=lambda kv: -kv[1]))
+                logger.warning(
+                    f"Slow request {rid} {current_method.get() or scope['path']}: "
+                    f"{elapsed * 1000:.1f}ms ({breakdown or 'no phases'})"
+                )
@@ -0,0 +1,90 @@
+# benchmarks/async_vs_blocking.py
+"""
+Requests/sec of the MCP insert path: blocking psycopg2 calls made straight
+from an async handler (the old /mcp behaviour) vs. the asyncpg pool.
+
+Each simulated request is one coroutine on a single event loop, which is
+exactly how uvicorn runs `async def` handlers. Run from mcp-postgres/:
+
+    python -m benchmarks.async_vs_blocking --requests 2000 --concurrency 50
+    python -m benchmarks.async_vs_blocking --latency-ms 5   # emulate a remote DB
+
+Rows are written with a unique prefix and deleted afterwards.
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from app import async_db, credentials, db
+from app.schemas import InsertCredentialsRequest
+
+
+def _request(prefix: str, i: int) -> InsertCredentialsRequest:
+    return InsertCredentialsRequest(
+        user_id=f"{prefix}_{i}", first_name="Bench", last_name="Mark", is_active=True
+    )
+
+
+async def _blocking_handler(req: InsertCredentialsRequest, latency: float):
+    # What the old handler did: psycopg2 calls directly on the event loop
+    with db.pool.connection() as conn:
+        if latency:
+            with conn.cursor() as cur:
+                cur.execute("SELECT pg_sleep(%s)", (latency,))
+        result = credentials.insert_credentials_many(conn, [req])[0]
+    if isinstance(result, Exception):
+        raise result
+
+
+async def _async_handler(req: InsertCredentialsRequest, latency: float):
+    async with async_db.pool.acquire() as conn:
+        if latency:
+            await conn.execute("SELECT pg_sleep($1)", latency)
+        result = (await credentials.insert_credentials_many_async(conn, [req]))[0]
+    if isinstance(result, Exception):
+        raise result
+
+
+async def _run(handler, prefix: str, n: int, concurrency: int, latency: float) -> float:
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with sem:
+            await handler(_request(prefix, i), latency)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n)))
+    return n / (time.perf_counter() - start)
+
+
+async def main(args):
+    db.open_pool()
+    await async_db.open_pool()
+    prefix = f"bench_{uuid.uuid4().hex[:8]}"
+    latency = args.latency_ms / 1000
+    try:
+        # Warm both pools up to the target concurrency so connect time isn't measured
+        await _run(_blocking_handler, f"{prefix}_wb", args.concurrency, args.concurrency, 0)
+        await _run(_async_handler, f"{prefix}_wa", args.concurrency, args.concurrency, 0)
+        blocking = await _run(_blocking_handler, f"{prefix}_b", args.requests, args.concurrency, latency)
+        non_blocking = await _run(_async_handler, f"{prefix}_a", args.requests, args.concurrency, latency)
+    finally:
+        async with async_db.pool.acquire() as conn:
+            await conn.execute("DELETE FROM user_login_credentials WHERE user_id LIKE $1", f"{prefix}%")
+        await async_db.close_pool()
+        db.close_pool()
+
+    print(f"requests={args.requests} concurrency={args.concurrency} latency={args.latency_ms}ms")
+    print(f"  blocking psycopg2 on event loop : {blocking:10.1f} req/s")
+    print(f"  asyncpg pool                    : {non_blocking:10.1f} req/s")
+    print(f"  speedup                         : {non_blocking / blocking:10.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=0.0,
+                        help="extra per-request DB round trip (pg_sleep) to emulate network latency")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,224 @@
+# benchmarks/loadtest.py
+"""
+HTTP load test for /insert_user and /mcp, per storage backend.
+
+For each backend a uvicorn server is started with STORAGE_BACKEND set, warmed
+up, and driven at a fixed concurrency. Every scenario reports throughput and
+p50/p95/p99 latency. Comparing the "memory" and "postgres" rows separates the
+cost of the HTTP / JSON-RPC layer from the database. Run from mcp-postgres/:
+
+    python -m benchmarks.loadtest                                  # both backends
+    python -m benchmarks.loadtest --backends memory --requests 5000 --concurrency 100
+    python -m benchmarks.loadtest --url http://localhost:8000      # an already running server
+    python -m benchmarks.loadtest --json results.json              # keep results for comparison
+
+Scenarios:
+  insert_user   POST /insert_user
+  mcp_insert    insert_credentials over /mcp
+  mcp_get       get_credentials over /mcp, for rows the insert scenarios wrote
+  tools_list    tools/list over /mcp (no storage; JSON-RPC overhead only)
+
+Rows are written with a unique user_id prefix. On Postgres they are deleted
+afterwards. The load generator runs on the same machine, so keep an eye on CPU.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+SCENARIOS = ("insert_user", "mcp_insert", "mcp_get", "tools_list")
+
+
+def _rpc(method: str, params: Optional[Dict] = None, req_id: int = 1) -> Dict:
+    body = {"jsonrpc": "2.0", "id": req_id, "method": method}
+    if params is not None:
+        body["params"] = params
+    return body
+
+
+def _row(user_id: str) -> Dict:
+    return {"user_id": user_id, "first_name": "Load", "last_name": "Test", "is_active": True}
+
+
+class Scenario:
+    """Builds request i of a scenario; the user_ids it inserts are remembered for mcp_get."""
+
+    def __init__(self, name: str, prefix: str, inserted: List[str]):
+        self.name = name
+        self.prefix = prefix
+        self.inserted = inserted
+
+    def request(self, i: int) -> Tuple[str, Dict]:
+        if self.name == "insert_user":
+            user_id = f"{self.prefix}_u{i}"
+            self.inserted.append(user_id)
+            return "/insert_user", _row(user_id)
+        if self.name == "mcp_insert":
+            user_id = f"{self.prefix}_m{i}"
+            self.inserted.append(user_id)
+            return "/mcp", _rpc("insert_credentials", _row(user_id), i)
+        if self.name == "mcp_get":
+            return "/mcp", _rpc("get_credentials", {"user_id": self.inserted[i % len(self.inserted)]}, i)
+        return "/mcp", _rpc("tools/list", req_id=i)
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def _drive(client: httpx.AsyncClient, scenario: Scenario, n: int, concurrency: int) -> Dict:
+    latencies: List[float] = []
+    errors = 0
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        nonlocal errors
+        path, body = scenario.request(i)
+        async with sem:
+            start = time.perf_counter()
+            try:
+                response = await client.post(path, json=body)
+                failed = response.status_code >= 400 or (path == "/mcp" and "error" in response.json())
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - start)
+        errors += failed
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "scenario": scenario.name,
+        "requests": n,
+        "errors": errors,
+        "rps": round(n / elapsed, 1),
+        "p50_ms": round(1000 * _percentile(latencies, 50), 2),
+        "p95_ms": round(1000 * _percentile(latencies, 95), 2),
+        "p99_ms": round(1000 * _percentile(latencies, 99), 2),
+    }
+
+
+async def run_backend(url: str, args, prefix: str) -> List[Dict]:
+    inserted: List[str] = []
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=url, timeout=args.timeout, limits=limits) as client:
+        # Warm-up: open the keep-alive connections and the server's pools
+        await _drive(client, Scenario("tools_list", prefix, inserted), args.concurrency, args.concurrency)
+        results = []
+        for name in args.scenarios:
+            if name == "mcp_get" and not inserted:
+                # Nothing to read yet; seed rows without measuring
+                await _drive(client, Scenario("mcp_insert", f"{prefix}_seed", inserted),
+                             args.concurrency, args.concurrency)
+            results.append(await _drive(client, Scenario(name, prefix, inserted), args.requests, args.concurrency))
+        return results
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_server(backend: str, port: int) -> subprocess.Popen:
+    env = dict(os.environ, STORAGE_BACKEND=backend, MCP_LOG_SAMPLE_RATE="0")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+
+
+async def _wait_ready(url: str, proc: subprocess.Popen, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=url, timeout=1.0) as client:
+        while time.monotonic() < deadline:
+            if proc.poll() is not None:
+                raise RuntimeError(f"Server exited with code {proc.returncode}")
+            try:
+                if (await client.get("/metrics")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {url} not ready after {timeout}s")
+
+
+def _cleanup(prefix: str):
+    """Delete the rows a Postgres run wrote."""
+    import psycopg2
+    from app.config import settings
+
+    conn = psycopg2.connect(settings.DATABASE_URL)
+    try:
+        with conn, conn.cursor() as cur:
+            cur.execute("SET search_path TO %s", (settings.DB_SCHEMA_NAME,))
+            cur.execute("DELETE FROM user_login_credentials WHERE user_id LIKE %s", (f"{prefix}%",))
+            print(f"  cleaned up {cur.rowcount} rows")
+    finally:
+        conn.close()
+
+
+async def main(args):
+    prefix = f"load_{uuid.uuid4().hex[:8]}"
+    report: Dict[str, List[Dict]] = {}
+    targets = [("external", args.url)] if args.url else [(b, None) for b in args.backends]
+
+    for backend, url in targets:
+        proc = None
+        if url is None:
+            port = _free_port()
+            url = f"http://127.0.0.1:{port}"
+            proc = _start_server(backend, port)
+        print(f"\n{backend}: {url} (requests={args.requests}, concurrency={args.concurrency})")
+        try:
+            if proc is not None:
+                await _wait_ready(url, proc)
+            report[backend] = await run_backend(url, args, f"{prefix}_{backend}")
+        finally:
+            if proc is not None:
+                proc.terminate()
+                proc.wait()
+            if backend != "memory" and not args.keep_rows:
+                try:
+                    _cleanup(f"{prefix}_{backend}")
+                except Exception as e:
+                    print(f"  cleanup failed: {e}")
+
+        print(f"  {'scenario':<12} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+        for r in report[backend]:
+            print(f"  {r['scenario']:<12} {r['rps']:>9} {r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8} {r['errors']:>7}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"requests": args.requests, "concurrency": args.concurrency, "results": report}, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", type=lambda s: s.split(","), default=["memory", "postgres"],
+                        help="comma-separated STORAGE_BACKEND values to start servers for")
+    parser.add_argument("--url", help="load an already running server instead of starting one")
+    parser.add_argument("--scenarios", type=lambda s: s.split(","), default=list(SCENARIOS),
+                        help=f"comma-separated subset of {','.join(SCENARIOS)}")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--keep-rows", action="store_true", help="don't delete the rows written to Postgres")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    asyncio.run(main(args))
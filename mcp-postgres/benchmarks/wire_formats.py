@@ -0,0 +1,111 @@
+# benchmarks/wire_formats.py
+"""
+Payload size and encode/decode time of /mcp bodies as JSON (stdlib and
+orjson) vs. MessagePack, for the shapes agents actually send and receive.
+Nothing is sent over the network, but app settings still load from .env.
+Run from mcp-postgres/:
+
+    python -m benchmarks.wire_formats
+    python -m benchmarks.wire_formats --batch 500 --rows 1000 --repeat 2000
+
+Payloads:
+  insert_request    one insert_credentials call
+  insert_batch      a JSON-RPC batch of --batch insert_credentials calls
+  batch_response    the batch's responses ({"inserted_id": n} each)
+  list_response     a list_credentials page of --rows rows (with timestamps)
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Tuple
+
+from app import codec
+
+
+def _insert_params(i: int) -> Dict:
+    return {
+        "user_id": f"user_{i:08d}",
+        "first_name": "Ada",
+        "last_name": "Lovelace",
+        "email": f"user_{i:08d}@example.com",
+        "phone_number": f"+1555{i:07d}",
+        "is_active": True,
+    }
+
+
+def _call(i: int) -> Dict:
+    return {"jsonrpc": "2.0", "id": i, "method": "insert_credentials", "params": _insert_params(i)}
+
+
+def payloads(batch: int, rows: int) -> Dict[str, Tuple[object, int]]:
+    """name -> (payload, number of records in it)"""
+    now = datetime.now(timezone.utc)
+    page = [{"id": i, **_insert_params(i), "created_at": now} for i in range(rows)]
+    return {
+        "insert_request": (_call(1), 1),
+        "insert_batch": ([_call(i) for i in range(batch)], batch),
+        "batch_response": ([{"jsonrpc": "2.0", "id": i, "result": {"inserted_id": i}} for i in range(batch)], batch),
+        "list_response": ({"jsonrpc": "2.0", "id": 1, "result": {"items": page, "next_after_id": rows - 1}}, rows),
+    }
+
+
+def _stdlib_dumps(obj) -> bytes:
+    return json.dumps(obj, default=str, separators=(",", ":")).encode("utf-8")
+
+
+def formats() -> List[Tuple[str, Callable, Callable]]:
+    found = [("json (stdlib)", _stdlib_dumps, json.loads)]
+    if codec.orjson is not None:
+        found.append(("json (orjson)", codec.dumps, codec.loads))
+    if codec.msgpack is not None:
+        found.append(("msgpack", codec.packb, codec.unpackb))
+    return found
+
+
+def _per_call_us(fn: Callable, arg, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(arg)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def run(batch: int, rows: int, repeat: int) -> List[Dict]:
+    results = []
+    for payload_name, (payload, records) in payloads(batch, rows).items():
+        # Big payloads get fewer rounds so every case takes similar wall time
+        rounds = max(10, repeat // records)
+        for fmt, dumps, loads in formats():
+            body = dumps(payload)
+            results.append({
+                "payload": payload_name,
+                "format": fmt,
+                "bytes": len(body),
+                "encode_us": round(_per_call_us(dumps, payload, rounds), 1),
+                "decode_us": round(_per_call_us(loads, body, rounds), 1),
+            })
+    return results
+
+
+def main(args):
+    results = run(args.batch, args.rows, args.repeat)
+    print(f"batch={args.batch} rows={args.rows}")
+    print(f"  {'payload':<15} {'format':<14} {'bytes':>9} {'vs json':>8} {'encode µs':>10} {'decode µs':>10}")
+    baseline = {}
+    for r in results:
+        baseline.setdefault(r["payload"], r["bytes"])
+        ratio = r["bytes"] / baseline[r["payload"]]
+        print(f"  {r['payload']:<15} {r['format']:<14} {r['bytes']:>9} {ratio:>7.0%} "
+              f"{r['encode_us']:>10} {r['decode_us']:>10}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"batch": args.batch, "rows": args.rows, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch", type=int, default=100, help="calls per JSON-RPC batch")
+    parser.add_argument("--rows", type=int, default=1000, help="rows per list_credentials page")
+    parser.add_argument("--repeat", type=int, default=20000, help="encode/decode rounds for the smallest payload")
+    parser.add_argument("--json", help="also write the results to this file")
+    main(parser.parse_args())
@@ -0,0 +1,12 @@
+-- Credentials table the MCP tools read and write. The UNIQUE constraints
+-- back the get_credentials lookups and are the arbiters for upsert_credentials.
+CREATE TABLE IF NOT EXISTS user_login_credentials (
+    id           bigserial PRIMARY KEY,
+    user_id      text NOT NULL UNIQUE,
+    first_name   text NOT NULL,
+    last_name    text NOT NULL,
+    email        text UNIQUE,
+    phone_number text UNIQUE,
+    is_active    boolean DEFAULT true,
+    created_at   timestamptz DEFAULT now()
+);
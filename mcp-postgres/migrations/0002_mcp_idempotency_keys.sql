@@ -0,0 +1,6 @@
+-- insert_credentials idempotency keys (see app/idempotency.py)
+CREATE TABLE IF NOT EXISTS mcp_idempotency_keys (
+    key         text PRIMARY KEY,
+    inserted_id bigint,
+    created_at  timestamptz NOT NULL DEFAULT now()
+);
@@ -0,0 +1,38 @@
+-- QA test-run results, written by the record_* MCP tools. Runs are keyed by a
+-- client-generated run_id, so agents can record steps and timings before the
+-- run row itself is flushed; there are no foreign keys for the same reason.
+CREATE TABLE IF NOT EXISTS test_runs (
+    run_id      text PRIMARY KEY,
+    name        text NOT NULL,
+    project     text,
+    status      text NOT NULL,
+    started_at  timestamptz NOT NULL,
+    finished_at timestamptz,
+    metadata    jsonb
+);
+CREATE INDEX IF NOT EXISTS test_runs_name_started_idx ON test_runs (name, started_at);
+
+CREATE TABLE IF NOT EXISTS test_steps (
+    id          bigserial PRIMARY KEY,
+    run_id      text NOT NULL,
+    step        text NOT NULL,
+    status      text NOT NULL,
+    started_at  timestamptz NOT NULL,
+    duration_ms double precision NOT NULL,
+    detail      jsonb
+);
+CREATE INDEX IF NOT EXISTS test_steps_run_idx ON test_steps (run_id);
+CREATE INDEX IF NOT EXISTS test_steps_step_started_idx ON test_steps (step, started_at);
+
+CREATE TABLE IF NOT EXISTS test_request_timings (
+    id          bigserial PRIMARY KEY,
+    run_id      text NOT NULL,
+    step        text,
+    method      text NOT NULL,
+    url         text NOT NULL,
+    status_code integer,
+    started_at  timestamptz NOT NULL,
+    duration_ms double precision NOT NULL
+);
+CREATE INDEX IF NOT EXISTS test_request_timings_run_idx ON test_request_timings (run_id);
+CREATE INDEX IF NOT EXISTS test_request_timings_step_started_idx ON test_request_timings (step, started_at);
@@ -0,0 +1,14 @@
+-- Statements slower than SLOW_QUERY_MS, with the request that ran them and,
+-- when captured, their EXPLAIN (ANALYZE, BUFFERS) plan (see app/slow_queries.py)
+CREATE TABLE IF NOT EXISTS mcp_slow_queries (
+    id            bigserial PRIMARY KEY,
+    captured_at   timestamptz NOT NULL DEFAULT now(),
+    request_id    text,
+    method        text,
+    duration_ms   double precision NOT NULL,
+    query         text NOT NULL,
+    plan          jsonb,
+    explain_error text
+);
+CREATE INDEX IF NOT EXISTS mcp_slow_queries_captured_idx ON mcp_slow_queries (captured_at);
+CREATE INDEX IF NOT EXISTS mcp_slow_queries_request_idx ON mcp_slow_queries (request_id);
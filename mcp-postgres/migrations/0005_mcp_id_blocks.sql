@@ -0,0 +1,6 @@
+-- Named counters handing out blocks of ids (see app/id_blocks.py)
+CREATE TABLE IF NOT EXISTS mcp_id_blocks (
+    name       text PRIMARY KEY,
+    next_value bigint NOT NULL,
+    updated_at timestamptz NOT NULL DEFAULT now()
+);
@@ -0,0 +1,44 @@
+-- 0001 only declares the UNIQUE constraints when it creates the table, so a
+-- table that existed before migrations may have none of them. upsert_credentials
+-- needs the one on user_id as its ON CONFLICT arbiter, and get_credentials
+-- needs an index on every lookup column. Columns that are already unique are
+-- left alone. Duplicate values stop the migration with the offending column.
+-- The indexes are built in the migration's transaction, which blocks writes
+-- to the table until it commits.
+DO $$
+DECLARE
+    col   text;
+    dupes bigint;
+BEGIN
+    FOREACH col IN ARRAY ARRAY['user_id', 'email', 'phone_number'] LOOP
+        IF EXISTS (
+            SELECT 1 FROM pg_index i
+            JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0]
+            WHERE i.indrelid = 'user_login_credentials'::regclass
+              AND i.indisunique AND i.indnkeyatts = 1 AND i.indpred IS NULL AND a.attname = col
+        ) THEN
+            CONTINUE;
+        END IF;
+        EXECUTE format(
+            'SELECT count(*) FROM (SELECT 1 FROM user_login_credentials WHERE %1$I IS NOT NULL '
+            'GROUP BY %1$I HAVING count(*) > 1) d', col
+        ) INTO dupes;
+        IF dupes > 0 THEN
+            RAISE EXCEPTION 'user_login_credentials.% has % duplicated values; resolve them and restart', col, dupes
+                USING HINT = format(
+                    'SELECT %1$I, count(*) FROM user_login_credentials GROUP BY %1$I HAVING count(*) > 1', col
+                );
+        END IF;
+        RAISE NOTICE 'Adding unique index on user_login_credentials(%)', col;
+        EXECUTE format('CREATE UNIQUE INDEX user_login_credentials_%1$s_key ON user_login_credentials (%1$I)', col);
+    END LOOP;
+
+    -- The keyset column of list_credentials / exports
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_index i
+        JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0]
+        WHERE i.indrelid = 'user_login_credentials'::regclass AND i.indpred IS NULL AND a.attname = 'id'
+    ) THEN
+        CREATE INDEX user_login_credentials_id_idx ON user_login_credentials (id);
+    END IF;
+END $$;
@@ -0,0 +1,10 @@
+-- Client-generated ids for steps and request timings. An agent re-sends a
+-- flush whose reply it never got (e.g. it timed out after the insert), and
+-- record_* skip the rows already stored instead of storing them twice. Rows
+-- without one, from older agents, are never treated as duplicates: a unique
+-- index doesn't compare NULLs.
+ALTER TABLE test_steps ADD COLUMN IF NOT EXISTS record_id text;
+CREATE UNIQUE INDEX IF NOT EXISTS test_steps_record_id_key ON test_steps (record_id);
+
+ALTER TABLE test_request_timings ADD COLUMN IF NOT EXISTS record_id text;
+CREATE UNIQUE INDEX IF NOT EXISTS test_request_timings_record_id_key ON test_request_timings (record_id);
@@ -0,0 +1,45 @@
+# tests/conftest.py
+"""
+Shared setup for the test suite. Everything runs without a database or an
+Ollama server: the MCP server uses STORAGE_BACKEND=memory, and the agents'
+settings get placeholder endpoints. Run from the repository root:
+
+    python -m pytest -q tests
+"""
+import os
+import sys
+
+import pytest
+
+# Before any settings module is imported
+os.environ.setdefault("LLM_ENDPOINT", "http://localhost:11434")
+os.environ.setdefault("DATABASE_URL", "postgresql://localhost/unused")
+os.environ.setdefault("DB_SCHEMA_NAME", "qa")
+os.environ["STORAGE_BACKEND"] = "memory"
+os.environ["RECORD_RESULTS"] = "false"
+
+# The server's package is `app`, importable from mcp-postgres/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "mcp-postgres"))
+
+
+@pytest.fixture
+def client():
+    """A TestClient with the app's lifespan run, so storage.backend is a fresh MemoryBackend."""
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def rpc(client):
+    """rpc(method, params) -> the JSON-RPC reply; rpc([calls]) posts a batch."""
+    def call(method, params=None):
+        if isinstance(method, list):
+            body = [{"jsonrpc": "2.0", "id": i, "method": m, "params": p} for i, (m, p) in enumerate(method)]
+        else:
+            body = {"jsonrpc": "2.0", "id": 1, "method": method, "params": params or {}}
+        return client.post("/mcp", json=body).json()
+    return call
@@ -0,0 +1,40 @@
+# tests/test_admission.py
+import ipaddress
+
+import pytest
+from starlette.requests import Request
+
+from app import admission
+
+
+def _request(host, client_id=None):
+    headers = [(b"x-client-id", client_id.encode())] if client_id else []
+    return Request({"type": "http", "client": (host, 5000), "headers": headers})
+
+
+@pytest.fixture
+def proxy(monkeypatch):
+    monkeypatch.setattr(admission, "trusted_proxies", [ipaddress.ip_network("10.0.0.0/24")])
+
+
+def test_client_key_is_the_peer_address():
+    assert admission.client_key(_request("203.0.113.7")) == "203.0.113.7"
+
+
+def test_client_id_from_an_untrusted_peer_is_ignored(proxy):
+    assert admission.client_key(_request("203.0.113.7", "fresh-id-1")) == "203.0.113.7"
+    assert admission.client_key(_request("203.0.113.7", "fresh-id-2")) == "203.0.113.7"
+
+
+def test_client_id_behind_a_trusted_proxy_tags_the_proxy_address(proxy):
+    assert admission.client_key(_request("10.0.0.5", "agent-1")) == "10.0.0.5 agent-1"
+    assert admission.client_key(_request("10.0.0.5")) == "10.0.0.5"
+    assert len(admission.client_key(_request("10.0.0.5", "x" * 1000))) == len("10.0.0.5 ") + 128
+
+
+def test_fresh_client_ids_do_not_reset_the_limit():
+    limiter = admission.RateLimiter(rate=1, burst=2, max_clients=100)
+    for i in range(2):
+        limiter.check(admission.client_key(_request("203.0.113.7", f"id-{i}")))
+    with pytest.raises(admission.Rejected):
+        limiter.check(admission.client_key(_request("203.0.113.7", "id-2")))
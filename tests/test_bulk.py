@@ -0,0 +1,41 @@
+# tests/test_bulk.py
+"""/bulk/insert_credentials against the memory backend."""
+
+
+def _post(client, body: bytes, content_type="application/x-ndjson"):
+    return client.post("/bulk/insert_credentials", content=body, headers={"content-type": content_type})
+
+
+def test_invalid_utf8_rejects_only_its_row(client):
+    body = (
+        b'{"user_id": "u1", "first_name": "Ada", "last_name": "L"}\n'
+        b'{"user_id": "u2", "first_name": "B\xff\xfeb", "last_name": "L"}\n'
+        b'{"user_id": "u3", "first_name": "Cy", "last_name": "L"}\n'
+    )
+    response = _post(client, body)
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["copied"], report["accepted"], report["rejected"]) == (2, 2, 1)
+    [rejected] = report["rejected_rows"]
+    assert rejected["row"] == 2
+    assert "Invalid UTF-8" in rejected["error"]
+
+
+def test_invalid_utf8_in_a_csv_record(client):
+    body = b"user_id,first_name,last_name\nu1,Ada,L\nu2,\xc3\x28,L\nu3,\xc3\xa9mile,L\n"
+    report = _post(client, body, "text/csv").json()
+    assert (report["copied"], report["rejected"]) == (2, 1)
+    assert report["rejected_rows"][0]["row"] == 2
+
+
+def test_invalid_utf8_in_the_csv_header_fails_the_load(client):
+    report = _post(client, b"user_id,first_\xffname,last_name\nu1,Ada,L\n", "text/csv").json()
+    assert report["copied"] == 0
+    assert "CSV header" in report["error"]
+
+
+def test_validation_failures_are_reported_by_row(client):
+    body = b'{"user_id": "u1", "first_name": "Ada", "last_name": "L"}\nnot json\n[1, 2]\n'
+    report = _post(client, body).json()
+    assert report["copied"] == 1
+    assert [r["row"] for r in report["rejected_rows"]] == [2, 3]
@@ -0,0 +1,50 @@
+# tests/test_db_pool.py
+import psycopg2
+import pytest
+
+from app.db import ConnectionPool
+
+
+class FakeConn:
+    def __init__(self, closed=False):
+        self.closed = closed
+
+    def close(self):
+        self.closed = True
+
+
+def _pool(conns, reconnect):
+    pool = ConnectionPool("postgresql://unused", "qa", min_size=0, max_size=len(conns))
+    pool._is_healthy = lambda conn, last_used: not conn.closed
+    pool._connect = reconnect
+    for conn in conns:
+        pool._slots.acquire()
+        pool._size += 1
+        pool._idle.put((conn, 0.0))
+    return pool
+
+
+def _idle(pool):
+    return [conn for conn, _ in pool._idle.queue]
+
+
+def test_ping_idle_replaces_broken_connections():
+    good, broken, fresh = FakeConn(), FakeConn(closed=True), FakeConn()
+    pool = _pool([good, broken], reconnect=lambda: fresh)
+    pool.ping_idle()
+    assert set(_idle(pool)) == {good, fresh}
+
+
+def test_failed_reconnect_keeps_the_unchecked_connections():
+    def refuse():
+        raise psycopg2.OperationalError("refused")
+
+    first, second = FakeConn(), FakeConn()
+    # LIFO: the broken one is pulled first, so the others are not checked yet
+    pool = _pool([first, second, FakeConn(closed=True)], reconnect=refuse)
+    with pytest.raises(psycopg2.OperationalError):
+        pool.ping_idle()
+    assert set(_idle(pool)) == {first, second}
+    assert pool.stats()["size"] == 2
+    # The broken connection's slot is free again
+    assert pool._slots.acquire(blocking=False)
@@ -0,0 +1,64 @@
+# tests/test_export_job.py
+"""The export_credentials job and GET /jobs/{id}/export, against the memory backend."""
+import json
+import os
+import time
+
+import pytest
+
+from app import jobs
+from app.config import settings
+
+
+@pytest.fixture(autouse=True)
+def export_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _seed(rpc, n):
+    rows = [{"user_id": f"u{i}", "first_name": "Ada", "last_name": "L"} for i in range(n)]
+    assert rpc("bulk_insert_credentials", {"rows": rows})["result"]["copied"] == n
+
+
+def _wait(rpc, job_id):
+    for _ in range(200):
+        status = rpc("jobs/status", {"job_id": job_id})["result"]
+        if status["status"] in jobs.TERMINAL:
+            return status
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} still {status['status']}")
+
+
+def test_export_job_writes_every_row_after_after_id(client, rpc):
+    _seed(rpc, 5)
+    job_id = rpc("export_credentials", {"after_id": 1, "fetch_size": 2})["result"]["job_id"]
+
+    status = _wait(rpc, job_id)
+    assert status["status"] == "succeeded"
+    assert (status["processed"], status["total"]) == (4, 4)
+    assert status["result"] == {"exported": 4, "last_id": 5, "download": f"/jobs/{job_id}/export"}
+
+    response = client.get(status["result"]["download"])
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [(r["id"], r["user_id"]) for r in rows] == [(2, "u1"), (3, "u2"), (4, "u3"), (5, "u4")]
+
+
+def test_export_file_is_removed_with_the_job(client, rpc, export_dir):
+    _seed(rpc, 1)
+    job_id = rpc("export_credentials", {})["result"]["job_id"]
+    _wait(rpc, job_id)
+    [path] = os.listdir(export_dir)
+
+    jobs.queue.get(job_id).finished_at -= settings.JOBS_RETENTION + 1
+    jobs.queue._prune()
+    assert os.listdir(export_dir) == []
+    assert client.get(f"/jobs/{job_id}/export").status_code == 404
+
+
+def test_only_succeeded_export_jobs_can_be_downloaded(client, rpc):
+    assert client.get("/jobs/nope/export").status_code == 404
+    job_id = rpc("bulk_insert_credentials", {"rows": [], "background": True})["result"]["job_id"]
+    _wait(rpc, job_id)
+    assert client.get(f"/jobs/{job_id}/export").status_code == 404
@@ -0,0 +1,49 @@
+# tests/test_id_allocator.py
+import pytest
+
+from agents.config import settings
+from agents.id_allocator import IdAllocator, IdRangeExhausted, account_fields
+
+
+def test_account_fields_are_built_from_the_allocator_and_n():
+    tag = f"{settings.ID_PREFIX}-accounts-42"
+    assert account_fields("accounts", 42, 42, "Ada", "Lovelace") == {
+        "user_id": f"ada_{tag}",
+        "email": f"ada.lovelace.{tag}@example.com",
+        "phone_number": "+15550000042",
+    }
+
+
+def test_account_fields_slug_names_and_default_missing_ones():
+    fields = account_fields("accounts", 7, 7, "Zoë-Ann O'Neil", None)
+    assert fields["user_id"].startswith("zoannoneil_")
+    assert fields["email"].startswith("zoannoneil.test.")
+    assert account_fields("accounts", 7, 7, None, "")["user_id"].startswith("user_")
+
+
+def test_account_fields_unique_per_n_whatever_the_names():
+    seen = {field: set() for field in ("user_id", "email", "phone_number")}
+    for n in (1, 10, 11, 110, 1_000_000, 9_999_999):
+        for field, value in account_fields("accounts", n, n, "Same", "Name").items():
+            assert value not in seen[field]
+            seen[field].add(value)
+
+
+def test_same_n_from_different_allocators_does_not_collide():
+    a = account_fields("accounts", 5, 5, "Ada", "L")
+    b = account_fields("accounts_eu", 5, 6, "Ada", "L")
+    assert a["user_id"] != b["user_id"]
+    assert a["email"] != b["email"]
+    assert a["phone_number"] != b["phone_number"]
+
+
+@pytest.mark.parametrize("phone_n", [10_000_000, 12_345_678, -1])
+def test_phone_numbers_outside_seven_digits_fail_loudly(phone_n):
+    with pytest.raises(IdRangeExhausted):
+        account_fields("accounts", 1, phone_n, "Ada", "L")
+
+
+@pytest.mark.parametrize("name", ["Accounts", "eu:accounts", "a.b", ""])
+def test_allocator_names_must_be_safe_in_emails(name):
+    with pytest.raises(ValueError):
+        IdAllocator("http://mcp", name, 10)
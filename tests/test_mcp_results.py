@@ -0,0 +1,65 @@
+# tests/test_mcp_results.py
+"""The record_* and get_latency_trends tools end to end, over /mcp."""
+from datetime import datetime, timezone
+
+NOW = datetime.now(timezone.utc).isoformat()
+
+
+def test_recorded_results_show_up_in_trends(rpc):
+    replies = rpc([
+        ("record_test_runs", {"runs": [{"run_id": "r1", "name": "checkout", "started_at": NOW}]}),
+        ("record_test_steps", {"steps": [
+            {"run_id": "r1", "step": "login", "status": "passed", "started_at": NOW, "duration_ms": 10},
+            {"run_id": "r1", "step": "login", "status": "failed", "started_at": NOW, "duration_ms": 30},
+        ]}),
+        ("record_request_timings", {"timings": [
+            {"run_id": "r1", "step": "login", "method": "POST", "url": "https://api/login",
+             "status_code": 200, "started_at": NOW, "duration_ms": 8},
+        ]}),
+        ("record_test_runs", {"runs": [{"run_id": "r1", "name": "checkout", "status": "failed",
+                                        "started_at": NOW, "finished_at": NOW}]}),
+    ])
+    assert sorted(r["id"] for r in replies) == [0, 1, 2, 3]
+    assert {r["id"]: r["result"] for r in replies} == {
+        0: {"recorded": 1}, 1: {"recorded": 2}, 2: {"recorded": 1}, 3: {"recorded": 1},
+    }
+
+    steps = rpc("get_latency_trends", {"bucket": "hour", "name": "checkout"})["result"]
+    assert steps["source"] == "steps"
+    [point] = steps["series"]["login"]
+    assert (point["samples"], point["failures"], point["avg_ms"], point["max_ms"]) == (2, 1, 20.0, 30.0)
+
+    requests = rpc("get_latency_trends", {"source": "requests"})["result"]
+    assert list(requests["series"]) == ["POST https://api/login"]
+
+    assert rpc("get_latency_trends", {"name": "no such test"})["result"]["series"] == {}
+
+
+def test_invalid_rows_reject_only_their_call(rpc):
+    replies = rpc([
+        ("record_test_steps", {"steps": [
+            {"run_id": "r1", "step": "login", "status": "passed", "started_at": NOW, "duration_ms": -1},
+        ]}),
+        ("record_test_steps", {"steps": [
+            {"run_id": "r1", "step": "login", "status": "passed", "started_at": NOW, "duration_ms": 1},
+        ]}),
+    ])
+    by_id = {r["id"]: r for r in replies}
+    assert "error" in by_id[0]
+    assert by_id[1]["result"] == {"recorded": 1}
+
+
+def test_resent_steps_and_timings_are_stored_once(rpc):
+    step = {"run_id": "r1", "step": "login", "status": "passed", "started_at": NOW, "duration_ms": 10,
+            "record_id": "s-1"}
+    timing = {"run_id": "r1", "method": "GET", "url": "https://api/x", "started_at": NOW, "duration_ms": 5,
+              "record_id": "t-1"}
+    for _ in range(2):
+        rpc([("record_test_steps", {"steps": [step]}), ("record_request_timings", {"timings": [timing]})])
+    # Rows without a record_id are never deduplicated
+    rpc("record_test_steps", {"steps": [{**step, "record_id": None}, {**step, "record_id": None}]})
+
+    steps = rpc("get_latency_trends", {"source": "steps"})["result"]["series"]
+    assert steps["login"][0]["samples"] == 3
+    timings = rpc("get_latency_trends", {"source": "requests"})["result"]["series"]
+    assert timings["GET https://api/x"][0]["samples"] == 1
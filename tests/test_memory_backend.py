@@ -0,0 +1,69 @@
+# tests/test_memory_backend.py
+import asyncio
+
+from app.schemas import InsertCredentialsRequest
+from app.storage.memory import MemoryBackend, UniqueViolation
+
+
+def _creds(user_id, email=None, phone_number=None, first_name="Ada"):
+    return InsertCredentialsRequest(
+        user_id=user_id, first_name=first_name, last_name="Lovelace", email=email, phone_number=phone_number,
+    )
+
+
+def _upsert(backend, req, update=True):
+    return asyncio.run(backend.upsert_credentials(req, update=update))
+
+
+def _get(backend, field, value):
+    return asyncio.run(backend.get_credentials(field, value))
+
+
+def test_upsert_inserts_then_updates_by_user_id():
+    backend = MemoryBackend()
+    inserted = _upsert(backend, _creds("ada", "ada@example.com", "+15550000001"))
+    assert inserted == {"id": 1, "action": "inserted"}
+
+    updated = _upsert(backend, _creds("ada", "ada@new.example.com", "+15550000002", first_name="Augusta"))
+    assert updated == {
+        "id": 1, "action": "updated",
+        "previous": {"email": "ada@example.com", "phone_number": "+15550000001"},
+    }
+    assert _get(backend, "user_id", "ada")["first_name"] == "Augusta"
+    # The old email / phone number are free again, and the new ones find the row
+    assert _get(backend, "email", "ada@example.com") is None
+    assert _get(backend, "phone_number", "+15550000001") is None
+    assert _get(backend, "email", "ada@new.example.com")["id"] == 1
+
+
+def test_upsert_update_keeps_its_own_email():
+    backend = MemoryBackend()
+    _upsert(backend, _creds("ada", "ada@example.com"))
+    assert _upsert(backend, _creds("ada", "ada@example.com", first_name="Augusta"))["action"] == "updated"
+
+
+def test_upsert_update_still_enforces_other_unique_columns():
+    backend = MemoryBackend()
+    _upsert(backend, _creds("ada", "ada@example.com"))
+    _upsert(backend, _creds("grace", "grace@example.com"))
+
+    error = _upsert(backend, _creds("ada", "grace@example.com"))
+    assert isinstance(error, UniqueViolation)
+    assert "user_login_credentials_email_key" in str(error)
+    assert _get(backend, "user_id", "ada")["email"] == "ada@example.com"
+
+
+def test_upsert_new_user_id_with_taken_email_is_a_violation():
+    backend = MemoryBackend()
+    _upsert(backend, _creds("ada", "ada@example.com"))
+    assert isinstance(_upsert(backend, _creds("ada2", "ada@example.com")), UniqueViolation)
+
+
+def test_upsert_ignore_skips_any_clash():
+    backend = MemoryBackend()
+    _upsert(backend, _creds("ada", "ada@example.com"))
+
+    assert _upsert(backend, _creds("ada", "other@example.com"), update=False) == {"id": None, "action": "skipped"}
+    assert _upsert(backend, _creds("ada2", "ada@example.com"), update=False) == {"id": None, "action": "skipped"}
+    assert _get(backend, "user_id", "ada")["email"] == "ada@example.com"
+    assert _upsert(backend, _creds("grace"), update=False) == {"id": 2, "action": "inserted"}
@@ -0,0 +1,24 @@
+# tests/test_request_classifier.py
+import pytest
+
+from agents.classifiers.request_classifier import ALLOWED, validate_slot
+
+
+@pytest.mark.parametrize("slot", list(ALLOWED))
+def test_validate_slot_accepts_every_allowed_value(slot):
+    for value in ALLOWED[slot]:
+        assert validate_slot(slot, value) == value
+
+
+def test_validate_slot_ignores_case_and_surrounding_space():
+    value = ALLOWED["intent"][0]
+    assert validate_slot("intent", f"  {value.upper()}\n") == value
+
+
+@pytest.mark.parametrize("value", [None, "", "something else", 3, ["api testing"], {"label": "api testing"}])
+def test_validate_slot_rejects_anything_else(value):
+    assert validate_slot("intent", value) is None
+
+
+def test_validate_slot_checks_against_its_own_slot():
+    assert validate_slot("project", ALLOWED["intent"][0]) is None
@@ -0,0 +1,16 @@
+# tests/test_reserve_ids.py
+"""reserve_ids over /mcp, the block allocator behind agents/id_allocator.py."""
+
+
+def test_reserve_ids_hands_out_disjoint_blocks(rpc):
+    first = rpc("reserve_ids", {"name": "accounts", "count": 10})["result"]
+    second = rpc("reserve_ids", {"name": "accounts", "count": 5})["result"]
+    other = rpc("reserve_ids", {"name": "other", "count": 5})["result"]
+    assert first == {"name": "accounts", "first": 1, "count": 10}
+    assert second["first"] == 11
+    assert other["first"] == 1
+
+
+def test_reserve_ids_rejects_bad_params(rpc):
+    assert "error" in rpc("reserve_ids", {"name": "accounts", "count": 0})
+    assert "error" in rpc("reserve_ids", {"name": "no spaces", "count": 1})
@@ -0,0 +1,126 @@
+# tests/test_results.py
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import results, schemas
+from app.storage.memory import MemoryBackend
+
+NOW = datetime.now(timezone.utc)
+
+
+def _run(run_id="r1", **fields):
+    return schemas.TestRun(**{"run_id": run_id, "name": "checkout", "started_at": NOW, **fields})
+
+
+def _step(step, duration_ms, status="passed", run_id="r1", started_at=NOW):
+    return schemas.TestStep(run_id=run_id, step=step, status=status, started_at=started_at, duration_ms=duration_ms)
+
+
+# ─── merge_runs ───────────────────────────────────────────────
+def test_merge_runs_applies_later_entries_like_the_upsert():
+    finished = NOW + timedelta(seconds=5)
+    merged = results.merge_runs([
+        _run(metadata={"build": 1}),
+        _run(status="passed", finished_at=finished),
+        _run(name="renamed", status="failed"),
+    ])
+    assert len(merged) == 1
+    run = merged[0]
+    assert run.status == "failed"
+    # Not cleared by a later entry without them
+    assert run.finished_at == finished
+    assert run.metadata == {"build": 1}
+    # Only status / finished_at / metadata are updated
+    assert run.name == "checkout"
+
+
+def test_merge_runs_keeps_distinct_runs_in_order():
+    merged = results.merge_runs([_run("a"), _run("b"), _run("a", status="passed")])
+    assert [(r.run_id, r.status) for r in merged] == [("a", "passed"), ("b", "running")]
+
+
+# ─── truncate / percentile ────────────────────────────────────
+@pytest.mark.parametrize("bucket, expected", [
+    ("hour", datetime(2024, 5, 16, 13, tzinfo=timezone.utc)),
+    ("day", datetime(2024, 5, 16, tzinfo=timezone.utc)),
+    # 2024-05-16 is a Thursday; weeks start on Monday like date_trunc
+    ("week", datetime(2024, 5, 13, tzinfo=timezone.utc)),
+])
+def test_truncate(bucket, expected):
+    ts = datetime(2024, 5, 16, 13, 47, 12, 345, tzinfo=timezone.utc)
+    assert results.truncate(ts, bucket) == expected
+
+
+def test_truncate_works_in_utc():
+    ts = datetime(2024, 5, 16, 1, 30, tzinfo=timezone(timedelta(hours=5)))
+    assert results.truncate(ts, "day") == datetime(2024, 5, 15, tzinfo=timezone.utc)
+
+
+def test_percentile_interpolates_like_percentile_cont():
+    values = [10.0, 20.0, 30.0, 40.0]
+    assert results.percentile(values, 0.5) == 25.0
+    assert results.percentile(values, 0.95) == pytest.approx(38.5)
+    assert results.percentile(values, 0.0) == 10.0
+    assert results.percentile(values, 1.0) == 40.0
+    assert results.percentile([7.0], 0.95) == 7.0
+
+
+# ─── MemoryBackend.latency_trends ─────────────────────────────
+def _trends(backend, **params):
+    return asyncio.run(backend.latency_trends(schemas.LatencyTrendsRequest(**params)))
+
+
+def test_memory_latency_trends_per_step_and_bucket():
+    backend = MemoryBackend()
+    yesterday = NOW - timedelta(days=1)
+    asyncio.run(backend.record_test_steps([
+        _step("login", 10), _step("login", 30, status="failed"), _step("login", 20),
+        _step("login", 50, started_at=yesterday),
+        _step("pay", 5, status="error"),
+    ]))
+
+    rows = _trends(backend, bucket="day")
+    assert [(r["key"], r["bucket"], r["samples"]) for r in rows] == [
+        ("login", results.truncate(yesterday, "day"), 1),
+        ("login", results.truncate(NOW, "day"), 3),
+        ("pay", results.truncate(NOW, "day"), 1),
+    ]
+    today = rows[1]
+    assert today["failures"] == 1
+    assert today["avg_ms"] == 20
+    assert today["p50_ms"] == 20
+    assert today["max_ms"] == 30
+    assert rows[2]["failures"] == 1
+
+
+def test_memory_latency_trends_filters():
+    backend = MemoryBackend()
+    asyncio.run(backend.record_test_runs([_run("r1"), _run("r2", name="signup")]))
+    asyncio.run(backend.record_test_steps([
+        _step("login", 10, run_id="r1"),
+        _step("login", 99, run_id="r2"),
+        _step("pay", 5, run_id="r1"),
+        _step("login", 1, run_id="r1", started_at=NOW - timedelta(days=10)),
+    ]))
+
+    rows = _trends(backend, name="checkout", step="login", days=7)
+    assert [(r["key"], r["samples"], r["max_ms"]) for r in rows] == [("login", 1, 10)]
+
+
+def test_memory_latency_trends_for_requests():
+    backend = MemoryBackend()
+    timing = dict(run_id="r1", method="GET", url="https://api/x", started_at=NOW)
+    asyncio.run(backend.record_request_timings([
+        schemas.RequestTiming(**timing, status_code=200, duration_ms=12),
+        schemas.RequestTiming(**timing, status_code=500, duration_ms=40),
+        schemas.RequestTiming(**timing, status_code=None, duration_ms=3),
+    ]))
+
+    rows = _trends(backend, source="requests")
+    assert len(rows) == 1
+    assert rows[0]["key"] == "GET https://api/x"
+    assert rows[0]["samples"] == 3
+    # 5xx and no response at all both count as failures
+    assert rows[0]["failures"] == 2
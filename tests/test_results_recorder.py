@@ -0,0 +1,182 @@
+# tests/test_results_recorder.py
+import requests
+from requests.adapters import BaseAdapter
+
+from agents.results_recorder import ResultsRecorder, TimedSession
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, body=None):
+        self.status_code = status_code
+        self._body = body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code}")
+
+    def json(self):
+        return self._body
+
+
+class FakeSession:
+    """Answers each post with the next reply: a FakeResponse, an exception, or a callable of the batch."""
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.batches = []
+
+    def post(self, url, json, timeout):
+        self.batches.append(json)
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply(json) if callable(reply) else reply
+
+
+def _ok(batch):
+    return FakeResponse(body=[{"jsonrpc": "2.0", "id": call["id"], "result": {}} for call in batch])
+
+
+def _recorder(session, max_buffered=100):
+    # Never flushed in the background during a test
+    recorder = ResultsRecorder("http://mcp", flush_interval=3600, flush_size=10**6, max_buffered=max_buffered)
+    recorder._session = session
+    return recorder
+
+
+def _step(n):
+    return {"run_id": "r1", "step": f"s{n}"}
+
+
+def _buffered(recorder):
+    return [item for _, item in recorder._buffer]
+
+
+def test_flush_sends_one_batch_grouped_by_method():
+    session = FakeSession(_ok)
+    recorder = _recorder(session)
+    recorder.add("record_test_runs", {"run_id": "r1"})
+    recorder.add("record_test_steps", _step(1))
+    recorder.add("record_test_steps", _step(2))
+    recorder.flush()
+
+    [batch] = session.batches
+    assert [(c["method"], c["params"]) for c in batch] == [
+        ("record_test_runs", {"runs": [{"run_id": "r1"}]}),
+        ("record_test_steps", {"steps": [_step(1), _step(2)]}),
+    ]
+    assert not recorder._buffer
+
+
+def test_failed_flush_requeues_ahead_of_newer_items():
+    def fail_then_record_more(batch):
+        # Recorded while the failing request was in flight
+        recorder.add("record_test_steps", _step(3))
+        raise requests.ConnectionError("refused")
+
+    session = FakeSession(fail_then_record_more, _ok)
+    recorder = _recorder(session)
+    recorder.add("record_test_steps", _step(1))
+    recorder.add("record_test_steps", _step(2))
+
+    recorder.flush()
+    assert _buffered(recorder) == [_step(1), _step(2), _step(3)]
+
+    recorder.flush()
+    assert session.batches[1][0]["params"]["steps"] == [_step(1), _step(2), _step(3)]
+    assert not recorder._buffer
+
+
+def test_busy_server_is_retried():
+    session = FakeSession(FakeResponse(status_code=429))
+    recorder = _recorder(session)
+    recorder.add("record_test_steps", _step(1))
+    recorder.flush()
+    assert _buffered(recorder) == [_step(1)]
+
+
+def test_only_retryable_errors_are_requeued():
+    def reply(batch):
+        methods = {call["method"]: call["id"] for call in batch}
+        return FakeResponse(body=[
+            {"jsonrpc": "2.0", "id": methods["record_test_runs"], "error": {"code": -32602, "message": "bad"}},
+            {"jsonrpc": "2.0", "id": methods["record_test_steps"], "error": {"code": -32003, "message": "busy"}},
+            {"jsonrpc": "2.0", "id": methods["record_request_timings"], "result": {"recorded": 1}},
+        ])
+
+    recorder = _recorder(FakeSession(reply))
+    recorder.add("record_test_runs", {"run_id": "r1"})
+    recorder.add("record_test_steps", _step(1))
+    recorder.add("record_request_timings", {"url": "https://api"})
+    recorder.flush()
+
+    # Invalid runs are dropped, the busy steps wait for the next flush
+    assert list(recorder._buffer) == [("record_test_steps", _step(1))]
+
+
+def test_requeue_drops_the_oldest_beyond_max_buffered():
+    def fail_after_more(batch):
+        recorder.add("record_test_steps", _step(3))
+        recorder.add("record_test_steps", _step(4))
+        raise requests.ConnectionError("refused")
+
+    recorder = _recorder(FakeSession(fail_after_more), max_buffered=3)
+    recorder.add("record_test_steps", _step(1))
+    recorder.add("record_test_steps", _step(2))
+    recorder.flush()
+    assert _buffered(recorder) == [_step(2), _step(3), _step(4)]
+
+
+def test_disabled_recorder_buffers_nothing():
+    recorder = ResultsRecorder("http://mcp", 3600, 10, 100, enabled=False)
+    recorder.add("record_test_steps", _step(1))
+    assert not recorder._buffer
+
+
+# ─── TimedSession ─────────────────────────────────────────────
+class StubAdapter(BaseAdapter):
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.status_code = 204
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+def _mounted(session):
+    session.mount("https://", StubAdapter())
+    return session
+
+
+def _timings(recorder):
+    return [item for method, item in recorder._buffer if method == "record_request_timings"]
+
+
+def test_timed_session_records_requests_inside_a_run():
+    recorder = _recorder(FakeSession())
+    timed = _mounted(TimedSession())
+    timed.get("https://api/outside")
+    with recorder.run("checkout") as run:
+        with run.step("login"):
+            timed.post("https://api/login?user=ada", json={})
+        timed.get("https://api/between-steps")
+    timed.get("https://api/after")
+
+    [login, between] = _timings(recorder)
+    assert (login["run_id"], login["step"], login["method"], login["url"], login["status_code"]) == (
+        run.run_id, "login", "POST", "https://api/login", 204,
+    )
+    assert between["step"] is None
+    assert login["record_id"] != between["record_id"]
+
+
+def test_other_sessions_are_not_timed():
+    recorder = _recorder(FakeSession())
+    plain = _mounted(requests.Session())
+    with recorder.run("checkout") as run:
+        with run.step("login"):
+            plain.get("https://api/login")
+    assert _timings(recorder) == []
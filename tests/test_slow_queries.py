@@ -0,0 +1,31 @@
+# tests/test_slow_queries.py
+import pytest
+
+from app.slow_queries import analyzable
+
+
+@pytest.mark.parametrize("query", [
+    "SELECT * FROM accounts WHERE id = $1",
+    "  select count(*) from test_steps",
+    "VALUES (1), (2)",
+    "WITH recent AS (SELECT * FROM test_runs) SELECT count(*) FROM recent",
+])
+def test_read_only_queries_are_analyzed(query):
+    assert analyzable(query)
+
+
+@pytest.mark.parametrize("query", [
+    "INSERT INTO accounts (id) VALUES ($1)",
+    "UPDATE accounts SET name = $1",
+    "SELECT * FROM id_blocks WHERE name = $1 FOR UPDATE",
+    "SELECT * FROM id_blocks FOR NO KEY UPDATE SKIP LOCKED",
+    "select * from id_blocks for share",
+    "SELECT * FROM id_blocks FOR KEY SHARE",
+    "WITH moved AS (DELETE FROM queue RETURNING *) SELECT count(*) FROM moved",
+    "WITH n AS (UPDATE counters SET n = n + 1 RETURNING n) SELECT n FROM n",
+    "WITH src AS (SELECT 1) MERGE INTO t USING src ON true WHEN MATCHED THEN DO NOTHING",
+    "SELECT nextval('accounts_id_seq')",
+    "SELECT pg_advisory_xact_lock(42)",
+])
+def test_queries_that_write_or_lock_are_only_planned(query):
+    assert not analyzable(query)
@@ -0,0 +1,41 @@
+# tests/test_structured_output.py
+import json
+
+import httpx
+from ollama import Client
+
+from agents.classifiers.request_classifier import extract_slots
+from agents.structured_output import chat_json, chat_label, label_schema
+
+Label = label_schema("Label", ["yes", "no"])
+
+
+def _client(content: str, requests: list) -> Client:
+    """A plain ollama.Client whose server always answers `content`."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, json={
+            "model": "m", "done": True, "done_reason": "stop",
+            "message": {"role": "assistant", "content": content},
+        })
+    return Client(host="http://ollama.test", transport=httpx.MockTransport(handler))
+
+
+def test_chat_json_accepts_a_plain_ollama_client():
+    requests = []
+    client = _client('{"label": "yes"}', requests)
+    result = chat_json(client, "intent", "m", [{"role": "user", "content": "?"}], Label, cache=True)
+    assert result.label == "yes"
+    [sent] = requests
+    assert sent["format"] == Label.model_json_schema()
+    assert sent["options"]["num_predict"] == 32
+
+
+def test_chat_label_is_none_for_an_invalid_answer():
+    client = _client('{"label": "maybe"}', [])
+    assert chat_label(client, "intent", "m", [{"role": "user", "content": "?"}], Label, cache=True) is None
+
+
+def test_extract_slots_accepts_a_plain_ollama_client():
+    client = _client('{"intent": "api testing", "project": null, "action": "bogus"}', [])
+    assert extract_slots(client, "test the api") == {"intent": "api testing", "project": None, "action": None}